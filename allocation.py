@@ -0,0 +1,81 @@
+"""Dynamic power allocation across the active connectors of every station.
+
+Each station's ``Power (kW)`` is shared between its charging sessions by
+weighted water-filling. Every session has a demand (what the vehicle can
+take right now) and a weight. A station-wide level ``λ`` gives each session
+``min(demand, λ * weight)``. ``λ`` is the highest level whose total stays
+within the cap, so spare power from sessions that are already saturated goes
+to the rest.
+
+All stations are solved together with no per-station loop. Sessions are
+sorted by station and by ``demand / weight``. A segmented cumulative sum then
+gives the load at each session's saturation point. The sessions whose point
+fits under the cap are served in full, and the remaining power is split by
+weight. The cost is one sort and a few ``bincount``s per tick.
+"""
+import numpy as np
+import pandas as pd
+
+# Session weight per priority class
+PRIORITY_WEIGHT = {'Standard': 1.0, 'Fleet': 2.0, 'Premium': 3.0}
+# State of charge (Progress, %) above which vehicles taper, and their acceptance when full
+TAPER_FROM = 80.0
+TAPER_FLOOR = 0.2
+
+
+def acceptance(max_kw, progress):
+    """kW a vehicle can take at ``progress`` % charged; linear taper past ``TAPER_FROM``"""
+    progress = np.asarray(progress, dtype=float)
+    taper = 1 - (1 - TAPER_FLOOR) * np.clip((progress - TAPER_FROM) / (100 - TAPER_FROM), 0, 1)
+    return np.asarray(max_kw, dtype=float) * taper
+
+
+def session_weight(priority_weight, progress):
+    """Emptier vehicles get a larger share: 1.5x the priority weight when empty, 0.5x when full"""
+    return np.asarray(priority_weight, dtype=float) * (1.5 - np.asarray(progress, dtype=float) / 100)
+
+
+def water_fill(station, cap, demand, weight):
+    """Setpoints (kW) per session for stations ``station`` (indices into ``cap``).
+
+    Sessions get ``min(demand, λ[station] * weight)`` with each station's level
+    ``λ`` as high as its cap allows. Weights must be positive.
+    """
+    station = np.asarray(station, dtype=np.intp)
+    cap = np.asarray(cap, dtype=float)
+    demand = np.maximum(np.asarray(demand, dtype=float), 0)
+    weight = np.asarray(weight, dtype=float)
+    n_stations = len(cap)
+    if not len(station):
+        return np.zeros(0)
+
+    # One float sort key: the station index plus the saturation point scaled into [0, 0.5)
+    ratio = demand / weight
+    order = np.argsort(station + ratio / (2 * ratio.max() + 1))
+    s, d, w = station[order], demand[order], weight[order]
+    counts = np.bincount(s, minlength=n_stations)
+    first = (np.cumsum(counts) - counts)[s]
+    # Demand and weight of the sessions that saturate before each one, within its station
+    before_d = np.cumsum(d) - d
+    before_d -= before_d[first]
+    before_w = np.cumsum(w) - w
+    before_w -= before_w[first]
+    total_w = np.bincount(s, w, n_stations)
+    # Station load with the level at this session's saturation point
+    load = before_d + d / w * (total_w[s] - before_w)
+    saturated = load <= cap[s]
+
+    sat_d = np.bincount(s, d * saturated, n_stations)
+    rest_w = total_w - np.bincount(s, w * saturated, n_stations)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        level = np.where(rest_w > 1e-12, (cap - sat_d) / rest_w, np.inf)
+    return np.minimum(demand, level[station] * weight)
+
+
+def station_totals(sessions, stations):
+    """Allocated kW and headroom per station, from a ``sessions.SessionTable``"""
+    allocated = pd.Series(sessions.station_load(), index=sessions.locations)
+    totals = stations[['Station ID', 'Location', 'Power (kW)']].copy()
+    totals['Allocated (kW)'] = totals['Location'].map(allocated).fillna(0).round(1)
+    totals['Headroom (kW)'] = (totals['Power (kW)'] - totals['Allocated (kW)']).round(1)
+    return totals
@@ -0,0 +1,393 @@
+"""Streaming anomaly detection and alerting on station temperature and load.
+
+``Detector`` keeps a fixed set of NumPy arrays for each metric, indexed by
+station:
+
+- an EWMA mean and variance of the value
+- an EWMA mean and variance of its rate of change per second
+- an hourly seasonal baseline (24 slots)
+- a two-sided CUSUM of the standardized residual
+
+Memory is fixed per station however long it runs. Every sample is scored
+against all four, and the largest z-score names the alert kind: ``level``,
+``rate``, ``seasonal`` or ``drift``. The CUSUM catches slow ramps that the
+EWMA band would widen to follow. Samples past the threshold are clipped
+before they are folded in, so a fault does not drag the baseline along with it.
+
+``AlertBook`` turns scores into alerts. Repeats of an open (station, metric)
+alert only bump its count and keep the worst score and its kind. An alert
+closes after a quiet period. Notifications obey a per-key cooldown and a
+global per-minute budget; anything over the limit is counted as suppressed. ``WebhookSink``
+POSTs notifications from a background thread and never blocks scoring.
+
+``fault_trace`` builds a replayable synthetic trace with injected faults and
+their ground truth; ``python anomaly.py replay`` scores a detector against
+it. ``python anomaly.py sink`` is a local webhook receiver that appends
+every alert it gets to a JSONL file.
+"""
+import argparse
+import json
+import queue
+import threading
+import time
+import urllib.request
+from collections import deque
+from dataclasses import asdict, dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+
+METRICS = ('temperature', 'load')
+KINDS = ('level', 'rate', 'seasonal', 'drift')
+SEASON_SLOTS = 24
+
+
+@dataclass
+class Alert:
+    station: str
+    metric: str
+    kind: str
+    value: float
+    score: float
+    first_seen: float
+    last_seen: float
+    count: int = 1
+    notified: bool = False
+    resolved: float = None
+
+
+class _MetricState:
+    """Per-station EWMA and seasonal state for one metric"""
+
+    def __init__(self, n):
+        self.mean = np.zeros(n)
+        self.var = np.zeros(n)
+        self.rate_mean = np.zeros(n)
+        self.rate_var = np.zeros(n)
+        self.cusum = np.zeros((2, n))
+        self.last = np.zeros(n)
+        self.last_t = np.zeros(n)
+        self.samples = np.zeros(n, dtype=np.int64)
+        self.season = np.zeros((n, SEASON_SLOTS))
+        self.season_var = np.zeros((n, SEASON_SLOTS))
+        self.season_samples = np.zeros((n, SEASON_SLOTS), dtype=np.int64)
+
+
+class Detector:
+    """Scores temperature and load samples per station with O(1) state each"""
+
+    def __init__(self, station_ids, alpha=0.02, var_alpha=0.02, season_alpha=0.02, threshold=5.0, suspect=3.0,
+                 drift=1.0, cusum_limit=15.0, warmup=60, season_warmup=200, min_std=None, book=None):
+        self.station_ids = list(station_ids)
+        self._index = {station: i for i, station in enumerate(self.station_ids)}
+        n = len(self.station_ids)
+        self.alpha = alpha
+        self.var_alpha = var_alpha
+        self.season_alpha = season_alpha
+        self.threshold = threshold
+        self.suspect = suspect
+        self.drift = drift
+        self.cusum_limit = cusum_limit
+        self.warmup = warmup
+        self.season_warmup = season_warmup
+        # Noise floor per metric, so a perfectly flat series does not alert on tiny moves
+        self.min_std = min_std or {'temperature': 0.5, 'load': 5.0}
+        self.state = {metric: _MetricState(n) for metric in METRICS}
+        self.book = book or AlertBook()
+        self.scored = 0
+
+    def index(self, station_ids):
+        return np.fromiter((self._index[s] for s in station_ids), dtype=np.intp, count=len(station_ids))
+
+    def observe(self, t, metric, station, values):
+        """Score ``values`` of ``metric`` for station indices ``station`` at times ``t`` (epoch seconds).
+
+        A station may appear more than once; its samples are applied in order.
+        Returns the per-sample score (the largest z-score).
+        """
+        station = np.asarray(station, dtype=np.intp)
+        values = np.asarray(values, dtype=float)
+        t = np.broadcast_to(np.asarray(t, dtype=float), station.shape)
+        # Rounds in which every station appears at most once, in arrival order
+        order = np.argsort(station, kind='stable')
+        sorted_station = station[order]
+        starts = np.flatnonzero(np.r_[True, sorted_station[1:] != sorted_station[:-1]])
+        rank = np.arange(len(order)) - np.repeat(starts, np.diff(np.r_[starts, len(order)]))
+        by_round = order[np.argsort(rank, kind='stable')]
+        bounds = np.cumsum(np.bincount(rank)) if len(rank) else []
+
+        scores = np.zeros(len(station))
+        begin = 0
+        for end in bounds:
+            rows = by_round[begin:end]
+            scores[rows] = self._update(metric, station[rows], t[rows], values[rows])
+            begin = end
+        self.scored += len(station)
+        return scores
+
+    def _update(self, metric, idx, t, x):
+        s = self.state[metric]
+        a, floor = self.alpha, self.min_std[metric] ** 2
+        mean, var, samples = s.mean[idx], s.var[idx], s.samples[idx]
+        fresh = samples == 0
+        mean = np.where(fresh, x, mean)
+        dt = np.maximum(t - s.last_t[idx], 1e-3)
+        rate = np.where(fresh, 0.0, (x - s.last[idx]) / dt)
+        slot = ((t // 3600) % SEASON_SLOTS).astype(np.intp)
+        season, season_var = s.season[idx, slot], s.season_var[idx, slot]
+        season_samples = s.season_samples[idx, slot]
+        season = np.where(season_samples == 0, x, season)
+
+        level_z = np.abs(x - mean) / np.sqrt(var + floor)
+        rate_z = np.abs(rate - s.rate_mean[idx]) / np.sqrt(s.rate_var[idx] + floor)
+        season_z = np.abs(x - season) / np.sqrt(season_var + floor)
+        # Two-sided CUSUM of the standardized residual catches ramps the EWMA band widens to follow
+        resid = (x - mean) / np.sqrt(var + floor)
+        cusum = s.cusum[:, idx]
+        cusum[0] = np.maximum(0, cusum[0] + resid - self.drift)
+        cusum[1] = np.maximum(0, cusum[1] - resid - self.drift)
+        cusum[:, samples < self.warmup] = 0
+        s.cusum[:, idx] = cusum
+        drift_z = cusum.max(axis=0) * self.threshold / self.cusum_limit
+        z = np.stack([level_z, rate_z, season_z, drift_z])
+        z[:2, samples < self.warmup] = 0
+        z[2, season_samples < self.season_warmup] = 0
+        kind = z.argmax(axis=0)
+        score = z[kind, np.arange(len(idx))]
+
+        # Outliers move the mean by a clipped step. Anything past ``suspect`` leaves the
+        # variance alone, so a fault or a slow ramp opens a gap instead of widening the band
+        limit = self.threshold * np.sqrt(var + floor)
+        dev = np.clip(x - mean, -limit, limit)
+        s.mean[idx] = mean + a * dev
+        v = self.var_alpha
+        s.var[idx] = np.where(level_z > self.suspect, var, (1 - v) * var + v * dev * dev)
+        rate_limit = self.threshold * np.sqrt(s.rate_var[idx] + floor)
+        rate_dev = np.where(fresh, 0.0, np.clip(rate - s.rate_mean[idx], -rate_limit, rate_limit))
+        s.rate_mean[idx] += a * rate_dev
+        s.rate_var[idx] = (1 - a) * (s.rate_var[idx] + a * rate_dev * rate_dev)
+        b = self.season_alpha
+        season_dev = np.clip(x - season, -limit, limit)
+        s.season[idx, slot] = season + b * season_dev
+        s.season_var[idx, slot] = (1 - b) * (season_var + b * season_dev * season_dev)
+        s.season_samples[idx, slot] += 1
+        s.last[idx], s.last_t[idx] = x, t
+        s.samples[idx] += 1
+
+        for i in np.flatnonzero(score > self.threshold):
+            self.book.record(float(t[i]), self.station_ids[idx[i]], metric, KINDS[kind[i]], float(x[i]), float(score[i]))
+        return score
+
+    def observe_stations(self, now, stations):
+        """Score one tick of a station status frame (``Temperature (°C)``, ``Current Load (kW)``)"""
+        t = now.timestamp()
+        idx = self.index(stations['Station ID'])
+        self.observe(t, 'temperature', idx, stations['Temperature (°C)'].to_numpy(dtype=float))
+        self.observe(t, 'load', idx, stations['Current Load (kW)'].to_numpy(dtype=float))
+        self.book.expire(t)
+
+
+class AlertBook:
+    """Deduplicated, rate-limited alerts with notification to sinks"""
+
+    def __init__(self, cooldown=300.0, clear_after=60.0, max_per_minute=30, history=200, sinks=()):
+        self.cooldown = cooldown
+        self.clear_after = clear_after
+        self.max_per_minute = max_per_minute
+        self.sinks = list(sinks)
+        self.open = {}
+        self.closed = deque(maxlen=history)
+        self.suppressed = 0
+        self._notified_at = {}
+        self._recent = deque()
+        self._lock = threading.Lock()
+
+    def record(self, t, station, metric, kind, value, score):
+        key = (station, metric)
+        with self._lock:
+            alert = self.open.get(key)
+            if alert is not None:
+                alert.last_seen = t
+                alert.count += 1
+                if score > alert.score:
+                    alert.kind, alert.value, alert.score = kind, value, score
+                return alert
+            alert = self.open[key] = Alert(station, metric, kind, value, score, t, t)
+            while self._recent and self._recent[0] <= t - 60:
+                self._recent.popleft()
+            if t - self._notified_at.get(key, -np.inf) < self.cooldown or len(self._recent) >= self.max_per_minute:
+                self.suppressed += 1
+                return alert
+            self._notified_at[key] = t
+            self._recent.append(t)
+            alert.notified = True
+        for sink in self.sinks:
+            sink.send(asdict(alert))
+        return alert
+
+    def expire(self, t):
+        """Close alerts not seen for ``clear_after`` seconds"""
+        with self._lock:
+            for key in [key for key, alert in self.open.items() if alert.last_seen < t - self.clear_after]:
+                alert = self.open.pop(key)
+                alert.resolved = t
+                self.closed.append(alert)
+
+    def frame(self):
+        """Open alerts first, then the most recently closed"""
+        with self._lock:
+            alerts = sorted(self.open.values(), key=lambda a: -a.last_seen) + list(reversed(self.closed))
+        return pd.DataFrame([asdict(a) for a in alerts],
+                            columns=['station', 'metric', 'kind', 'value', 'score', 'first_seen', 'last_seen',
+                                     'count', 'notified', 'resolved'])
+
+
+class WebhookSink:
+    """POSTs alerts as JSON from a background thread; drops them when the endpoint falls behind"""
+
+    def __init__(self, url, timeout=2.0, max_pending=256):
+        self.url = url
+        self.timeout = timeout
+        self.sent = 0
+        self.failed = 0
+        self.dropped = 0
+        self._queue = queue.Queue(max_pending)
+        self._thread = threading.Thread(target=self._run, name="alert-webhook", daemon=True)
+        self._thread.start()
+
+    def send(self, alert):
+        try:
+            self._queue.put_nowait(alert)
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self):
+        while True:
+            alert = self._queue.get()
+            request = urllib.request.Request(self.url, json.dumps(alert).encode(),
+                                             {'Content-Type': 'application/json'})
+            try:
+                urllib.request.urlopen(request, timeout=self.timeout).close()
+                self.sent += 1
+            except OSError:
+                self.failed += 1
+
+
+def fault_trace(n_stations=1000, seconds=900, seed=0, faults=40, start_after=300):
+    """Replayable 1 Hz temperature and load trace with injected faults.
+
+    Returns ``(samples, truth)``. ``samples`` has columns t, station, metric, value
+    and is sorted by time. ``truth`` lists one fault per row: station, metric,
+    kind, start, end. Fault kinds are ``overheat`` (temperature ramps 0.1 °C/s
+    up to +15 °C), ``spike`` (load doubles) and ``dropout`` (load falls to 0).
+    """
+    rng = np.random.default_rng(seed)
+    t = np.arange(seconds, dtype=float)
+    temperature = rng.uniform(30, 38, (n_stations, 1)) + np.cumsum(rng.normal(0, 0.05, (n_stations, seconds)), axis=1)
+    temperature += rng.normal(0, 0.2, temperature.shape)
+    load = rng.uniform(60, 160, (n_stations, 1)) * (1 + 0.1 * np.sin(2 * np.pi * t / 600)) \
+        + rng.normal(0, 4, (n_stations, seconds))
+
+    kinds = rng.choice(['overheat', 'spike', 'dropout'], faults)
+    stations = rng.choice(n_stations, faults, replace=False)
+    starts = rng.integers(start_after, seconds - 120, faults)
+    ends = starts + rng.integers(60, 120, faults)
+    for kind, s, a, b in zip(kinds, stations, starts, ends):
+        if kind == 'overheat':
+            temperature[s, a:b] += np.minimum(0.1 * np.arange(b - a), 15)
+        elif kind == 'spike':
+            load[s, a:b] *= 2
+        else:
+            load[s, a:b] = 0
+    truth = pd.DataFrame({'station': stations, 'metric': np.where(kinds == 'overheat', 'temperature', 'load'),
+                          'kind': kinds, 'start': starts.astype(float), 'end': ends.astype(float)})
+
+    # One row per (second, station, metric), interleaved like a live feed
+    grid_t = np.repeat(t, 2 * n_stations)
+    grid_station = np.tile(np.repeat(np.arange(n_stations), 2), seconds)
+    grid_metric = np.tile([0, 1], seconds * n_stations)
+    value = np.stack([temperature.T, load.T], axis=2).ravel()
+    samples = pd.DataFrame({'t': grid_t, 'station': grid_station, 'metric': grid_metric, 'value': value})
+    return samples, truth
+
+
+def replay(detector, samples, batch=4096):
+    """Feed a ``fault_trace`` through ``detector`` in batches; returns samples per second"""
+    t, station = samples['t'].to_numpy(), samples['station'].to_numpy()
+    metric, value = samples['metric'].to_numpy(), samples['value'].to_numpy()
+    started = time.perf_counter()
+    for begin in range(0, len(samples), batch):
+        end = begin + batch
+        for code, name in enumerate(METRICS):
+            rows = np.flatnonzero(metric[begin:end] == code) + begin
+            if len(rows):
+                detector.observe(t[rows], name, station[rows], value[rows])
+        detector.book.expire(t[min(end, len(t)) - 1])
+    return len(samples) / (time.perf_counter() - started)
+
+
+def score_replay(detector, truth, grace=30.0):
+    """Faults caught (an alert on the faulted station and metric within the fault window) and false alerts"""
+    alerts = detector.book.frame()
+    alerts['station_index'] = alerts['station'].map(detector._index)
+    caught = 0
+    matched = np.zeros(len(alerts), dtype=bool)
+    for fault in truth.itertuples():
+        hit = ((alerts['station_index'] == fault.station) & (alerts['metric'] == fault.metric)
+               & (alerts['first_seen'] >= fault.start) & (alerts['first_seen'] <= fault.end + grace)).to_numpy()
+        caught += hit.any()
+        matched |= hit
+    delay = []
+    for fault in truth.itertuples():
+        hit = alerts[(alerts['station_index'] == fault.station) & (alerts['metric'] == fault.metric)
+                     & (alerts['first_seen'] >= fault.start)]
+        if len(hit):
+            delay.append(hit['first_seen'].min() - fault.start)
+    return {'faults': len(truth), 'caught': int(caught), 'false_alerts': int((~matched).sum()),
+            'median_delay_s': float(np.median(delay)) if delay else float('nan')}
+
+
+class _SinkHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        with self.server.lock, open(self.server.out, 'ab') as f:
+            f.write(body.rstrip(b'\n') + b'\n')
+        self.send_response(204)
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Station anomaly detection tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("sink", help="receive alert webhooks and append them to a JSONL file")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=8700)
+    p.add_argument("--out", default="alerts.jsonl")
+    p = sub.add_parser("replay", help="score the detector on a synthetic fault-injection trace")
+    p.add_argument("--stations", type=int, default=1000)
+    p.add_argument("--seconds", type=int, default=900)
+    p.add_argument("--faults", type=int, default=40)
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--webhook", default=None, help="also POST alerts to this URL")
+    args = parser.parse_args()
+
+    if args.command == "sink":
+        server = ThreadingHTTPServer((args.host, args.port), _SinkHandler)
+        server.out, server.lock = args.out, threading.Lock()
+        print(f"Writing alerts posted to http://{args.host}:{args.port}/ to {args.out}")
+        server.serve_forever()
+    else:
+        samples, truth = fault_trace(args.stations, args.seconds, args.seed, args.faults)
+        sinks = [WebhookSink(args.webhook)] if args.webhook else []
+        detector = Detector([f"BLR-{i + 1:05d}" for i in range(args.stations)], book=AlertBook(sinks=sinks))
+        rate = replay(detector, samples)
+        print(f"{len(samples):,} samples at {rate:,.0f} samples/s")
+        print(score_replay(detector, truth))
+
+
+if __name__ == "__main__":
+    main()
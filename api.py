@@ -0,0 +1,289 @@
+"""Headless HTTP/WebSocket API over the shared snapshot store.
+
+    GET /snapshot    metrics, metric deltas, station status, the daily series and any feed error
+    GET /stations    one table as JSON, or as an Arrow IPC stream with
+    GET /daily       ``?format=arrow`` or ``Accept: application/vnd.apache.arrow.stream``
+    GET /sessions    also pages on the server with ``?station=&sort=&desc=1&page=&size=``
+    WS  /ws          the full snapshot on connect, then only what changed each tick,
+                     including the session rows upserted and removed
+
+Bodies are encoded (and gzipped) once per snapshot and shared by every
+request. ETags are content hashes, so a poller sending If-None-Match gets a
+304 until the data it asked for actually changes. WebSocket deltas are built
+and serialized once per tick and fanned out to per-client queues; a client
+that falls behind is sent a fresh full snapshot instead of a backlog.
+
+Run with ``python api.py --port 8600``; EV_TELEMETRY_URL, EV_HISTORY_DIR and
+EV_ALERT_WEBHOOK are honoured as in the dashboard.
+"""
+import argparse
+import asyncio
+import contextlib
+import gzip
+import hashlib
+import json
+import logging
+import os
+
+import pyarrow as pa
+from starlette.applications import Starlette
+from starlette.responses import Response
+from starlette.routing import Route, WebSocketRoute
+from starlette.websockets import WebSocketDisconnect
+
+from telemetry import open_store
+
+ARROW = 'application/vnd.apache.arrow.stream'
+TABLES = ('stations', 'daily', 'sessions')
+GZIP_MIN_BYTES = 1024
+RESYNC = object()
+PAGE_PARAMS = {'station', 'sort', 'desc', 'page', 'size'}
+MAX_PAGE_SIZE = 1000
+
+log = logging.getLogger(__name__)
+
+
+def _records(df):
+    return json.loads(df.to_json(orient='records', date_format='iso'))
+
+
+def _dumps(document):
+    return json.dumps(document, separators=(',', ':'), ensure_ascii=False)
+
+
+def _page_params(params):
+    """``(page, size)`` from the query; ValueError unless page >= 0 and size >= 1 (larger sizes are capped)"""
+    try:
+        page, size = int(params.get('page', 0)), int(params.get('size', 50))
+    except ValueError:
+        raise ValueError('page and size must be integers') from None
+    if page < 0 or size < 1:
+        raise ValueError('page must be >= 0 and size >= 1')
+    return page, min(size, MAX_PAGE_SIZE)
+
+
+def _etag_matches(if_none_match, etag):
+    """Whether an If-None-Match header lists ``etag`` (weak comparison, as RFC 9110 specifies for it)"""
+    tags = [tag.strip() for tag in if_none_match.split(',')]
+    return '*' in tags or etag in (tag.removeprefix('W/') for tag in tags)
+
+
+def snapshot_document(snapshot):
+    """JSON-ready view of a snapshot, stations keyed by Station ID"""
+    return {
+        'version': snapshot.version,
+        'created': snapshot.created.isoformat(),
+        'metrics': snapshot.metrics,
+        'deltas': snapshot.deltas,
+        'stations': {row['Station ID']: row for row in _records(snapshot.stations)},
+        'daily': _records(snapshot.daily),
+        # Set once the telemetry feed has stopped; stations then hold its last readings
+        'feed_error': snapshot.feed_error,
+    }
+
+
+def _table(snapshot, name):
+    table = getattr(snapshot, name)
+    return table.frame() if name == 'sessions' else table
+
+
+def _session_records(frame):
+    return {row.pop('Vehicle ID'): row for row in _records(frame)}
+
+
+def snapshot_delta(previous, current, daily_changed, sessions=None):
+    """What changed from document ``previous`` to ``current``: changed metrics and station fields only.
+
+    ``sessions`` is ``SessionTable.diff`` output, sent as rows to upsert by Vehicle ID and IDs to drop.
+    """
+    stations = {}
+    for station_id, row in current['stations'].items():
+        old = previous['stations'].get(station_id, {})
+        changed = {key: value for key, value in row.items() if old.get(key) != value}
+        if changed:
+            stations[station_id] = changed
+    delta = {
+        'type': 'delta',
+        'version': current['version'],
+        'base': previous['version'],
+        'created': current['created'],
+        'metrics': {key: value for key, value in current['metrics'].items() if previous['metrics'].get(key) != value},
+        'deltas': current['deltas'],
+        'stations': stations,
+    }
+    removed = previous['stations'].keys() - current['stations'].keys()
+    if removed:
+        delta['removed'] = sorted(removed)
+    if daily_changed:
+        delta['daily'] = current['daily']
+    if current['feed_error'] != previous['feed_error']:
+        delta['feed_error'] = current['feed_error']
+    if sessions is not None:
+        upserted, removed_sessions = sessions
+        delta['sessions'] = {'upsert': _session_records(upserted), 'removed': removed_sessions}
+    return delta
+
+
+class Body:
+    """An encoded response body with its gzip variant and ETag"""
+
+    def __init__(self, data, media_type):
+        self.data = data
+        self.media_type = media_type
+        self.etag = f'"{hashlib.sha1(data).hexdigest()[:20]}"'
+        self.gzipped = gzip.compress(data, compresslevel=6) if len(data) >= GZIP_MIN_BYTES else None
+
+
+class EncodedSnapshot:
+    """Lazily encoded bodies for one snapshot"""
+
+    def __init__(self, snapshot):
+        self.snapshot = snapshot
+        self.document = snapshot_document(snapshot)
+        self._bodies = {}
+        self._full = None
+
+    def full_message(self):
+        if self._full is None:
+            self._full = _dumps({'type': 'snapshot', **self.document,
+                                 'sessions': _session_records(self.snapshot.sessions.frame())})
+        return self._full
+
+    def body(self, name, fmt):
+        key = (name, fmt)
+        if key not in self._bodies:
+            if name == 'snapshot':
+                self._bodies[key] = Body(self.full_message().encode(), 'application/json')
+            elif fmt == 'arrow':
+                table = pa.Table.from_pandas(_table(self.snapshot, name), preserve_index=False)
+                sink = pa.BufferOutputStream()
+                with pa.ipc.new_stream(sink, table.schema) as writer:
+                    writer.write_table(table)
+                self._bodies[key] = Body(sink.getvalue().to_pybytes(), ARROW)
+            else:
+                self._bodies[key] = Body(_dumps(_records(_table(self.snapshot, name))).encode(), 'application/json')
+        return self._bodies[key]
+
+
+class SnapshotAPI:
+    """Shares one encoding of each snapshot between HTTP requests and WebSocket subscribers"""
+
+    def __init__(self, store, poll=0.1, queue_size=8):
+        self.store = store
+        self.poll = poll
+        self.queue_size = queue_size
+        self.clients = set()
+        self._current = None
+
+    def current(self):
+        snapshot = self.store.latest()
+        if self._current is None or self._current.snapshot is not snapshot:
+            self._current = EncodedSnapshot(snapshot)
+        return self._current
+
+    async def publish(self):
+        """Poll the store and push one serialized delta per new snapshot to every client queue"""
+        previous = self.current()
+        while True:
+            await asyncio.sleep(self.poll)
+            current = previous
+            try:
+                current = self.current()
+                if current is previous:
+                    continue
+                daily_changed = current.snapshot.daily is not previous.snapshot.daily
+                sessions = current.snapshot.sessions.diff(previous.snapshot.sessions)
+                message = _dumps(snapshot_delta(previous.document, current.document, daily_changed, sessions))
+            except Exception:
+                # One bad tick must not end the fan-out; clients resync from the next good snapshot
+                log.exception("Could not build the snapshot delta")
+                message = RESYNC
+            for queue in self.clients:
+                try:
+                    queue.put_nowait(message)
+                except asyncio.QueueFull:
+                    # Too far behind for the delta chain; replace the backlog with a resync
+                    while not queue.empty():
+                        queue.get_nowait()
+                    queue.put_nowait(RESYNC)
+            previous = current
+
+    def session_page(self, params):
+        """One server-side page of the active sessions; ValueError for a bad page, size or sort column"""
+        page, size = _page_params(params)
+        sessions = self.current().snapshot.sessions
+        rows = sessions.query(params.get('station'), params.get('sort', 'Start Time'), params.get('desc') != '1')
+        return Body(_dumps({'version': sessions.version, 'total': len(rows), 'page': page, 'size': size,
+                            'rows': _records(sessions.page(rows, page, size))}).encode(), 'application/json')
+
+    async def http(self, request):
+        name = request.url.path.strip('/')
+        if name == 'sessions' and PAGE_PARAMS & request.query_params.keys():
+            try:
+                body = self.session_page(request.query_params)
+            except ValueError as exc:
+                return Response(_dumps({'error': str(exc)}), status_code=400, media_type='application/json')
+            return self.respond(request, body)
+        fmt = 'arrow' if (request.query_params.get('format') == 'arrow'
+                          or ARROW in request.headers.get('accept', '')) and name in TABLES else 'json'
+        return self.respond(request, self.current().body(name, fmt))
+
+    def respond(self, request, body):
+        headers = {'ETag': body.etag, 'Cache-Control': 'no-cache', 'Vary': 'Accept, Accept-Encoding'}
+        if _etag_matches(request.headers.get('if-none-match', ''), body.etag):
+            return Response(status_code=304, headers=headers)
+        data = body.data
+        if body.gzipped is not None and 'gzip' in request.headers.get('accept-encoding', ''):
+            data = body.gzipped
+            headers['Content-Encoding'] = 'gzip'
+        return Response(data, media_type=body.media_type, headers=headers)
+
+    async def websocket(self, websocket):
+        await websocket.accept()
+        queue = asyncio.Queue(self.queue_size)
+        self.clients.add(queue)
+        try:
+            message = RESYNC
+            while True:
+                if message is RESYNC:
+                    message = self.current().full_message()
+                await websocket.send_text(message)
+                message = await queue.get()
+        except (WebSocketDisconnect, RuntimeError):
+            pass
+        finally:
+            self.clients.discard(queue)
+
+
+def create_app(store):
+    api = SnapshotAPI(store)
+
+    @contextlib.asynccontextmanager
+    async def lifespan(app):
+        publisher = asyncio.create_task(api.publish())
+        yield
+        publisher.cancel()
+
+    routes = [Route(f'/{name}', api.http) for name in ('snapshot',) + TABLES]
+    routes.append(WebSocketRoute('/ws', api.websocket))
+    app = Starlette(routes=routes, lifespan=lifespan)
+    app.state.api = api
+    return app
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Snapshot API for the EV charging dashboard")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8600)
+    parser.add_argument("--interval", type=float, default=1.0, help="seconds between snapshots")
+    args = parser.parse_args()
+
+    store = open_store(os.environ.get('EV_TELEMETRY_URL'), os.environ.get('EV_HISTORY_DIR'), args.interval,
+                       os.environ.get('EV_ALERT_WEBHOOK'))
+    uvicorn.run(create_app(store), host=args.host, port=args.port, log_level="warning", ws_max_queue=4)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,905 @@
+"""Benchmarks for the Bangalore EV charging dashboard.
+
+Run with ``python benchmark.py <name> [options]``; every benchmark prints a
+short plain-text report. ``python benchmark.py -h`` lists what is available.
+"""
+import argparse
+import os
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import numpy as np
+
+APP = os.path.join(os.path.dirname(os.path.abspath(__file__)), "ev ch3.py")
+
+
+def percentile(values, q):
+    return float(np.percentile(np.asarray(values, dtype=float), q))
+
+
+def report(title, rows):
+    """Print a titled list of (label, value) rows"""
+    print(f"\n== {title} ==")
+    width = max(len(label) for label, _ in rows)
+    for label, value in rows:
+        print(f"  {label.ljust(width)}  {value}")
+
+
+# Refresh engine: render time per tick and threads held per session
+def bench_refresh(args):
+    from streamlit.testing.v1 import AppTest
+
+    baseline_threads = threading.active_count()
+    timings = []
+    lock = threading.Lock()
+
+    def session(_):
+        at = AppTest.from_file(APP, default_timeout=60)
+        for _ in range(args.ticks):
+            start = time.perf_counter()
+            at.run()
+            elapsed = time.perf_counter() - start
+            with lock:
+                timings.append(elapsed)
+        return at
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.sessions) as pool:
+        apps = list(pool.map(session, range(args.sessions)))
+    wall = time.perf_counter() - start
+
+    # Sessions stay alive (apps referenced) while we count idle threads
+    idle_threads = threading.active_count() - baseline_threads
+    errors = sum(len(at.exception) for at in apps)
+    report(f"refresh: {args.sessions} sessions x {args.ticks} ticks", [
+        ("wall time", f"{wall:.2f} s"),
+        ("render p50", f"{percentile(timings, 50) * 1000:.1f} ms"),
+        ("render p95", f"{percentile(timings, 95) * 1000:.1f} ms"),
+        ("threads held between ticks", f"{idle_threads / args.sessions:.2f} per session"),
+        ("script exceptions", errors),
+    ])
+
+
+# Snapshot store: CPU per tick as the number of sessions grows
+def bench_snapshot(args):
+    import telemetry
+
+    store = telemetry.SnapshotStore(seed=0)
+    rng = np.random.default_rng(0)
+    rows = []
+    for sessions in args.sessions:
+        shared, per_session = [], []
+        for _ in range(args.ticks):
+            start = time.process_time()
+            store.tick()
+            for _ in range(sessions):
+                store.latest()
+            shared.append(time.process_time() - start)
+
+            # The old model: every session regenerates the data itself
+            start = time.process_time()
+            for _ in range(sessions):
+                telemetry.make_station_status(rng)
+                telemetry.make_daily_history(rng, datetime.now())
+                telemetry.make_metrics(rng)
+            per_session.append(time.process_time() - start)
+        rows.append((f"{sessions} sessions",
+                     f"shared {statistics.mean(shared) * 1000:7.2f} ms CPU/tick | "
+                     f"per-session {statistics.mean(per_session) * 1000:8.2f} ms CPU/tick"))
+    report(f"snapshot: {args.ticks} ticks per row", rows)
+
+
+# Ingestion: messages/s through socket -> decode -> aggregate on one core
+def _serve_simulator(port, stations, connectors, limit, ready):
+    import asyncio
+    import ingest
+
+    simulator = ingest.Simulator([f"BLR-{i + 1:04d}" for i in range(stations)], connectors, seed=0)
+
+    async def run():
+        server = await ingest.serve_simulator(simulator, port=port, rate=float("inf"), limit=limit)
+        ready.set()
+        async with server:
+            await server.serve_forever()
+
+    asyncio.run(run())
+
+
+def bench_ingest(args):
+    import asyncio
+    import multiprocessing
+    import resource
+    import ingest
+
+    ids = [f"BLR-{i + 1:04d}" for i in range(args.stations)]
+    ready = multiprocessing.Event()
+    server = multiprocessing.Process(
+        target=_serve_simulator, args=(args.port, args.stations, args.connectors, args.messages, ready), daemon=True)
+    server.start()
+    ready.wait(30)
+
+    aggregator = ingest.Aggregator(ids, args.connectors)
+    service = ingest.IngestService(ingest.SocketSource("127.0.0.1", args.port), aggregator)
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start, cpu = time.perf_counter(), time.process_time()
+    asyncio.run(service.run())
+    wall, cpu = time.perf_counter() - start, time.process_time() - cpu
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    server.terminate()
+
+    report(f"ingest: {args.stations} stations x {args.connectors} connectors", [
+        ("messages", f"{aggregator.received:,} ({aggregator.dropped} dropped)"),
+        ("throughput", f"{aggregator.received / wall:,.0f} msg/s wall, {aggregator.received / cpu:,.0f} msg/s CPU"),
+        ("peak RSS growth", f"{(rss_after - rss_before) / 1024:.1f} MiB"),
+    ])
+
+
+# Power history: memory, append cost and chart window reads
+def bench_history(args):
+    from timeseries import WINDOWS, PowerHistory, minmax_downsample
+
+    ids = [f"BLR-{i + 1:04d}" for i in range(args.stations)]
+    history = PowerHistory(ids)
+    rng = np.random.default_rng(0)
+    loads = rng.uniform(0, 200, (256, args.stations)).astype(np.float32)
+    t0 = np.datetime64("2026-01-01T00:00:00")
+
+    start = time.perf_counter()
+    for i in range(args.seconds):
+        history.append(t0 + np.timedelta64(i, "s"), loads[i % len(loads)])
+    append = (time.perf_counter() - start) / args.seconds
+
+    rows = [("memory", f"{history.nbytes / 2**20:.1f} MiB"), ("append", f"{append * 1e6:.1f} us/sample")]
+    for name, seconds in WINDOWS.items():
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            times, low, high = history.window(seconds)
+            _, values = minmax_downsample(times, low, high)
+        elapsed = (time.perf_counter() - start) / args.repeat
+        rows.append((f"window {name}", f"{len(times):6d} samples -> {len(values):5d} points in {elapsed * 1000:.3f} ms"))
+    report(f"history: {args.stations} stations, {args.seconds:,} s at 1 Hz", rows)
+
+
+# Session history: append cost and chart query latency over the rollups
+def bench_archive(args):
+    import tempfile
+    from datetime import date
+    from history import HistoryStore, synthetic_sessions
+
+    rng = np.random.default_rng(0)
+    ids = [f"BLR-{i + 1:04d}" for i in range(args.stations)]
+    end = date(2026, 1, 1)
+    per_day = args.sessions // args.days
+    with tempfile.TemporaryDirectory(dir=args.dir) as root:
+        store = HistoryStore(root)
+        append = 0.0
+        for offset in range(args.days):
+            batch = synthetic_sessions(rng, end - timedelta(days=args.days - 1 - offset), ids, per_day, offset * per_day)
+            start = time.perf_counter()
+            store.append(batch)
+            append += time.perf_counter() - start
+
+        queries = {
+            "daily, last 30 days": lambda: store.daily(end - timedelta(days=29), end),
+            "daily, full range": lambda: store.daily(end - timedelta(days=args.days - 1), end),
+            "daily, 1 station 30 days": lambda: store.daily(end - timedelta(days=29), end, ids[:1]),
+            "hourly, one day": lambda: store.hourly(end),
+        }
+        rows = [("append", f"{per_day * args.days / append:,.0f} sessions/s")]
+        for name, query in queries.items():
+            timings = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                query()
+                timings.append(time.perf_counter() - start)
+            rows.append((name, f"p50 {percentile(timings, 50) * 1000:.1f} ms, p95 {percentile(timings, 95) * 1000:.1f} ms"))
+    report(f"archive: {per_day * args.days:,} sessions, {args.days} days, {args.stations} stations", rows)
+
+
+# Location map: build + HTML render time at increasing site counts
+def _legacy_location_map(locations):
+    """One folium.Marker with an eager HTML popup per site, as Tab 2 used to build it"""
+    import folium
+    from maps import BANGALORE_CENTER, PRIORITY_COLORS
+
+    m = folium.Map(location=BANGALORE_CENTER, zoom_start=11)
+    for _, row in locations.iterrows():
+        folium.Marker(
+            location=[row['Latitude'], row['Longitude']],
+            popup=folium.Popup(f"""
+                <b>{row['Location Name']}</b><br>
+                Priority: {row['Priority']}<br>
+                Area: {row['Area Type']}<br>
+                Daily Traffic: {row['Estimated Daily Traffic']:,}<br>
+                Chargers: {row['Recommended Chargers']}<br>
+                Investment: ₹{row['Investment (Lakhs)']} L<br>
+                ROI: {row['Expected ROI (months)']} months<br>
+                Landmarks: {row['Nearby Landmarks']}
+            """, max_width=300),
+            tooltip=row['Location Name'],
+            icon=folium.Icon(color=PRIORITY_COLORS[row['Priority']], icon='charging-station', prefix='fa')
+        ).add_to(m)
+    return m
+
+
+def bench_map(args):
+    from locations import synthetic_locations
+    from maps import build_location_map, render_html
+
+    rows = []
+    for n in args.points:
+        sites = synthetic_locations(n)
+        start = time.perf_counter()
+        html = render_html(build_location_map(sites))
+        fast = time.perf_counter() - start
+        line = f"{fast * 1000:8.1f} ms, {len(html) / 2**20:6.2f} MiB"
+        if n <= args.legacy_max:
+            start = time.perf_counter()
+            legacy_html = render_html(_legacy_location_map(sites))
+            legacy = time.perf_counter() - start
+            line += f" | per-marker {legacy * 1000:9.1f} ms, {len(legacy_html) / 2**20:6.2f} MiB"
+        rows.append((f"{n:,} points", line))
+    report("map: layer build + render", rows)
+
+
+# Spatial index: kNN, radius and coverage queries for many demand points
+def bench_geo(args):
+    from geo import GeoIndex
+
+    rng = np.random.default_rng(0)
+    # Roughly Karnataka-sized box
+    box = dict(low=(11.5, 74.0), high=(18.5, 78.5))
+    stations = rng.uniform(size=(args.stations, 2), **box)
+    demand = rng.uniform(size=(args.points, 2), **box)
+
+    start = time.perf_counter()
+    index = GeoIndex(stations[:, 0], stations[:, 1])
+    rows = [("build", f"{(time.perf_counter() - start) * 1000:.1f} ms")]
+    queries = {
+        "nearest (k=1)": lambda: index.nearest(demand[:, 0], demand[:, 1]),
+        "nearest (k=5)": lambda: index.nearest(demand[:, 0], demand[:, 1], k=5),
+        "count within 3 km": lambda: index.count_within(demand[:, 0], demand[:, 1], 3.0),
+        "covered within 5 km": lambda: index.covered(demand[:, 0], demand[:, 1], 5.0),
+    }
+    for name, query in queries.items():
+        start = time.perf_counter()
+        query()
+        rows.append((name, f"{time.perf_counter() - start:.2f} s"))
+    report(f"geo: {args.points:,} demand points vs {args.stations:,} stations", rows)
+
+
+# Site selection: solve time and gap as the candidate count grows
+def bench_planning(args):
+    from locations import synthetic_locations
+    from planning import PlanInputs, solve
+
+    rows = []
+    for n in args.candidates:
+        sites = synthetic_locations(n)
+        inputs = PlanInputs(budget=args.budget, radius_km=args.radius)
+        for method in args.methods:
+            plan = solve(sites, sites['Latitude'], sites['Longitude'], sites['Estimated Daily Traffic'], inputs, method)
+            rows.append((f"{n:,} candidates, {method}",
+                         f"{plan.solve_seconds:6.2f} s, {len(plan.selected):4d} sites, "
+                         f"coverage {plan.coverage * 100:5.1f}%, gap <= {plan.gap * 100:5.1f}% {plan.note}"))
+    report(f"planning: budget {args.budget:,.0f} L, radius {args.radius} km", rows)
+
+
+# Monte Carlo ROI: cold and cached payback simulation per worker count
+def bench_roi(args):
+    from locations import synthetic_locations
+    from roi import BlockCache, DemandInputs, TariffInputs, simulate_payback
+
+    sites = synthetic_locations(args.sites)
+    demand = DemandInputs(scenarios=args.scenarios, months=args.months)
+    cells = args.sites * args.scenarios * args.months
+    rows = []
+    for workers in args.workers:
+        cache = BlockCache(max_bytes=args.cache_mb * 2**20)
+        start = time.perf_counter()
+        simulate_payback(sites, demand, workers=workers, cache=cache)
+        cold = time.perf_counter() - start
+        start = time.perf_counter()
+        simulate_payback(sites, demand, TariffInputs(tariff=22.0), workers=workers, cache=cache)
+        warm = time.perf_counter() - start
+        rows.append((f"{workers} workers",
+                     f"cold {cold:6.2f} s ({cells / cold / 1e6:6.0f} M cells/s), "
+                     f"tariff change {warm:6.2f} s, cache hits {cache.hits}/{cache.hits + cache.misses}"))
+    report(f"roi: {args.sites:,} sites x {args.scenarios:,} scenarios x {args.months} months "
+           f"({os.cpu_count()} cores)", rows)
+
+
+# Sensitivity sweep: throughput and scaling with worker processes
+def bench_sweep(args):
+    import tempfile
+
+    from locations import synthetic_locations
+    from sweep import SweepGrid, SweepRunner
+
+    sites = synthetic_locations(args.sites)
+    grid = SweepGrid.linear(args.steps)
+    rows, base = [], None
+    for workers in args.workers:
+        with tempfile.TemporaryDirectory() as root:
+            runner = SweepRunner(sites, grid, root, workers=workers)
+            runner.start().wait()
+        rate = len(grid) / runner.elapsed
+        base = base or rate / workers
+        rows.append((f"{workers} workers", f"{runner.elapsed:6.2f} s, {rate:9,.0f} combos/s, "
+                                           f"{rate / base:4.1f}x ({rate / base / workers * 100:3.0f}% of linear)"))
+    report(f"sweep: {len(grid):,} combinations x {args.sites:,} sites ({os.cpu_count()} cores)", rows)
+
+
+# Snapshot API: WebSocket fan-out latency and conditional HTTP polling
+def _serve_api(port, interval, ready):
+    import uvicorn
+    from api import create_app
+    from telemetry import SnapshotStore
+
+    server = uvicorn.Server(uvicorn.Config(create_app(SnapshotStore(interval=interval).start()), port=port,
+                                           log_level="error", ws_max_queue=4, backlog=4096))
+
+    def notify():
+        while not server.started:
+            time.sleep(0.05)
+        ready.set()
+
+    threading.Thread(target=notify, daemon=True).start()
+    server.run()
+
+
+def bench_api(args):
+    import asyncio
+    import json
+    import multiprocessing
+    from websockets.asyncio.client import connect
+
+    ready = multiprocessing.Event()
+    server = multiprocessing.Process(target=_serve_api, args=(args.port, args.interval, ready), daemon=True)
+    server.start()
+    ready.wait(30)
+
+    latencies, counts = [], {"snapshot": 0, "delta": 0, "http 200": 0, "http 304": 0, "failed": 0}
+
+    async def subscriber(stop):
+        try:
+            async with connect(f"ws://127.0.0.1:{args.port}/ws", open_timeout=60, max_queue=4) as ws:
+                while not stop.is_set():
+                    message = json.loads(await ws.recv())
+                    counts[message["type"]] += 1
+                    if message["type"] == "delta":
+                        latencies.append(time.time() - datetime.fromisoformat(message["created"]).timestamp())
+        except Exception:
+            if not stop.is_set():
+                counts["failed"] += 1
+
+    async def poller(stop):
+        reader, writer = await asyncio.open_connection("127.0.0.1", args.port)
+        etag = ""
+        while not stop.is_set():
+            writer.write(f"GET /snapshot HTTP/1.1\r\nHost: bench\r\nAccept-Encoding: gzip\r\n"
+                         f"If-None-Match: {etag}\r\n\r\n".encode())
+            head = (await reader.readuntil(b"\r\n\r\n")).decode("latin-1").split("\r\n")
+            headers = dict(line.lower().split(": ", 1) for line in head[1:] if line)
+            await reader.readexactly(int(headers.get("content-length", 0)))
+            etag = headers.get("etag", etag)
+            counts[f"http {head[0].split()[1]}"] += 1
+            await asyncio.sleep(args.poll)
+        writer.close()
+
+    async def run():
+        stop = asyncio.Event()
+        tasks = []
+        for i in range(args.subscribers):
+            tasks.append(asyncio.create_task(subscriber(stop)))
+            if i % 200 == 199:
+                await asyncio.sleep(0.05)
+        tasks += [asyncio.create_task(poller(stop)) for _ in range(args.pollers)]
+        await asyncio.sleep(2)
+        latencies.clear()
+        start = {key: counts[key] for key in counts}
+        await asyncio.sleep(args.seconds)
+        stop.set()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        return {key: counts[key] - start[key] for key in counts}
+
+    window = asyncio.run(run())
+    server.terminate()
+    report(f"api: {args.subscribers:,} WebSocket subscribers, {args.pollers} HTTP pollers, "
+           f"snapshot every {args.interval} s", [
+        ("deltas delivered", f"{window['delta']:,} ({window['delta'] / args.seconds:,.0f}/s), "
+                             f"{window['snapshot']} resyncs, {counts['failed']} failed connections"),
+        ("delta latency", f"p50 {percentile(latencies, 50) * 1000:.0f} ms, "
+                          f"p99 {percentile(latencies, 99) * 1000:.0f} ms" if latencies else "n/a"),
+        ("http polling", f"{(window['http 200'] + window['http 304']) / args.seconds:,.0f} req/s, "
+                         f"{window['http 304']:,} not modified / {window['http 200']:,} full"),
+    ])
+
+
+# Forecasting: vectorized fit, per-tick update and prediction across many stations
+def bench_forecast(args):
+    from forecast import HORIZONS, SLOTS, Forecaster
+
+    ids = [f"BLR-{i + 1:05d}" for i in range(args.stations)]
+    rng = np.random.default_rng(0)
+    slots = args.days * SLOTS
+    daily = 60 + 40 * np.sin(np.linspace(0, 2 * np.pi * args.days, slots, endpoint=False))
+    load = daily * rng.uniform(0.5, 1.5, (args.stations, 1)) + rng.normal(0, 10, (args.stations, slots))
+    forecaster = Forecaster(ids)
+
+    start = time.perf_counter()
+    for model, values in ((forecaster.models["load"], load), (forecaster.models["sessions"], load / 10)):
+        model.fit(values)
+    fit = time.perf_counter() - start
+
+    now = datetime.now()
+    samples = rng.uniform(0, 150, (64, args.stations))
+    start = time.perf_counter()
+    for i in range(args.ticks):
+        forecaster.observe(now, samples[i % 64], samples[i % 64] / 10)
+    observe = (time.perf_counter() - start) / args.ticks
+
+    rows = [("fit", f"{fit:.2f} s for {args.days} days of 15-minute slots, 2 quantities"),
+            ("observe", f"{observe * 1e3:.3f} ms per tick")]
+    for name, steps in HORIZONS.items():
+        forecaster.observe(now, samples[0], samples[0] / 10)
+        start = time.perf_counter()
+        forecaster.predict("load", steps)
+        cold = time.perf_counter() - start
+        start = time.perf_counter()
+        forecaster.predict("load", steps, ids[1])
+        warm = time.perf_counter() - start
+        rows.append((f"predict {name}", f"fleet {cold * 1e3:.2f} ms, then per station {warm * 1e6:.0f} us"))
+    report(f"forecast: {args.stations:,} stations", rows)
+
+
+# Queueing simulation: a year of arrivals per site, with SLA sizing, per worker count
+def bench_queue(args):
+    from locations import synthetic_locations
+    from queueing import QueueInputs, simulate_locations
+
+    sites = synthetic_locations(args.sites)
+    inputs = QueueInputs(days=args.days, replications=args.replications)
+    rows = []
+    for workers in args.workers:
+        result = simulate_locations(sites, inputs, workers=workers)
+        rows.append((f"{workers} workers", f"{result.seconds:6.2f} s, {result.arrivals / result.seconds / 1e6:5.2f} M arrivals/s, "
+                                           f"median SLA chargers {np.median(result.sla_chargers):.0f}"))
+    report(f"queue: {args.sites:,} sites x {args.days} days in {args.replications} replications "
+           f"({os.cpu_count()} cores)", rows)
+
+
+# Power allocation: water-filling setpoints per tick vs connector count
+def bench_allocation(args):
+    from allocation import PRIORITY_WEIGHT, acceptance, session_weight, water_fill
+
+    rng = np.random.default_rng(0)
+    rows = []
+    for connectors in args.connectors:
+        stations = max(1, connectors // args.per_station)
+        station = rng.integers(0, stations, connectors)
+        cap = rng.choice([60.0, 120.0, 180.0, 240.0, 360.0], stations)
+        progress = rng.uniform(0, 100, connectors)
+        demand = acceptance(rng.choice([30.0, 50.0, 60.0, 100.0, 150.0], connectors), progress)
+        weight = session_weight(rng.choice(list(PRIORITY_WEIGHT.values()), connectors), progress)
+        times = []
+        for _ in range(args.ticks):
+            start = time.perf_counter()
+            setpoints = water_fill(station, cap, demand, weight)
+            times.append(time.perf_counter() - start)
+        load = np.bincount(station, setpoints, stations)
+        rows.append((f"{connectors:>9,} connectors",
+                     f"p50 {percentile(times, 50) * 1e3:7.2f} ms, p99 {percentile(times, 99) * 1e3:7.2f} ms, "
+                     f"{(load > cap - 1e-6).mean() * 100:3.0f}% of {stations:,} stations at their cap"))
+    report(f"allocation: water-filling, ~{args.per_station} connectors per station", rows)
+
+
+# Anomaly detection: replay a fault-injection trace, scoring throughput and detections
+def bench_anomaly(args):
+    from anomaly import Detector, fault_trace, replay, score_replay
+
+    samples, truth = fault_trace(args.stations, args.seconds, args.seed, args.faults)
+    rows = []
+    for batch in args.batch:
+        detector = Detector([f"BLR-{i + 1:05d}" for i in range(args.stations)])
+        rate = replay(detector, samples, batch)
+        result = score_replay(detector, truth)
+        rows.append((f"batch {batch:>6,}", f"{rate:12,.0f} samples/s, caught {result['caught']}/{result['faults']} faults, "
+                                          f"{result['false_alerts']} false alerts, median delay {result['median_delay_s']:.0f} s, "
+                                          f"{detector.book.suppressed} notifications suppressed"))
+    report(f"anomaly: {len(samples):,} samples from {args.stations:,} stations x {args.seconds} s (seed {args.seed})", rows)
+
+
+# Session table: full rebuild vs one server-side page vs per-tick diff
+def bench_sessions(args):
+    import json
+
+    from streamlit.dataframe_util import convert_pandas_df_to_arrow_bytes
+
+    from sessions import SessionStore
+
+    rng = np.random.default_rng(0)
+    rows = []
+    for count in args.sessions:
+        store, in_use = SessionStore.synthetic(count)
+        power = np.full(len(in_use), 150.0)
+        now = datetime.now()
+        step, full, page, diff = [], [], [], []
+        full_bytes = page_bytes = diff_bytes = 0
+        previous = store.last
+        for tick in range(args.ticks):
+            # A few stations gain or lose a session each tick
+            changed = rng.choice(len(in_use), max(1, len(in_use) // 100), replace=False)
+            in_use[changed] = np.maximum(in_use[changed] + rng.choice([-1, 1], len(changed)), 0)
+            start = time.perf_counter()
+            table = store.step(now + timedelta(seconds=tick + 1), in_use, power)
+            step.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            full_bytes = len(convert_pandas_df_to_arrow_bytes(table.frame()))
+            full.append(time.perf_counter() - start)
+            start = time.perf_counter()
+            page_bytes = len(convert_pandas_df_to_arrow_bytes(table.page(table.query(sort="Progress", ascending=False),
+                                                                         0, args.page_size)))
+            page.append(time.perf_counter() - start)
+            start = time.perf_counter()
+            upserted, removed = table.diff(previous)
+            diff_bytes = len(json.dumps({"upsert": upserted.to_dict("records"), "removed": removed}, default=str))
+            diff.append(time.perf_counter() - start)
+            previous = table
+        rows.append((f"{count:>7,} sessions",
+                     f"tick {percentile(step, 50) * 1e3:6.1f} ms | full table {percentile(full, 50) * 1e3:7.1f} ms "
+                     f"{full_bytes / 1024:8,.0f} KB | page of {args.page_size} {percentile(page, 50) * 1e3:5.1f} ms "
+                     f"{page_bytes / 1024:4,.0f} KB | diff {percentile(diff, 50) * 1e3:6.1f} ms {diff_bytes / 1024:6,.0f} KB"))
+    report(f"sessions: Arrow bytes to the browser and server time per rerun (median of {args.ticks} ticks)", rows)
+
+
+# Station grid: array-backed state, change tracking and heatmap update per tick vs fleet size
+def bench_stations(args):
+    import json
+
+    import plotly.graph_objects as go
+    from plotly.utils import PlotlyJSONEncoder
+    from stations import GRID_METRICS, StationGrid, StationStore
+    from telemetry import synthetic_stations
+
+    rng = np.random.default_rng(0)
+    rows = []
+    for count in args.stations:
+        store = StationStore(synthetic_stations(count))
+        chargers = store.state["chargers"].astype(int)
+        in_use = rng.integers(0, chargers + 1)
+        load = rng.uniform(0, 150, count)
+        temperature = rng.uniform(28, 45, count)
+        grid = StationGrid(store.step(chargers - in_use, in_use, load, temperature))
+        step, update, render, changed = [], [], [], []
+        for _ in range(args.ticks):
+            # A share of the fleet reports new values each tick
+            moved = rng.random(count) < args.changed
+            in_use[moved] = rng.integers(0, chargers[moved] + 1)
+            load[moved] = rng.uniform(0, 150, moved.sum())
+            start = time.perf_counter()
+            table = store.step(chargers - in_use, in_use, load, temperature)
+            frame = table.frame()
+            step.append(time.perf_counter() - start)
+            start = time.perf_counter()
+            changed.append(grid.update(table))
+            update.append(time.perf_counter() - start)
+            start = time.perf_counter()
+            z, cells = grid.matrix("Utilization (%)")
+            _, scale, (low, high) = GRID_METRICS["Utilization (%)"]
+            fig = go.Figure(go.Heatmap(z=z, customdata=cells, text=grid.labels, zmin=low, zmax=high, colorscale=scale))
+            payload = json.dumps(fig.to_plotly_json(), cls=PlotlyJSONEncoder)
+            render.append(time.perf_counter() - start)
+        total = [a + b + c for a, b, c in zip(step, update, render)]
+        rows.append((f"{count:>6,} stations",
+                     f"step+frame {percentile(step, 50) * 1e3:6.2f} ms | grid patch {percentile(update, 50) * 1e3:5.2f} ms "
+                     f"({statistics.mean(changed):,.0f} changed) | heatmap {percentile(render, 50) * 1e3:6.1f} ms "
+                     f"{len(payload) / 1024:5,.0f} KB | total p95 {percentile(total, 95) * 1e3:6.1f} ms | "
+                     f"{store.state.nbytes / count:.0f} B/station state, {len(frame.columns)} columns"))
+    report(f"stations: per-tick update with {args.changed * 100:.0f}% of stations changing (median of {args.ticks} ticks)", rows)
+
+
+# Tracing: per-span overhead disabled vs enabled vs sampling allocations, and metrics rendering
+def bench_tracing(args):
+    from tracing import Tracer
+
+    def work():
+        return sum(range(args.work))
+
+    def timed(tracer):
+        start = time.perf_counter()
+        for _ in range(args.spans):
+            with tracer.span("section"):
+                work()
+        return (time.perf_counter() - start) / args.spans
+
+    bare_start = time.perf_counter()
+    for _ in range(args.spans):
+        work()
+    bare = (time.perf_counter() - bare_start) / args.spans
+
+    rows = [("no span", f"{bare * 1e9:8,.0f} ns per section")]
+    for label, tracer in [("tracing off", Tracer()), ("tracing on", Tracer(enabled=True)),
+                          ("sampling allocations", Tracer(enabled=True, sample_every=1))]:
+        tracer.begin_rerun()
+        per_span = timed(tracer)
+        tracer.end_rerun()
+        rows.append((label, f"{per_span * 1e9:8,.0f} ns per section, +{(per_span - bare) * 1e9:6,.0f} ns overhead"))
+
+    tracer = Tracer(enabled=True)
+    for i in range(args.names):
+        for _ in range(10):
+            tracer.span(f"span.{i}").__enter__().__exit__(None, None, None)
+    start = time.perf_counter()
+    text = tracer.prometheus()
+    rows.append((f"prometheus, {args.names} spans", f"{(time.perf_counter() - start) * 1e3:6.2f} ms, {len(text) / 1024:,.0f} KB"))
+    report(f"tracing: {args.spans:,} sections of sum(range({args.work}))", rows)
+
+
+# App suite: headless full-script reruns at growing data scales, checked against JSON baselines.
+# The defaults take a few minutes; --large adds the fleet-scale runs, which take hours.
+APP_SCALES = ["15:3", "200:20"]
+LARGE_APP_SCALES = ["1000:100", "10000:1000", "50000:5000"]
+
+
+def _span_totals(path):
+    """``{span: (seconds, count)}`` from a Prometheus file written by tracing.Tracer"""
+    totals = {}
+    with open(path) as f:
+        for line in f:
+            for kind in ("sum", "count"):
+                prefix = f"ev_dashboard_span_seconds_{kind}{{span=\""
+                if line.startswith(prefix):
+                    name, value = line[len(prefix):].split('"} ')
+                    seconds, count = totals.get(name, (0.0, 0))
+                    totals[name] = (float(value), count) if kind == "sum" else (seconds, int(value))
+    return totals
+
+
+APP_PAGES = ["live_monitor", "location_map", "location_analysis", "investment", "history", "site_planner"]
+
+
+def _app_scale(sites, stations, reruns, timeout):
+    """One scale in a fresh process: the app reads EV_SITES/EV_STATIONS when its modules are imported"""
+    import resource
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as tmp:
+        metrics = os.path.join(tmp, "metrics.prom")
+        os.environ.update(EV_SITES=str(sites), EV_STATIONS=str(stations), EV_HISTORY_DIR=os.path.join(tmp, "history"),
+                          EV_TRACE="1", EV_METRICS_FILE=metrics)
+        from streamlit.testing.v1 import AppTest
+
+        at = AppTest.from_file(APP, default_timeout=timeout)
+        start = time.perf_counter()
+        at.run()
+        cold = time.perf_counter() - start
+        # Timer-driven fragment reruns would interleave with the measured ones
+        next(c for c in at.sidebar.checkbox if c.label == "Enable Auto-Refresh").uncheck().run()
+        pages = {}
+        errors = len(at.exception)
+        for page in APP_PAGES:
+            at.switch_page(f"views/{page}.py")
+            start = time.perf_counter()
+            at.run()
+            first = time.perf_counter() - start
+            before = _span_totals(metrics)
+            timings = []
+            for _ in range(reruns):
+                start = time.perf_counter()
+                at.run()
+                timings.append(time.perf_counter() - start)
+            after = _span_totals(metrics)
+            errors += len(at.exception)
+            spans = {name: (seconds - before.get(name, (0.0, 0))[0]) / (count - before.get(name, (0.0, 0))[1]) * 1e3
+                     for name, (seconds, count) in after.items() if count > before.get(name, (0.0, 0))[1]}
+            pages[page] = {"first_s": first, "p50_s": percentile(timings, 50), "p95_s": percentile(timings, 95),
+                           "spans_ms": spans}
+        return {"cold_s": cold, "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+                "errors": errors, "pages": pages}
+
+
+def bench_app(args):
+    import json
+    import multiprocessing as mp
+    from concurrent.futures import ProcessPoolExecutor
+
+    scales = args.scales + (LARGE_APP_SCALES if args.large else [])
+    timeout = args.timeout or (4 * 3600 if args.large else 600)
+    results = {}
+    for scale in scales:
+        sites, stations = (int(n) for n in scale.split(":"))
+        # Spawned, not forked: every scale needs its own imports of telemetry and the app
+        with ProcessPoolExecutor(1, mp_context=mp.get_context("spawn")) as pool:
+            results[scale] = pool.submit(_app_scale, sites, stations, args.reruns, timeout).result()
+
+    rows = []
+    for scale, r in results.items():
+        sites, stations = scale.split(":")
+        rows.append((f"{int(sites):>6,} sites {int(stations):>5,} stations",
+                     f"cold start {r['cold_s']:7.1f} s | peak {r['peak_rss_mb']:6,.0f} MB | {r['errors']} errors"))
+        for page, p in r["pages"].items():
+            rows.append((f"  {page}", f"first {p['first_s'] * 1e3:9,.0f} ms | rerun p50 {p['p50_s'] * 1e3:8,.0f} ms "
+                                      f"p95 {p['p95_s'] * 1e3:8,.0f} ms"))
+    report(f"app: headless AppTest page reruns, auto-refresh off ({args.reruns} warm reruns per page)", rows)
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print(f"\nbaseline saved to {args.baseline}")
+        return
+    if not os.path.exists(args.baseline):
+        print(f"\nno baseline at {args.baseline}; rerun with --save-baseline to record one")
+        return
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    failures = [f"{scale}: {r['errors']} exceptions" for scale, r in results.items() if r["errors"]]
+    for scale, r in results.items():
+        if scale not in baseline:
+            continue
+        checks = [("peak_rss_mb", baseline[scale]["peak_rss_mb"], r["peak_rss_mb"], args.max_memory_growth, 0)]
+        checks += [(f"{page} p95_s", baseline[scale]["pages"][page]["p95_s"], p["p95_s"], args.max_slowdown,
+                    args.noise_ms / 1e3)
+                   for page, p in r["pages"].items() if page in baseline[scale].get("pages", {})]
+        for key, old, new, limit, noise in checks:
+            if new > old * (1 + limit) and new - old > noise:
+                failures.append(f"{scale}: {key} {old:,.3f} -> {new:,.3f} (+{(new / old - 1) * 100:.0f}%, limit {limit * 100:.0f}%)")
+    if failures:
+        print("\nREGRESSIONS against " + args.baseline)
+        for failure in failures:
+            print(f"  {failure}")
+        raise SystemExit(1)
+    print(f"\nwithin thresholds of {args.baseline}")
+
+
+BENCHMARKS = {
+    "refresh": (bench_refresh, "render time per tick and threads held per session"),
+    "snapshot": (bench_snapshot, "CPU per tick of the shared snapshot store vs session count"),
+    "ingest": (bench_ingest, "telemetry ingestion throughput and memory"),
+    "history": (bench_history, "power history memory, appends and chart windows"),
+    "archive": (bench_archive, "Parquet session history appends and rollup queries"),
+    "map": (bench_map, "location map render time at 15 to 50k sites"),
+    "geo": (bench_geo, "spatial index queries for 1M demand points"),
+    "planning": (bench_planning, "site selection solve time and optimality gap"),
+    "roi": (bench_roi, "Monte Carlo payback simulation throughput"),
+    "sweep": (bench_sweep, "sensitivity sweep scaling with worker processes"),
+    "api": (bench_api, "snapshot API WebSocket fan-out and HTTP polling under load"),
+    "forecast": (bench_forecast, "forecast fit, update and prediction time at fleet scale"),
+    "queue": (bench_queue, "discrete-event wait-time simulation and charger sizing"),
+    "allocation": (bench_allocation, "per-tick power allocation time vs connector count"),
+    "anomaly": (bench_anomaly, "streaming anomaly detection throughput on a fault-injection trace"),
+    "sessions": (bench_sessions, "session table payload and render time: full vs paged vs diff"),
+    "stations": (bench_stations, "station state, change tracking and heatmap update time vs fleet size"),
+    "tracing": (bench_tracing, "span overhead with tracing off and on, and Prometheus rendering"),
+    "app": (bench_app, "per-page app reruns at 15-200 sites (up to 50k with --large) vs JSON baselines"),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    sub = parser.add_subparsers(dest="name", required=True)
+
+    p = sub.add_parser("refresh", help=BENCHMARKS["refresh"][1])
+    p.add_argument("--sessions", type=int, default=50)
+    p.add_argument("--ticks", type=int, default=3)
+
+    p = sub.add_parser("snapshot", help=BENCHMARKS["snapshot"][1])
+    p.add_argument("--sessions", type=int, nargs="+", default=[1, 10, 50, 200])
+    p.add_argument("--ticks", type=int, default=20)
+
+    p = sub.add_parser("ingest", help=BENCHMARKS["ingest"][1])
+    p.add_argument("--stations", type=int, default=2000)
+    p.add_argument("--connectors", type=int, default=8)
+    p.add_argument("--messages", type=int, default=500_000)
+    p.add_argument("--port", type=int, default=8799)
+
+    p = sub.add_parser("history", help=BENCHMARKS["history"][1])
+    p.add_argument("--stations", type=int, default=500)
+    p.add_argument("--seconds", type=int, default=24 * 60 * 60)
+    p.add_argument("--repeat", type=int, default=100)
+
+    p = sub.add_parser("archive", help=BENCHMARKS["archive"][1])
+    p.add_argument("--sessions", type=int, default=10_000_000)
+    p.add_argument("--days", type=int, default=3 * 365)
+    p.add_argument("--stations", type=int, default=20)
+    p.add_argument("--repeat", type=int, default=20)
+    p.add_argument("--dir", default=None, help="where to create the temporary store")
+
+    p = sub.add_parser("map", help=BENCHMARKS["map"][1])
+    p.add_argument("--points", type=int, nargs="+", default=[15, 1_000, 10_000, 50_000])
+    p.add_argument("--legacy-max", type=int, default=10_000, help="largest size to also time per-marker rendering at")
+
+    p = sub.add_parser("geo", help=BENCHMARKS["geo"][1])
+    p.add_argument("--points", type=int, default=1_000_000)
+    p.add_argument("--stations", type=int, default=10_000)
+
+    p = sub.add_parser("planning", help=BENCHMARKS["planning"][1])
+    p.add_argument("--candidates", type=int, nargs="+", default=[15, 1_000, 3_000, 10_000])
+    p.add_argument("--methods", nargs="+", default=["greedy"], choices=["greedy", "milp"])
+    p.add_argument("--budget", type=float, default=20_000)
+    p.add_argument("--radius", type=float, default=2.0)
+
+    p = sub.add_parser("roi", help=BENCHMARKS["roi"][1])
+    p.add_argument("--sites", type=int, default=1_000)
+    p.add_argument("--scenarios", type=int, default=10_000)
+    p.add_argument("--months", type=int, default=120)
+    p.add_argument("--workers", type=int, nargs="+", default=sorted({1, os.cpu_count()}))
+    p.add_argument("--cache-mb", type=int, default=8_192)
+
+    p = sub.add_parser("sweep", help=BENCHMARKS["sweep"][1])
+    p.add_argument("--sites", type=int, default=200)
+    p.add_argument("--steps", type=int, default=12)
+    p.add_argument("--workers", type=int, nargs="+",
+                   default=sorted({1, 2, 4, 8, os.cpu_count()} & set(range(1, os.cpu_count() + 1))))
+
+    p = sub.add_parser("api", help=BENCHMARKS["api"][1])
+    p.add_argument("--port", type=int, default=8601)
+    p.add_argument("--subscribers", type=int, default=2_000)
+    p.add_argument("--pollers", type=int, default=50)
+    p.add_argument("--poll", type=float, default=0.2, help="seconds between requests per poller")
+    p.add_argument("--interval", type=float, default=1.0)
+    p.add_argument("--seconds", type=float, default=10.0)
+
+    p = sub.add_parser("forecast", help=BENCHMARKS["forecast"][1])
+    p.add_argument("--stations", type=int, default=5_000)
+    p.add_argument("--days", type=int, default=28)
+    p.add_argument("--ticks", type=int, default=200)
+
+    p = sub.add_parser("queue", help=BENCHMARKS["queue"][1])
+    p.add_argument("--sites", type=int, default=1_000)
+    p.add_argument("--days", type=int, default=365)
+    p.add_argument("--replications", type=int, default=4)
+    p.add_argument("--workers", type=int, nargs="+", default=sorted({1, os.cpu_count()}))
+
+    p = sub.add_parser("allocation", help=BENCHMARKS["allocation"][1])
+    p.add_argument("--connectors", type=int, nargs="+", default=[1_000, 10_000, 100_000, 1_000_000])
+    p.add_argument("--per-station", type=int, default=10)
+    p.add_argument("--ticks", type=int, default=50)
+
+    p = sub.add_parser("anomaly", help=BENCHMARKS["anomaly"][1])
+    p.add_argument("--stations", type=int, default=1_000)
+    p.add_argument("--seconds", type=int, default=900)
+    p.add_argument("--faults", type=int, default=40)
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--batch", type=int, nargs="+", default=[64, 1_024, 16_384])
+
+    p = sub.add_parser("sessions", help=BENCHMARKS["sessions"][1])
+    p.add_argument("--sessions", type=int, nargs="+", default=[100, 10_000, 100_000])
+    p.add_argument("--page-size", type=int, default=50)
+    p.add_argument("--ticks", type=int, default=10)
+
+    p = sub.add_parser("stations", help=BENCHMARKS["stations"][1])
+    p.add_argument("--stations", type=int, nargs="+", default=[3, 200, 2_000, 20_000])
+    p.add_argument("--changed", type=float, default=0.1, help="share of stations changing per tick")
+    p.add_argument("--ticks", type=int, default=20)
+
+    p = sub.add_parser("tracing", help=BENCHMARKS["tracing"][1])
+    p.add_argument("--spans", type=int, default=200_000)
+    p.add_argument("--work", type=int, default=20)
+    p.add_argument("--names", type=int, default=40)
+
+    p = sub.add_parser("app", help=BENCHMARKS["app"][1])
+    p.add_argument("--scales", nargs="+", default=APP_SCALES, help="sites:stations pairs")
+    p.add_argument("--large", action="store_true",
+                   help=f"also run {' '.join(LARGE_APP_SCALES)} (hours at the largest scale)")
+    p.add_argument("--reruns", type=int, default=5)
+    p.add_argument("--timeout", type=float,
+                   help="seconds allowed per AppTest run (default 600, or 4 hours with --large)")
+    p.add_argument("--baseline", default=os.path.join(os.path.dirname(APP), "benchmark_baseline.json"))
+    p.add_argument("--save-baseline", action="store_true")
+    p.add_argument("--max-slowdown", type=float, default=0.25, help="allowed p95 rerun growth, as a fraction")
+    p.add_argument("--max-memory-growth", type=float, default=0.15, help="allowed peak RSS growth, as a fraction")
+    p.add_argument("--noise-ms", type=float, default=25, help="rerun slowdowns smaller than this never fail")
+
+    args = parser.parse_args()
+    BENCHMARKS[args.name][0](args)
+
+
+if __name__ == "__main__":
+    main()
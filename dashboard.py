@@ -0,0 +1,68 @@
+"""Resources shared by every page of the dashboard.
+
+``ev ch3.py`` is the entry point: it draws the header and sidebar and runs the
+selected page from ``views/`` through ``st.navigation``. Only that page's
+script executes on a rerun. Each page imports the heavy modules it needs
+(Folium, SciPy, Plotly Express) itself, so a session that never opens the map
+or the planner never pays for those imports.
+
+Cached loaders used by more than one page live here. A cached function used
+by one page is defined in that page.
+"""
+import os
+from datetime import datetime, timedelta
+
+import streamlit as st
+
+from locations import bangalore_locations, synthetic_locations
+from telemetry import open_store
+from tracing import Tracer
+
+# Local caches (sweep checkpoints) live next to the app
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache')
+
+
+# Bangalore location data with strategic EV charging station locations
+@st.cache_data
+def get_bangalore_locations():
+    # EV_SITES swaps in that many synthetic sites for scale testing (see benchmark.py app)
+    if os.environ.get('EV_SITES'):
+        return synthetic_locations(int(os.environ['EV_SITES']))
+    return bangalore_locations()
+
+
+# Shared real-time telemetry, produced once per tick for every session
+@st.cache_resource
+def get_snapshot_store():
+    return open_store(os.environ.get('EV_TELEMETRY_URL'), os.environ.get('EV_HISTORY_DIR'),
+                      webhook=os.environ.get('EV_ALERT_WEBHOOK'))
+
+
+@st.cache_data(ttl=60)
+def load_daily_history(days):
+    """Daily fleet totals for the last ``days`` days from the history rollups"""
+    today = datetime.now().date()
+    return get_snapshot_store().archive.daily(today - timedelta(days=days - 1), today)
+
+
+@st.cache_resource
+def get_tracer():
+    """Section timings shared across sessions; tracing is on only when EV_TRACE is set"""
+    return Tracer(enabled=bool(os.environ.get('EV_TRACE')), sample_every=int(os.environ.get('EV_TRACE_SAMPLE', 0)))
+
+
+@st.cache_resource
+def get_figure_cache():
+    """Serialized Plotly figures shared across sessions, keyed by data version and UI state"""
+    from figures import FigureCache
+
+    return FigureCache(max_bytes=32 * 2**20)
+
+
+def session_figure_stats():
+    """This session's figure cache counters, created on first use"""
+    from figures import CacheStats
+
+    if 'figure_stats' not in st.session_state:
+        st.session_state.figure_stats = CacheStats()
+    return st.session_state.figure_stats
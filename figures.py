@@ -0,0 +1,204 @@
+"""Plotly figures for the Location Analysis, Investment and Site Planner tabs, and a cache for them.
+
+Figures are cached as their JSON, keyed by the dataset version and whatever
+UI state they depend on. A hit rebuilds the ``go.Figure`` from JSON without
+re-running plotly's property validation, which skips the pandas aggregation
+and most of the figure construction cost.
+"""
+import json
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import numpy as np
+import plotly.express as px
+import plotly.graph_objects as go
+
+from queueing import WAIT_LABELS
+
+PRIORITY_ORDER = ['Medium', 'High', 'Very High']
+PRIORITY_HEX = {'Medium': '#3b82f6', 'High': '#f97316', 'Very High': '#ef4444'}
+
+
+@dataclass
+class CacheStats:
+    """Per-session figure cache counters"""
+    hits: int = 0
+    misses: int = 0
+    bytes_saved: int = 0
+    seconds_saved: float = 0.0
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class FigureCache:
+    """LRU of serialized figures bounded by total JSON bytes"""
+
+    def __init__(self, max_bytes=32 * 2**20):
+        self.max_bytes = max_bytes
+        self._items = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._items)
+
+    @property
+    def nbytes(self):
+        return self._bytes
+
+    def figure(self, key, build, stats=None):
+        """Cached figure for ``key``, calling ``build()`` to make it on a miss"""
+        with self._lock:
+            entry = self._items.get(key)
+            if entry is not None:
+                self._items.move_to_end(key)
+        if entry is not None:
+            spec, build_seconds = entry
+            if stats is not None:
+                stats.hits += 1
+                stats.bytes_saved += len(spec)
+                stats.seconds_saved += build_seconds
+            return go.Figure(json.loads(spec), _validate=False)
+
+        start = time.perf_counter()
+        fig = build()
+        spec = fig.to_json()
+        if stats is not None:
+            stats.misses += 1
+        self._put(key, spec, time.perf_counter() - start)
+        return fig
+
+    def _put(self, key, spec, build_seconds):
+        if len(spec) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._items:
+                return
+            self._items[key] = (spec, build_seconds)
+            self._bytes += len(spec)
+            while self._bytes > self.max_bytes:
+                _, (old, _) = self._items.popitem(last=False)
+                self._bytes -= len(old)
+
+
+def priority_pie(locations):
+    priority_counts = locations['Priority'].value_counts()
+    fig = go.Figure(data=[go.Pie(
+        labels=priority_counts.index,
+        values=priority_counts.values,
+        marker=dict(colors=[PRIORITY_HEX.get(x, '#3b82f6') for x in priority_counts.index])
+    )])
+    fig.update_layout(height=350)
+    return fig
+
+
+def area_type_bar(locations):
+    area_types = locations['Area Type'].value_counts()
+    fig = go.Figure(data=[go.Bar(
+        x=area_types.index,
+        y=area_types.values,
+        marker=dict(color=area_types.values, colorscale='Viridis')
+    )])
+    fig.update_layout(
+        height=350,
+        xaxis_title="Area Type",
+        yaxis_title="Number of Locations",
+        showlegend=False
+    )
+    return fig
+
+
+def traffic_bar(locations):
+    sorted_locs = locations.sort_values('Estimated Daily Traffic', ascending=True)
+    fig = go.Figure()
+    for priority in PRIORITY_ORDER:
+        priority_data = sorted_locs[sorted_locs['Priority'] == priority]
+        fig.add_trace(go.Bar(
+            y=priority_data['Location Name'],
+            x=priority_data['Estimated Daily Traffic'],
+            name=priority,
+            orientation='h',
+            marker=dict(color=PRIORITY_HEX[priority])
+        ))
+    fig.update_layout(height=500, barmode='overlay')
+    return fig
+
+
+def roi_scatter(locations):
+    fig = go.Figure()
+    for priority in PRIORITY_ORDER:
+        priority_data = locations[locations['Priority'] == priority]
+        fig.add_trace(go.Scatter(
+            x=priority_data['Investment (Lakhs)'],
+            y=priority_data['Expected ROI (months)'],
+            mode='markers',
+            name=priority,
+            marker=dict(
+                size=priority_data['Recommended Chargers'],
+                color=PRIORITY_HEX[priority],
+                sizemode='diameter',
+                sizeref=2
+            ),
+            text=priority_data['Location Name'],
+            hovertemplate='<b>%{text}</b><br>Investment: ₹%{x}L<br>ROI: %{y} months<extra></extra>'
+        ))
+    fig.update_layout(height=400)
+    return fig
+
+
+def investment_bar(locations, top=10):
+    top_locations = locations.sort_values('Investment (Lakhs)', ascending=False).head(top)
+    fig = go.Figure()
+    for priority in PRIORITY_ORDER:
+        priority_data = top_locations[top_locations['Priority'] == priority]
+        fig.add_trace(go.Bar(
+            x=priority_data['Location Name'],
+            y=priority_data['Investment (Lakhs)'],
+            name=priority,
+            marker=dict(color=PRIORITY_HEX[priority])
+        ))
+    fig.update_layout(height=400, xaxis_tickangle=-45)
+    return fig
+
+
+def payback_range(payback):
+    """P10-P90 payback bars per site with the P50 and the hand-entered ROI marked"""
+    fig = go.Figure(go.Bar(
+        y=payback['Location Name'],
+        x=payback['P90 Payback (months)'] - payback['P10 Payback (months)'],
+        base=payback['P10 Payback (months)'],
+        orientation='h',
+        marker=dict(color=payback['Priority'].map(PRIORITY_HEX)),
+        name='P10-P90',
+        hovertemplate='<b>%{y}</b><br>P10: %{base:.0f} months<br>P90: %{x:.0f} months after P10<extra></extra>'
+    ))
+    fig.add_trace(go.Scatter(
+        y=payback['Location Name'], x=payback['P50 Payback (months)'], mode='markers', name='P50',
+        marker=dict(color='black', symbol='line-ns-open', size=14)
+    ))
+    fig.add_trace(go.Scatter(
+        y=payback['Location Name'], x=payback['Expected ROI (months)'], mode='markers', name='Expected ROI',
+        marker=dict(color='#10b981', symbol='diamond', size=8)
+    ))
+    fig.update_layout(height=max(400, 28 * len(payback)), xaxis_title="Payback (months)",
+                      yaxis=dict(autorange='reversed'), barmode='overlay')
+    return fig
+
+
+def wait_distribution(names, histogram):
+    """Share of sessions in each wait-time bin per site (``queueing.WAIT_LABELS`` bins)"""
+    share = histogram / np.maximum(histogram.sum(axis=1, keepdims=True), 1)
+    colors = px.colors.sample_colorscale('RdYlGn_r', np.linspace(0, 1, len(WAIT_LABELS)))
+    fig = go.Figure()
+    for label, column, color in zip(WAIT_LABELS, share.T, colors):
+        fig.add_trace(go.Bar(y=list(names), x=column * 100, name=f"{label} min", orientation='h',
+                             marker=dict(color=color),
+                             hovertemplate='<b>%{y}</b><br>%{x:.1f}% of sessions<extra>' + label + ' min</extra>'))
+    fig.update_layout(height=max(400, 28 * len(share)), barmode='stack', xaxis_title="Sessions (%)",
+                      yaxis=dict(autorange='reversed'), legend_title="Wait")
+    return fig
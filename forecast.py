@@ -0,0 +1,175 @@
+"""Seasonal load and session forecasts for every station at once.
+
+Each series is an additive level + time-of-day profile (96 fifteen-minute
+slots) with a per-slot residual variance for the bands. The model state is a
+handful of NumPy arrays over stations:
+
+- ``fit`` seeds the profile and variance from history in one vectorized pass.
+  Slots the history has no data for stay unknown: a flat profile with a
+  wide band.
+- ``observe`` folds every new telemetry sample in. The level follows the
+  residual, and the current slot's profile and variance take a small step
+  toward it. A slot sees ``samples_per_slot`` samples a day (900 at 1 Hz),
+  so the step is ``gamma / samples_per_slot``: a day of data moves a slot by
+  about ``gamma`` instead of overwriting the fitted profile.
+
+Nothing is ever refit. Predictions for a horizon are computed for all
+stations together and cached until the next sample arrives.
+"""
+import threading
+import warnings
+from datetime import datetime, timedelta
+
+import numpy as np
+
+SLOT_SECONDS = 900
+SLOTS = 96
+# Forecast horizons offered in the dashboard, in 15-minute steps
+HORIZONS = {'15 min': 1, '1 hour': 4, '6 hours': 24, '24 hours': 96}
+# Two-sided 80% band
+BAND_Z = 1.2816
+
+
+def slot_of(when):
+    """Index of the 15-minute slot of the day containing ``when``"""
+    return (when.hour * 3600 + when.minute * 60 + when.second) // SLOT_SECONDS
+
+
+class SeasonalModel:
+    """Level + daily profile with per-slot variance for ``n`` series, updated one sample at a time"""
+
+    def __init__(self, n, alpha=0.02, gamma=0.1, beta=0.1, slots=SLOTS, samples_per_slot=1):
+        # gamma and beta are per slot per day; each sample takes its share
+        self.alpha = alpha
+        self.gamma, self.beta = gamma / samples_per_slot, beta / samples_per_slot
+        self.level = np.zeros(n)
+        self.profile = np.zeros((n, slots))
+        self.var = np.ones((n, slots))
+        self.samples = 0
+        self.observed = False
+
+    def fit(self, values, first_slot=0):
+        """Seed the model from ``values`` of shape ``(n, T)``, one column per slot starting at ``first_slot``.
+
+        The profile is the per-slot mean deviation from each series' mean, the
+        variance is the per-slot spread of what remains, and the level is the
+        mean of the last day after removing the profile. NaN marks unknown
+        values; a slot with none known gets no profile and the series' widest
+        known variance.
+        """
+        n, slots = self.profile.shape
+        values = np.asarray(values, dtype=float)
+        days = -(-(first_slot + values.shape[1]) // slots)
+        padded = np.full((n, days * slots), np.nan)
+        padded[:, first_slot:first_slot + values.shape[1]] = values
+        by_day = padded.reshape(n, days, slots)
+        with warnings.catch_warnings():
+            # All-NaN slots and series are expected: they are the unknown ones
+            warnings.simplefilter('ignore', RuntimeWarning)
+            mean = np.nanmean(values, axis=1, keepdims=True)
+            profile = np.nan_to_num(np.nanmean(by_day, axis=1) - mean)
+            residual = by_day - mean[..., None] - profile[:, None, :]
+            var = np.nanmean(residual ** 2, axis=1)
+            widest = np.nan_to_num(np.nanmax(var, axis=1, keepdims=True), nan=1.0)
+            recent = values[:, -slots:] - profile[:, (first_slot + np.arange(values.shape[1]))[-slots:] % slots]
+            level = np.nan_to_num(np.nanmean(recent, axis=1))
+        self.profile = profile
+        self.var = np.maximum(np.where(np.isnan(var), widest, var), 1e-6)
+        self.level = level
+        self.samples += values.shape[1]
+
+    def observe(self, slot, y):
+        """Fold one sample per series (at time-of-day ``slot``) into the model"""
+        if not self.observed:
+            # Anchor the level on the first live sample; history only seeds the shape
+            self.level = y - self.profile[:, slot]
+            self.observed = True
+        error = y - self.level - self.profile[:, slot]
+        self.level += self.alpha * error
+        self.profile[:, slot] += self.gamma * error
+        self.var[:, slot] += self.beta * (error * error - self.var[:, slot])
+        self.samples += 1
+
+    def predict(self, slot, steps):
+        """Mean and standard deviation now and at the next ``steps`` slots, shape ``(n, steps + 1)``"""
+        idx = (slot + np.arange(steps + 1)) % self.profile.shape[1]
+        return self.level[:, None] + self.profile[:, idx], np.sqrt(self.var[:, idx])
+
+
+def _hours(dates, hours):
+    return np.asarray(dates, dtype='datetime64[D]').astype('datetime64[h]') + np.asarray(hours, dtype='timedelta64[h]')
+
+
+class Forecaster:
+    """Load (kW) and in-use connector forecasts for a fleet of stations"""
+
+    QUANTITIES = ('load', 'sessions')
+
+    def __init__(self, station_ids, **model_args):
+        self.station_ids = list(station_ids)
+        self._index = {station: i for i, station in enumerate(self.station_ids)}
+        n = len(self.station_ids)
+        self.models = {name: SeasonalModel(n, **model_args) for name in self.QUANTITIES}
+        self.now = datetime.now()
+        self._lock = threading.Lock()
+        self._cache = {}
+
+    def fit_hourly(self, hourly):
+        """Seed both models from per-station hourly rollups (``history.HistoryStore.station_hourly``).
+
+        Over an hour, ``load_kwh`` is the mean load in kW and ``occupied_hours``
+        the mean number of sessions charging. A station without a row in an
+        hour some station has one for was idle (0); hours no station has a row
+        for, e.g. while the dashboard was not running, are unknown.
+        """
+        rows = hourly['station_id'].map(self._index)
+        known = rows.notna().to_numpy()
+        if not known.any():
+            return self
+        stamps = _hours(hourly['date'], hourly['hour'])[known]
+        first = stamps.min()
+        rows, cols = rows[known].astype(int).to_numpy(), (stamps - first).astype(int)
+        covered = np.zeros(int(cols.max()) + 1, dtype=bool)
+        covered[cols] = True
+        # Hourly means stand in for each of the hour's 15-minute slots
+        per_hour = 3600 // SLOT_SECONDS
+        first_slot = int((first - first.astype('datetime64[D]')).astype(int)) * per_hour
+        for name, column in (('load', 'load_kwh'), ('sessions', 'occupied_hours')):
+            grid = np.where(covered, 0.0, np.nan)[None, :].repeat(len(self.station_ids), axis=0)
+            grid[rows, cols] = hourly[column].to_numpy(dtype=float)[known]
+            self.models[name].fit(np.repeat(grid, per_hour, axis=1), first_slot)
+        return self
+
+    def observe(self, now, load, in_use):
+        """Fold one telemetry sample per station into both models"""
+        slot = slot_of(now)
+        with self._lock:
+            self.models['load'].observe(slot, np.asarray(load, dtype=float))
+            self.models['sessions'].observe(slot, np.asarray(in_use, dtype=float))
+            self.now = now
+            self._cache.clear()
+
+    def predict(self, quantity, steps, station=None):
+        """``(times, mean, low, high)`` for one station, or the fleet total when ``station`` is None.
+
+        The first point is now; the rest are the starts of the next ``steps``
+        15-minute slots. Bands are 80%, and fleet bands treat stations as
+        independent.
+        """
+        with self._lock:
+            key = (quantity, steps)
+            if key not in self._cache:
+                now = self.now
+                mean, std = self.models[quantity].predict(slot_of(now), steps)
+                start = now.replace(minute=now.minute // 15 * 15, second=0, microsecond=0)
+                times = [now] + [start + timedelta(seconds=SLOT_SECONDS * k) for k in range(1, steps + 1)]
+                self._cache[key] = (times, mean, std, {})
+            times, mean, std, per_station = self._cache[key]
+            if station not in per_station:
+                if station is None:
+                    m, s = mean.sum(axis=0), np.sqrt((std ** 2).sum(axis=0))
+                else:
+                    m, s = mean[self._index[station]], std[self._index[station]]
+                m = np.maximum(m, 0)
+                per_station[station] = (times, m, np.maximum(m - BAND_Z * s, 0), m + BAND_Z * s)
+            return per_station[station]
@@ -0,0 +1,103 @@
+"""Spatial queries over station and site locations.
+
+Points are indexed as unit vectors in a KD-tree; straight-line (chord)
+distance on the unit sphere is monotonic in great-circle distance, so kNN
+and radius queries on the tree give exact haversine answers. All queries take
+NumPy arrays and run in batches across cores.
+"""
+import numpy as np
+from scipy.spatial import cKDTree
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = np.pi * EARTH_RADIUS_KM / 180
+
+
+def unit_vectors(lat, lon):
+    """``(n, 3)`` unit vectors for latitudes/longitudes in degrees"""
+    lat = np.radians(np.asarray(lat, dtype=float))
+    lon = np.radians(np.asarray(lon, dtype=float))
+    cos_lat = np.cos(lat)
+    return np.column_stack([cos_lat * np.cos(lon), cos_lat * np.sin(lon), np.sin(lat)])
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance in km, broadcasting over array inputs"""
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+
+def _chord(km):
+    return 2 * np.sin(np.asarray(km, dtype=float) / (2 * EARTH_RADIUS_KM))
+
+
+def _km(chord):
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.clip(chord / 2, 0, 1))
+
+
+class GeoIndex:
+    """Haversine kNN / radius / coverage queries against a fixed set of points"""
+
+    def __init__(self, lat, lon):
+        self.lat = np.asarray(lat, dtype=float)
+        self.lon = np.asarray(lon, dtype=float)
+        self._tree = cKDTree(unit_vectors(self.lat, self.lon))
+
+    def __len__(self):
+        return len(self.lat)
+
+    def nearest(self, lat, lon, k=1, max_km=np.inf, workers=-1):
+        """Distances (km) and indices of the ``k`` nearest points to each query.
+
+        Missing neighbours (beyond ``max_km``) have distance ``inf`` and index
+        ``len(self)``, as in scipy.
+        """
+        bound = np.inf if np.isinf(max_km) else _chord(max_km)
+        chord, idx = self._tree.query(unit_vectors(lat, lon), k=k, distance_upper_bound=bound, workers=workers)
+        return np.where(np.isinf(chord), np.inf, _km(chord)), idx
+
+    def within(self, lat, lon, radius_km, workers=-1):
+        """For each query, the indices of points within ``radius_km``"""
+        return self._tree.query_ball_point(unit_vectors(lat, lon), _chord(radius_km), workers=workers)
+
+    def count_within(self, lat, lon, radius_km, workers=-1):
+        """For each query, how many points are within ``radius_km``"""
+        return self._tree.query_ball_point(unit_vectors(lat, lon), _chord(radius_km),
+                                           return_length=True, workers=workers)
+
+    def covered(self, lat, lon, radius_km, chunk=1_000_000):
+        """Boolean mask of queries with at least one point within ``radius_km``"""
+        lat = np.asarray(lat, dtype=float)
+        lon = np.asarray(lon, dtype=float)
+        mask = np.empty(len(lat), dtype=bool)
+        for start in range(0, len(lat), chunk):
+            stop = start + chunk
+            dist, _ = self.nearest(lat[start:stop], lon[start:stop], max_km=radius_km)
+            mask[start:stop] = np.isfinite(dist)
+        return mask
+
+
+def grid_cells(lat, lon, cell_km=1.0, pad_km=2.0):
+    """Square grid over the extent of the given points.
+
+    Returns cell centre latitudes, longitudes and the cell size in degrees
+    ``(dlat, dlon)``.
+    """
+    lat0 = float(np.mean(lat))
+    dlat = cell_km / KM_PER_DEGREE
+    dlon = cell_km / (KM_PER_DEGREE * np.cos(np.radians(lat0)))
+    pad_lat, pad_lon = pad_km / cell_km * dlat, pad_km / cell_km * dlon
+    lats = np.arange(np.min(lat) - pad_lat, np.max(lat) + pad_lat, dlat) + dlat / 2
+    lons = np.arange(np.min(lon) - pad_lon, np.max(lon) + pad_lon, dlon) + dlon / 2
+    grid_lat, grid_lon = np.meshgrid(lats, lons, indexing='ij')
+    return grid_lat.ravel(), grid_lon.ravel(), (dlat, dlon)
+
+
+def coverage_gaps(index, lat, lon, cell_km=1.0, radius_km=5.0, pad_km=1.0):
+    """Grid cells over the extent of ``lat``/``lon`` farther than ``radius_km`` from every indexed point.
+
+    Returns the gap cell centres and the cell size, as ``grid_cells`` does.
+    """
+    lat, lon, size = grid_cells(lat, lon, cell_km, pad_km)
+    gaps = ~index.covered(lat, lon, radius_km)
+    return lat[gaps], lon[gaps], size
@@ -0,0 +1,251 @@
+"""Append-only Parquet history of completed charging sessions.
+
+Layout under ``root``::
+
+    sessions/date=YYYY-MM-DD/station=<Station ID>/sessions.parquet
+    daily/month=YYYY-MM/daily.parquet      one row per (date, station)
+    hourly/date=YYYY-MM-DD/hourly.parquet  one row per (hour, station)
+    state.json                             next unused session ID
+
+Each ``append`` rewrites the session partitions it touches as one file (old
+rows plus new), so frequent small flushes do not pile up part files. It folds
+its own rows into the rollups of the months and days it touches, so the
+charts read small pre-aggregated tables and partition filters skip
+everything else. Session IDs carry on from ``next_session_id`` across runs.
+
+The hourly rollup also spreads each session's energy evenly over the hours
+it was charging. Per hour, ``load_kwh`` is then the mean load in kW and
+``occupied_hours`` the mean number of sessions charging, which is what the
+forecaster is seeded with.
+"""
+import json
+import os
+import threading
+import uuid
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+SESSION_COLUMNS = ['session_id', 'station_id', 'start', 'duration_min', 'energy_kwh', 'revenue']
+MEASURES = ['sessions', 'energy_kwh', 'revenue', 'duration_min']
+# Hourly only: energy delivered and session-hours spent charging in the hour
+OCCUPANCY = ['load_kwh', 'occupied_hours']
+SESSION_SCHEMA = pa.schema([
+    ('session_id', pa.int64()),
+    ('station_id', pa.string()),
+    ('start', pa.timestamp('s')),
+    ('duration_min', pa.float32()),
+    ('energy_kwh', pa.float32()),
+    ('revenue', pa.float32()),
+])
+
+
+def _write_atomic(table, path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+    pq.write_table(table, tmp)
+    os.replace(tmp, path)
+
+
+def _rewrite_partition(directory, rows):
+    """Replace the files of one session partition with a single file of its rows plus ``rows``"""
+    old = []
+    if os.path.isdir(directory):
+        old = sorted(name for name in os.listdir(directory) if name.endswith('.parquet'))
+    tables = [pq.read_table(os.path.join(directory, name), schema=SESSION_SCHEMA) for name in old]
+    _write_atomic(pa.concat_tables(tables + [rows]), os.path.join(directory, 'sessions.parquet'))
+    # Part files from archives written before partitions were compacted
+    for name in old:
+        if name != 'sessions.parquet':
+            os.remove(os.path.join(directory, name))
+
+
+def _rollup(sessions, keys):
+    """Sum the session measures over ``keys``"""
+    return sessions.assign(sessions=1).groupby(keys, as_index=False, observed=True)[MEASURES].sum()
+
+
+def _occupancy(sessions):
+    """``OCCUPANCY`` per (date, hour, station), spreading each session evenly over the hours it spans"""
+    start = sessions['start'].to_numpy(dtype='datetime64[s]')
+    seconds = np.maximum(sessions['duration_min'].to_numpy(dtype=float) * 60, 1).astype(np.int64)
+    end = start + seconds.astype('timedelta64[s]')
+    first = start.astype('datetime64[h]')
+    spans = ((end - np.timedelta64(1, 's')).astype('datetime64[h]') - first).astype(np.int64) + 1
+    row = np.repeat(np.arange(len(start)), spans)
+    offset = np.arange(len(row)) - np.repeat(np.cumsum(spans) - spans, spans)
+    hour = first[row] + offset.astype('timedelta64[h]')
+    overlap = (np.minimum(end[row], hour + np.timedelta64(1, 'h')) - np.maximum(start[row], hour)).astype(float)
+    hours = pd.Series(hour.astype('datetime64[s]'))
+    frame = pd.DataFrame({
+        'date': hours.dt.date,
+        'hour': hours.dt.hour,
+        'station_id': sessions['station_id'].to_numpy()[row],
+        'load_kwh': sessions['energy_kwh'].to_numpy(dtype=float)[row] * overlap / seconds[row],
+        'occupied_hours': overlap / 3600,
+    })
+    return frame.groupby(['date', 'hour', 'station_id'], as_index=False)[OCCUPANCY].sum()
+
+
+def _merge_rollup(path, delta, keys, measures=MEASURES):
+    """Add ``delta`` into the rollup file at ``path``"""
+    if os.path.exists(path):
+        delta = pd.concat([pq.read_table(path).to_pandas(), delta], ignore_index=True)
+        delta = delta.groupby(keys, as_index=False)[measures].sum()
+    table = pa.Table.from_pandas(delta.sort_values(keys), preserve_index=False)
+    _write_atomic(table, path)
+
+
+class HistoryStore:
+    """Partitioned session history with incrementally maintained rollups"""
+
+    def __init__(self, root):
+        self.root = root
+        self._lock = threading.Lock()
+
+    def _path(self, *parts):
+        return os.path.join(self.root, *parts)
+
+    def is_empty(self):
+        return not os.path.isdir(self._path('daily'))
+
+    def next_session_id(self):
+        """One past the largest session ID archived so far"""
+        path = self._path('state.json')
+        if os.path.exists(path):
+            with open(path) as f:
+                return json.load(f)['next_session_id']
+        # Archives written before state.json: scan the session IDs once
+        ids = self._query('sessions', 'date', None, ['session_id'])['session_id']
+        return int(ids.max()) + 1 if len(ids) else 0
+
+    def _save_next_session_id(self, sessions):
+        next_id = max(self.next_session_id(), int(sessions['session_id'].max()) + 1)
+        path = self._path('state.json')
+        tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp, 'w') as f:
+            json.dump({'next_session_id': next_id}, f)
+        os.replace(tmp, path)
+
+    def append(self, sessions):
+        """Append completed sessions (a DataFrame with ``SESSION_COLUMNS``)"""
+        if sessions.empty:
+            return
+        sessions = sessions[SESSION_COLUMNS].copy()
+        sessions['start'] = pd.to_datetime(sessions['start']).astype('datetime64[s]')
+        sessions['date'] = sessions['start'].dt.date
+        sessions['hour'] = sessions['start'].dt.hour
+
+        with self._lock:
+            for (day, station), part in sessions.groupby(['date', 'station_id'], sort=False):
+                table = pa.Table.from_pandas(part[SESSION_COLUMNS], schema=SESSION_SCHEMA, preserve_index=False)
+                _rewrite_partition(self._path('sessions', f"date={day}", f"station={station}"), table)
+            self._save_next_session_id(sessions)
+
+            sessions['month'] = sessions['start'].dt.strftime('%Y-%m')
+            for month, part in sessions.groupby('month', sort=False):
+                _merge_rollup(self._path('daily', f"month={month}", 'daily.parquet'),
+                              _rollup(part, ['date', 'station_id']), ['date', 'station_id'])
+            keys = ['date', 'hour', 'station_id']
+            hourly = _rollup(sessions, keys).merge(_occupancy(sessions), how='outer', on=keys).fillna(0)
+            hourly['sessions'] = hourly['sessions'].astype(np.int64)
+            for day, part in hourly.groupby('date', sort=False):
+                _merge_rollup(self._path('hourly', f"date={day}", 'hourly.parquet'), part.drop(columns='date'),
+                              ['hour', 'station_id'], MEASURES + OCCUPANCY)
+
+    def _query(self, table, partition, expression, columns):
+        path = self._path(table)
+        if not os.path.isdir(path):
+            return pd.DataFrame(columns=columns)
+        dataset = ds.dataset(path, format='parquet', partitioning=ds.partitioning(
+            pa.schema([(partition, pa.string())]), flavor='hive'))
+        return dataset.to_table(columns=columns, filter=expression).to_pandas()
+
+    def daily(self, start, end, stations=None):
+        """Fleet totals per day between ``start`` and ``end`` (inclusive), one row per day"""
+        expression = ((ds.field('month') >= f"{start:%Y-%m}") & (ds.field('month') <= f"{end:%Y-%m}")
+                      & (ds.field('date') >= start) & (ds.field('date') <= end))
+        if stations is not None:
+            expression &= ds.field('station_id').isin(list(stations))
+        rows = self._query('daily', 'month', expression, ['date'] + MEASURES)
+        totals = rows.groupby('date')[MEASURES].sum()
+        # Days without sessions (e.g. while the dashboard was not running) read as zeros
+        days = pd.date_range(start, end, freq='D')
+        totals.index = pd.to_datetime(totals.index)
+        totals = totals.reindex(days, fill_value=0)
+        return self._as_series(totals.reset_index(drop=True), 'Date', days)
+
+    def hourly(self, day, stations=None):
+        """Fleet totals per hour of one day"""
+        # One partition per day, so read its file directly instead of listing them all
+        path = self._path('hourly', f"date={day}", 'hourly.parquet')
+        columns = ['hour'] + MEASURES
+        if not os.path.exists(path):
+            rows = pd.DataFrame(columns=columns)
+        else:
+            filters = None if stations is None else [('station_id', 'in', list(stations))]
+            rows = pq.read_table(path, columns=columns, filters=filters).to_pandas()
+        totals = rows.groupby('hour', as_index=False)[MEASURES].sum()
+        return self._as_series(totals, 'Hour', totals['hour'])
+
+    def station_hourly(self, start, end):
+        """Per-station hourly rollup rows between ``start`` and ``end`` (inclusive).
+
+        Only hours with sessions have rows. ``OCCUPANCY`` is NaN in rollups
+        written before it was kept.
+        """
+        columns = ['date', 'hour', 'station_id'] + MEASURES + OCCUPANCY
+        frames = []
+        for day in pd.date_range(start, end, freq='D').date:
+            path = self._path('hourly', f"date={day}", 'hourly.parquet')
+            if os.path.exists(path):
+                frames.append(pq.read_table(path).to_pandas().assign(date=day))
+        if not frames:
+            return pd.DataFrame(columns=columns)
+        rows = pd.concat(frames, ignore_index=True).reindex(columns=columns)
+        return rows.sort_values(['date', 'hour', 'station_id'], ignore_index=True)
+
+    @staticmethod
+    def _as_series(totals, key, values):
+        """Rename rollup columns to the dashboard's display names"""
+        sessions = totals['sessions'].replace(0, np.nan)
+        return pd.DataFrame({
+            key: values,
+            'Energy (kWh)': totals['energy_kwh'].round().astype(int),
+            'Sessions': totals['sessions'].astype(int),
+            'Revenue (₹)': totals['revenue'].round().astype(int),
+            'Avg Duration (min)': (totals['duration_min'] / sessions).round().fillna(0).astype(int),
+        })
+
+
+def synthetic_sessions(rng, day, station_ids, count, first_id=0):
+    """``count`` plausible completed sessions on ``day`` spread over the stations"""
+    start = pd.Timestamp(day) + pd.to_timedelta(rng.integers(6 * 3600, 23 * 3600, count), unit='s')
+    energy = rng.gamma(4.0, 2.8, count).astype(np.float32)
+    return pd.DataFrame({
+        'session_id': np.arange(first_id, first_id + count, dtype=np.int64),
+        'station_id': rng.choice(np.asarray(station_ids, dtype=object), count),
+        'start': start,
+        'duration_min': rng.uniform(35, 75, count).astype(np.float32),
+        'energy_kwh': energy,
+        'revenue': (energy * rng.uniform(17, 23, count)).astype(np.float32),
+    })
+
+
+def backfill(store, station_ids, days=31, end=None, seed=None):
+    """Fill an empty store with ``days`` of synthetic sessions ending at ``end``.
+
+    ``end`` defaults to yesterday: today's archive holds only sessions that
+    really ended, which the live totals and the forecaster add to.
+    """
+    rng = np.random.default_rng(seed)
+    end = end or date.today() - timedelta(days=1)
+    first_id = store.next_session_id()
+    for offset in range(days - 1, -1, -1):
+        count = int(rng.integers(80, 200))
+        store.append(synthetic_sessions(rng, end - timedelta(days=offset), station_ids, count, first_id))
+        first_id += count
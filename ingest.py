@@ -0,0 +1,360 @@
+"""Telemetry ingestion for the dashboard.
+
+Charge points report OCPP-style ``MeterValues`` and ``StatusNotification``
+messages. A ``TelemetrySource`` yields them in batches, an ``Aggregator``
+folds them into fixed-size per-connector arrays, and ``IngestService`` runs
+that pipeline on an asyncio loop in a background thread. The dashboard only
+reads ``Aggregator.records()``, one normalized row per station::
+
+    Station ID | Chargers | Available | In Use | Current Load (kW) | Temperature (°C)
+
+Wire format (one JSON object per line)::
+
+    {"chargePoint": "BLR-001", "call": [2, "<id>", "MeterValues", {...}]}
+
+Run a standalone simulator that serves this stream over TCP with::
+
+    python ingest.py simulate --rate 20000
+
+It simulates ``telemetry.STATIONS``, so set the same ``EV_STATIONS`` for the
+simulator and the dashboard to test a synthetic fleet.
+
+A feed that ends, even cleanly, is reported through ``IngestService.error``;
+the dashboard keeps showing the last state it received.
+"""
+import abc
+import argparse
+import asyncio
+import json
+import threading
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+# Connector states, see OCPP 1.6 ChargePointStatus
+AVAILABLE, CHARGING, UNAVAILABLE = 0, 1, 2
+STATUS_CODES = {
+    'Available': AVAILABLE,
+    'Preparing': CHARGING,
+    'Charging': CHARGING,
+    'SuspendedEV': CHARGING,
+    'SuspendedEVSE': CHARGING,
+    'Finishing': CHARGING,
+    'Reserved': UNAVAILABLE,
+    'Unavailable': UNAVAILABLE,
+    'Faulted': UNAVAILABLE,
+}
+
+RECORD_COLUMNS = ['Station ID', 'Chargers', 'Available', 'In Use',
+                  'Current Load (kW)', 'Temperature (°C)']
+
+
+def meter_values(connector_id, timestamp, power_kw=None, temperature=None):
+    """Payload of a MeterValues call with power and/or temperature samples"""
+    sampled = []
+    if power_kw is not None:
+        sampled.append({'value': f"{power_kw:.1f}", 'measurand': 'Power.Active.Import', 'unit': 'kW'})
+    if temperature is not None:
+        sampled.append({'value': f"{temperature:.1f}", 'measurand': 'Temperature', 'unit': 'Celsius'})
+    return {'connectorId': connector_id, 'meterValue': [{'timestamp': timestamp, 'sampledValue': sampled}]}
+
+
+def status_notification(connector_id, timestamp, status):
+    return {'connectorId': connector_id, 'errorCode': 'NoError', 'status': status, 'timestamp': timestamp}
+
+
+class TelemetrySource(abc.ABC):
+    """Interface for telemetry feeds"""
+
+    @abc.abstractmethod
+    def batches(self):
+        """Async iterator of lists of ``(charge_point, action, payload)`` tuples"""
+
+
+class Simulator:
+    """Fleet of simulated charge points emitting OCPP-style messages"""
+
+    def __init__(self, station_ids, connectors, max_power=None, seed=None):
+        self.station_ids = list(station_ids)
+        n = len(self.station_ids)
+        self.connectors = np.broadcast_to(np.asarray(connectors, dtype=np.int64), (n,)).copy()
+        max_power = np.full(n, 150.0) if max_power is None else np.asarray(max_power, dtype=float)
+        self._rng = np.random.default_rng(seed)
+        width = int(self.connectors.max())
+        self._valid = np.arange(width)[None, :] < self.connectors[:, None]
+        self._charging = self._valid & (self._rng.random((n, width)) < 0.6)
+        # Per-connector share of the station cap, so the station stays under it
+        self._connector_kw = (max_power / self.connectors)[:, None]
+        self._temperature = self._rng.uniform(30, 38, n)
+
+    @property
+    def connector_count(self):
+        return int(self.connectors.sum())
+
+    def step(self, change_rate=0.02):
+        """Advance one tick and return the messages it produced"""
+        rng = self._rng
+        now = datetime.now(timezone.utc).isoformat(timespec='seconds')
+        flips = self._valid & (rng.random(self._charging.shape) < change_rate)
+        self._charging ^= flips
+        power = np.where(self._charging, self._connector_kw * rng.uniform(0.4, 1.0, self._charging.shape), 0.0)
+        self._temperature = np.clip(self._temperature + rng.normal(0, 0.3, len(self._temperature)), 22, 50)
+
+        messages = []
+        for s, c in zip(*np.nonzero(flips)):
+            status = 'Charging' if self._charging[s, c] else 'Available'
+            messages.append((self.station_ids[s], 'StatusNotification', status_notification(int(c) + 1, now, status)))
+        for s, c in zip(*np.nonzero(self._valid)):
+            messages.append((self.station_ids[s], 'MeterValues', meter_values(int(c) + 1, now, power_kw=power[s, c])))
+        for s, cp in enumerate(self.station_ids):
+            messages.append((cp, 'MeterValues', meter_values(0, now, temperature=self._temperature[s])))
+        return messages
+
+    def boot(self):
+        """Status of every connector plus temperatures, as sent after a reconnect"""
+        now = datetime.now(timezone.utc).isoformat(timespec='seconds')
+        messages = [(self.station_ids[s], 'StatusNotification',
+                     status_notification(int(c) + 1, now, 'Charging' if self._charging[s, c] else 'Available'))
+                    for s, c in zip(*np.nonzero(self._valid))]
+        messages += [(cp, 'MeterValues', meter_values(0, now, temperature=self._temperature[s]))
+                     for s, cp in enumerate(self.station_ids)]
+        return messages
+
+
+class SimulatorSource(TelemetrySource):
+    """In-process simulator feed, one tick every ``interval`` seconds"""
+
+    def __init__(self, simulator, interval=1.0):
+        self.simulator = simulator
+        self.interval = interval
+
+    async def batches(self):
+        yield self.simulator.boot()
+        while True:
+            yield self.simulator.step()
+            await asyncio.sleep(self.interval)
+
+
+class SocketSource(TelemetrySource):
+    """Newline-delimited JSON feed read from a TCP socket"""
+
+    def __init__(self, host, port, batch_size=2048, limit=1 << 20):
+        self.host = host
+        self.port = port
+        self.batch_size = batch_size
+        self.limit = limit
+
+    async def batches(self):
+        reader, writer = await asyncio.open_connection(self.host, self.port, limit=self.limit)
+        try:
+            buffer = b''
+            while True:
+                chunk = await reader.read(self.limit)
+                if not chunk:
+                    break
+                lines = (buffer + chunk).split(b'\n')
+                buffer = lines.pop()
+                batch = []
+                for line in lines:
+                    if not line:
+                        continue
+                    frame = json.loads(line)
+                    _, _, action, payload = frame['call']
+                    batch.append((frame['chargePoint'], action, payload))
+                    if len(batch) >= self.batch_size:
+                        yield batch
+                        batch = []
+                if batch:
+                    yield batch
+        finally:
+            writer.close()
+
+
+class Aggregator:
+    """Latest connector state per station in preallocated arrays.
+
+    Memory is fixed by the station list; messages from unknown charge points
+    are counted and dropped.
+    """
+
+    def __init__(self, station_ids, connectors):
+        self.station_ids = list(station_ids)
+        self._index = {cp: i for i, cp in enumerate(self.station_ids)}
+        n = len(self.station_ids)
+        self.connectors = np.broadcast_to(np.asarray(connectors, dtype=np.int64), (n,)).copy()
+        width = int(self.connectors.max()) + 1  # slot 0 is the charge point itself
+        self._status = np.full((n, width), AVAILABLE, dtype=np.int8)
+        self._power = np.zeros((n, width), dtype=np.float32)
+        self._temperature = np.full(n, np.nan, dtype=np.float32)
+        self._lock = threading.Lock()
+        self.received = 0
+        self.dropped = 0
+
+    def apply(self, batch):
+        """Fold a batch of ``(charge_point, action, payload)`` messages in"""
+        index, status, power, temperature = self._index, self._status, self._power, self._temperature
+        dropped = 0
+        with self._lock:
+            for cp, action, payload in batch:
+                s = index.get(cp)
+                c = payload.get('connectorId', 0)
+                if s is None or c >= status.shape[1]:
+                    dropped += 1
+                    continue
+                if action == 'MeterValues':
+                    for sample in payload['meterValue'][-1]['sampledValue']:
+                        measurand = sample.get('measurand')
+                        if measurand == 'Power.Active.Import':
+                            value = float(sample['value'])
+                            power[s, c] = value / 1000 if sample.get('unit') == 'W' else value
+                        elif measurand == 'Temperature':
+                            temperature[s] = float(sample['value'])
+                elif action == 'StatusNotification':
+                    code = STATUS_CODES.get(payload['status'], UNAVAILABLE)
+                    status[s, c] = code
+                    if code != CHARGING:
+                        power[s, c] = 0.0
+            self.received += len(batch)
+            self.dropped += dropped
+
+    def records(self):
+        """Normalized per-station records as a DataFrame"""
+        with self._lock:
+            status = self._status[:, 1:].copy()
+            load = self._power[:, 1:].sum(axis=1)
+            temperature = self._temperature.copy()
+        valid = np.arange(status.shape[1])[None, :] < self.connectors[:, None]
+        return pd.DataFrame({
+            'Station ID': self.station_ids,
+            'Chargers': self.connectors,
+            'Available': ((status == AVAILABLE) & valid).sum(axis=1),
+            'In Use': ((status == CHARGING) & valid).sum(axis=1),
+            'Current Load (kW)': load.round().astype(int),
+            'Temperature (°C)': np.nan_to_num(temperature).round().astype(int),
+        }, columns=RECORD_COLUMNS)
+
+
+class IngestService:
+    """Drives a ``TelemetrySource`` into an ``Aggregator`` on a background loop"""
+
+    def __init__(self, source, aggregator, max_pending=64):
+        self.source = source
+        self.aggregator = aggregator
+        self.max_pending = max_pending
+        self._thread = None
+        self._loop = None
+        self._task = None
+        self.error = None
+        # Set once the first batch has been applied
+        self.ready = threading.Event()
+
+    def records(self):
+        return self.aggregator.records()
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            # The task exists before the thread starts, so stop() can always cancel it
+            self._loop = asyncio.new_event_loop()
+            self._task = self._loop.create_task(self.run())
+            self.error = None
+            self._thread = threading.Thread(target=self._run, name="telemetry-ingest", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        if self._thread is not None and self._thread.is_alive():
+            self._loop.call_soon_threadsafe(self._task.cancel)
+            self._thread.join()
+
+    def _run(self):
+        loop = self._loop
+        try:
+            loop.run_until_complete(self._task)
+            self.error = ConnectionError('feed closed')
+        except asyncio.CancelledError:
+            pass  # stop()
+        except Exception as exc:  # surfaced through .error, the dashboard keeps the last state
+            self.error = exc
+        finally:
+            loop.run_until_complete(loop.shutdown_asyncgens())
+            loop.close()
+
+    async def run(self):
+        # A bounded queue between reader and aggregator applies back-pressure
+        queue = asyncio.Queue(self.max_pending)
+
+        async def consume():
+            while True:
+                batch = await queue.get()
+                if batch is None:
+                    return
+                self.aggregator.apply(batch)
+                self.ready.set()
+
+        consumer = asyncio.ensure_future(consume())
+        try:
+            async for batch in self.source.batches():
+                await queue.put(batch)
+        finally:
+            await queue.put(None)
+            await consumer
+
+
+def encode(messages, counter=0):
+    """Encode messages as newline-delimited JSON frames"""
+    lines = []
+    for i, (cp, action, payload) in enumerate(messages, counter):
+        lines.append(json.dumps({'chargePoint': cp, 'call': [2, str(i), action, payload]}, separators=(',', ':')))
+    return ('\n'.join(lines) + '\n').encode()
+
+
+async def serve_simulator(simulator, host='127.0.0.1', port=8765, rate=10000.0, limit=None):
+    """Serve the simulator stream to every client that connects.
+
+    ``rate`` caps messages per second per client; ``limit`` stops after that
+    many messages, which is what the benchmark uses.
+    """
+    async def handle(reader, writer):
+        sent = 0
+        data = encode(simulator.boot())
+        while True:
+            started = time.perf_counter()
+            writer.write(data)
+            await writer.drain()
+            count = data.count(b'\n')
+            sent += count
+            if limit is not None and sent >= limit:
+                break
+            data = encode(simulator.step(), sent)
+            await asyncio.sleep(max(0.0, count / rate - (time.perf_counter() - started)))
+        writer.close()
+
+    return await asyncio.start_server(handle, host, port)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OCPP-style telemetry simulator")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("simulate", help="serve simulated charge point messages over TCP")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=8765)
+    p.add_argument("--rate", type=float, default=10000.0, help="messages per second per client")
+    args = parser.parse_args()
+
+    # The dashboard's fleet (EV_STATIONS included), so every message lands on a known station
+    from telemetry import STATIONS
+    simulator = Simulator(STATIONS['Station ID'], STATIONS['Chargers'], STATIONS['Power (kW)'])
+
+    async def run():
+        server = await serve_simulator(simulator, args.host, args.port, args.rate)
+        print(f"Serving {simulator.connector_count} connectors on {args.host}:{args.port}")
+        async with server:
+            await server.serve_forever()
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Candidate EV charging sites used by the planning views."""
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+PRIORITIES = ['Very High', 'High', 'Medium']
+
+
+# Bangalore location data with strategic EV charging station locations
+def bangalore_locations():
+    locations = pd.DataFrame({
+        'Location Name': [
+            'Koramangala (Proposed)',
+            'Whitefield Tech Park (Proposed)',
+            'Indiranagar Main (Proposed)',
+            'Electronic City Phase 1 (Proposed)',
+            'MG Road Metro (Proposed)',
+            'HSR Layout (Proposed)',
+            'Yeshwanthpur Metro (Proposed)',
+            'Bellandur ORR (Proposed)',
+            'Hebbal Flyover (Proposed)',
+            'JP Nagar (Proposed)',
+            'Malleshwaram (Proposed)',
+            'Sarjapur Road (Proposed)',
+            'KR Puram Railway (Proposed)',
+            'Airport Road (Proposed)',
+            'Jayanagar 4th Block (Proposed)'
+        ],
+        'Latitude': [12.9352, 12.9698, 12.9716, 12.8456, 12.9716, 12.9116, 13.0280, 12.9266, 13.0358, 12.9088, 13.0032, 12.9100, 13.0054, 13.0569, 12.9250],
+        'Longitude': [77.6245, 77.7499, 77.6412, 77.6603, 77.5946, 77.6382, 77.5558, 77.6799, 77.5971, 77.5850, 77.5701, 77.6970, 77.6966, 77.6412, 77.5833],
+        'Area Type': [
+            'Residential + Commercial',
+            'IT Hub',
+            'Commercial + Residential',
+            'IT Hub',
+            'Metro Station + Commercial',
+            'Residential + Commercial',
+            'Metro Station + Transport Hub',
+            'IT Hub + Highway',
+            'Highway Junction',
+            'Residential',
+            'Residential + Commercial',
+            'IT Hub + Residential',
+            'Railway Station + Industrial',
+            'Airport Corridor',
+            'Residential + Commercial'
+        ],
+        'Priority': ['High', 'Very High', 'High', 'Very High', 'Very High', 'High', 'High', 'Very High', 'High', 'Medium', 'Medium', 'Very High', 'High', 'Very High', 'Medium'],
+        'Estimated Daily Traffic': [8500, 12000, 9500, 15000, 11000, 7500, 9000, 13000, 10000, 6500, 6000, 11500, 8000, 14000, 6800],
+        'Nearby Landmarks': [
+            'Forum Mall, Restaurants',
+            'ITPL, Tech Parks',
+            'Metro, CMH Road',
+            'Infosys Campus, Tech Parks',
+            'MG Road Metro, Brigade Road',
+            'BDA Complex, Parks',
+            'Metro Station, Railway',
+            'Eco Space, Manyata Tech Park',
+            'Metro, Manyata Tech Park',
+            'Metro Station, Residential',
+            'Orion Mall, Residential',
+            'Tech Parks, Restaurants',
+            'Railway Station',
+            'Manyata Tech Park',
+            'Commercial Street nearby'
+        ],
+        'Recommended Chargers': [12, 20, 15, 25, 18, 10, 15, 22, 16, 8, 8, 20, 12, 24, 10],
+        'Investment (Lakhs)': [180, 300, 225, 375, 270, 150, 225, 330, 240, 120, 120, 300, 180, 360, 150],
+        'Expected ROI (months)': [18, 14, 16, 12, 15, 20, 18, 13, 16, 22, 21, 14, 19, 13, 20]
+    })
+    return locations
+
+
+def synthetic_locations(n, seed=0):
+    """``n`` made-up candidate sites around Bangalore with the same columns.
+
+    Rows are sampled from the real sites and jittered by a few kilometres, so
+    aggregate views look plausible at any scale.
+    """
+    rng = np.random.default_rng(seed)
+    base = bangalore_locations()
+    rows = base.iloc[rng.integers(0, len(base), n)].reset_index(drop=True)
+    rows['Location Name'] = [f"Site {i + 1:05d} (Proposed)" for i in range(n)]
+    rows['Latitude'] = (rows['Latitude'] + rng.normal(0, 0.04, n)).round(5)
+    rows['Longitude'] = (rows['Longitude'] + rng.normal(0, 0.04, n)).round(5)
+    rows['Estimated Daily Traffic'] = (rows['Estimated Daily Traffic'] * rng.uniform(0.7, 1.3, n)).astype(int)
+    return rows
+
+
+def data_version(df):
+    """Short content hash of a DataFrame, used as a cache key"""
+    digest = hashlib.sha1(pd.util.hash_pandas_object(df, index=True).values.tobytes())
+    digest.update(','.join(map(str, df.columns)).encode())
+    return digest.hexdigest()[:16]
@@ -0,0 +1,106 @@
+"""Folium maps for the Location Map tab.
+
+Sites are shipped to the browser as one compact array and drawn by a single
+FastMarkerCluster layer; marker colour and popups are built client-side, the
+popup only when a marker is clicked. ``render_html`` turns the map into the
+static HTML the tab caches per filter selection and data version.
+"""
+import html
+
+import folium
+import numpy as np
+import pandas as pd
+from folium.plugins import FastMarkerCluster
+
+BANGALORE_CENTER = [12.9716, 77.5946]
+PRIORITY_COLORS = {'Very High': 'red', 'High': 'orange', 'Medium': 'blue'}
+
+# Above this many sites nearby markers are clustered
+CLUSTER_THRESHOLD = 500
+
+POPUP_FIELDS = ['Location Name', 'Priority', 'Area Type', 'Estimated Daily Traffic', 'Recommended Chargers',
+                'Investment (Lakhs)', 'Expected ROI (months)', 'Nearby Landmarks']
+
+# Row layout: lat, lon, colour, then POPUP_FIELDS in order
+MARKER_CALLBACK = """
+var callback = function (row) {
+    var marker = L.circleMarker(new L.LatLng(row[0], row[1]), {
+        radius: 8, color: row[2], fillColor: row[2], fillOpacity: 0.8, weight: 1
+    });
+    marker.bindTooltip(row[3]);
+    marker.bindPopup(function () {
+        return '<b>' + row[3] + '</b><br>' +
+            'Priority: ' + row[4] + '<br>' +
+            'Area: ' + row[5] + '<br>' +
+            'Daily Traffic: ' + row[6].toLocaleString('en-IN') + '<br>' +
+            'Chargers: ' + row[7] + '<br>' +
+            'Investment: ₹' + row[8] + ' L<br>' +
+            'ROI: ' + row[9] + ' months<br>' +
+            'Landmarks: ' + row[10];
+    }, {maxWidth: 300});
+    return marker;
+};
+"""
+
+
+def marker_rows(locations):
+    """One JSON-friendly list per site in the layout MARKER_CALLBACK expects"""
+    table = pd.DataFrame({
+        'lat': locations['Latitude'].astype(float),
+        'lon': locations['Longitude'].astype(float),
+        'color': locations['Priority'].map(PRIORITY_COLORS),
+    })
+    for field in POPUP_FIELDS:
+        column = locations[field]
+        table[field] = column if pd.api.types.is_numeric_dtype(column) else column.astype(str).map(html.escape)
+    return table.values.tolist()
+
+
+def build_location_map(locations, cluster_threshold=CLUSTER_THRESHOLD):
+    """Map with every site in ``locations`` as one client-side marker layer"""
+    m = folium.Map(location=BANGALORE_CENTER, zoom_start=11, prefer_canvas=True)
+    options = {'chunkedLoading': True}
+    if len(locations) <= cluster_threshold:
+        options['disableClusteringAtZoom'] = 0
+    FastMarkerCluster(marker_rows(locations), callback=MARKER_CALLBACK, name='Proposed sites', **options).add_to(m)
+    return m
+
+
+def render_html(m):
+    """Standalone HTML document for a map"""
+    return m.get_root().render()
+
+
+def add_coverage_layer(m, stations, radius_km, gaps=None):
+    """Existing stations with their ``radius_km`` catchment, plus coverage gap cells.
+
+    ``gaps`` is ``(lat, lon, (dlat, dlon))`` as returned by geo.coverage_gaps;
+    the cells are drawn as one GeoJSON layer.
+    """
+    layer = folium.FeatureGroup(name=f'Existing stations ({radius_km:g} km)')
+    for _, station in stations.iterrows():
+        folium.Circle(
+            location=[station['Latitude'], station['Longitude']],
+            radius=radius_km * 1000,
+            color='#10b981', fill=True, fill_opacity=0.15, weight=2,
+            tooltip=f"{station['Station ID']} - {station['Location']}",
+        ).add_to(layer)
+    layer.add_to(m)
+
+    if gaps is not None and len(gaps[0]):
+        lat, lon, (dlat, dlon) = gaps
+        south, north = lat - dlat / 2, lat + dlat / 2
+        west, east = lon - dlon / 2, lon + dlon / 2
+        rings = np.stack([
+            np.column_stack([west, south]), np.column_stack([east, south]), np.column_stack([east, north]),
+            np.column_stack([west, north]), np.column_stack([west, south]),
+        ], axis=1).round(5).tolist()
+        folium.GeoJson(
+            {'type': 'FeatureCollection', 'features': [
+                {'type': 'Feature', 'properties': {}, 'geometry': {'type': 'Polygon', 'coordinates': [ring]}}
+                for ring in rings]},
+            name='Coverage gaps',
+            style_function=lambda _: {'color': '#ef4444', 'weight': 0, 'fillOpacity': 0.25},
+        ).add_to(m)
+    folium.LayerControl(collapsed=True).add_to(m)
+    return m
@@ -0,0 +1,297 @@
+"""Budgeted site selection for proposed charging locations.
+
+Demand points (weighted by daily traffic) are covered by an open site within
+``radius_km``. Opening a site costs a fixed part plus a per-charger part of
+its quoted ``Investment (Lakhs)``, with chargers sized to the demand the site
+serves. ``solve`` maximises covered demand under a budget with greedy +
+swap local search, or with a MILP through SciPy's HiGHS interface, and
+reports an optimality gap against the LP relaxation.
+"""
+import time
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from scipy.optimize import Bounds, LinearConstraint, linprog, milp
+
+from geo import GeoIndex, haversine_km
+
+# Share of a site's quoted investment that does not scale with chargers
+FIXED_SHARE = 0.3
+MIN_CHARGERS = 2
+
+
+@dataclass
+class PlanInputs:
+    budget: float = 1500.0          # Lakhs
+    radius_km: float = 3.0
+    ev_share: float = 0.02          # share of daily traffic that needs a charge
+    sessions_per_charger: float = 12.0
+    max_charger_factor: float = 1.5  # cap relative to the recommended count
+
+
+@dataclass
+class Plan:
+    selected: np.ndarray      # candidate indices
+    chargers: np.ndarray      # per selected site
+    cost: np.ndarray          # per selected site, Lakhs
+    served: np.ndarray        # demand weight served by each selected site
+    covered: float
+    total_demand: float
+    upper_bound: float
+    method: str
+    solve_seconds: float
+    note: str = ''
+
+    @property
+    def coverage(self):
+        return self.covered / self.total_demand if self.total_demand else 0.0
+
+    @property
+    def gap(self):
+        return max(0.0, (self.upper_bound - self.covered) / self.upper_bound) if self.upper_bound else 0.0
+
+
+def coverage_matrix(demand_lat, demand_lon, site_lat, site_lon, radius_km):
+    """Sparse ``demand x sites`` CSR matrix of distances (km) for pairs within ``radius_km``.
+
+    Pairs at distance zero are stored as a tiny positive number so they are
+    not dropped.
+    """
+    lists = GeoIndex(site_lat, site_lon).within(demand_lat, demand_lon, radius_km)
+    counts = np.fromiter((len(l) for l in lists), dtype=np.int64, count=len(lists))
+    rows = np.repeat(np.arange(len(lists)), counts)
+    cols = np.fromiter((j for l in lists for j in l), dtype=np.int64, count=int(counts.sum()))
+    dist = haversine_km(np.asarray(demand_lat)[rows], np.asarray(demand_lon)[rows],
+                        np.asarray(site_lat)[cols], np.asarray(site_lon)[cols])
+    return sparse.csr_matrix((np.maximum(dist, 1e-9), (rows, cols)), shape=(len(lists), len(site_lat)))
+
+
+class SiteProblem:
+    """Precomputed arrays for one set of candidates, demand points and inputs"""
+
+    def __init__(self, candidates, demand_lat, demand_lon, demand_weight, inputs, covered_already=None):
+        self.candidates = candidates
+        self.inputs = inputs
+        self.weight = np.asarray(demand_weight, dtype=float) * inputs.ev_share
+        if covered_already is not None:
+            self.weight = np.where(covered_already, 0.0, self.weight)
+        self.distance = coverage_matrix(demand_lat, demand_lon, candidates['Latitude'].to_numpy(),
+                                        candidates['Longitude'].to_numpy(), inputs.radius_km)
+        self.cover = (self.distance > 0).astype(np.float64).tocsr()
+        self.cover_t = self.cover.T.tocsr()
+        # All (demand, site) pairs ordered by demand point, then distance, for nearest-site lookups
+        coo = self.distance.tocoo()
+        order = np.lexsort((coo.data, coo.row))
+        self._pair_demand, self._pair_site = coo.row[order], coo.col[order]
+
+        investment = candidates['Investment (Lakhs)'].to_numpy(dtype=float)
+        recommended = candidates['Recommended Chargers'].to_numpy(dtype=float)
+        self.fixed_cost = investment * FIXED_SHARE
+        self.charger_cost = investment * (1 - FIXED_SHARE) / recommended
+        self.max_chargers = np.maximum(MIN_CHARGERS, np.floor(recommended * inputs.max_charger_factor))
+
+    @property
+    def n_sites(self):
+        return self.cover.shape[1]
+
+    def chargers_for(self, served, sites=None):
+        sites = slice(None) if sites is None else sites
+        needed = np.ceil(served / self.inputs.sessions_per_charger)
+        return np.clip(needed, MIN_CHARGERS, self.max_chargers[sites])
+
+    def cost_for(self, served, sites=None):
+        """Cost of opening ``sites`` when each serves ``served`` demand"""
+        sites = slice(None) if sites is None else sites
+        return self.fixed_cost[sites] + self.charger_cost[sites] * self.chargers_for(served, sites)
+
+    def evaluate(self, selected):
+        """Covered demand and per-site served demand, assigning points to their nearest open site"""
+        selected = np.asarray(selected, dtype=np.int64)
+        position = np.full(self.n_sites, -1)
+        position[selected] = np.arange(len(selected))
+        # First open site in each demand point's distance-ordered pair list
+        open_pair = position[self._pair_site] >= 0
+        demand = self._pair_demand[open_pair]
+        first = np.r_[True, demand[1:] != demand[:-1]] if len(demand) else np.zeros(0, dtype=bool)
+        demand = demand[first]
+        site = position[self._pair_site[open_pair][first]]
+        served = np.bincount(site, weights=self.weight[demand], minlength=len(selected))
+        return float(self.weight[demand].sum()), served
+
+    def upper_bound(self, time_limit=5.0):
+        """Bound on covered demand for the optimality gap.
+
+        Uses the LP relaxation of budgeted max-coverage at minimum site cost
+        (an open site always serves the points for which it is the nearest
+        candidate of all, so it needs at least the chargers for those);
+        if HiGHS does not finish within ``time_limit`` seconds, falls back to
+        the fractional knapsack over each site's standalone coverage, which
+        is looser but also valid because coverage is submodular.
+        """
+        n_sites = self.n_sites
+        useful = self.weight > 0
+        cover = self.cover[useful]
+        m = cover.shape[0]
+        if m == 0:
+            return 0.0
+        _, own_demand = self.evaluate(np.arange(n_sites))
+        min_cost = self.cost_for(own_demand)
+        # Variables: x (sites) then y (demand points); maximise w.y
+        c = np.concatenate([np.zeros(n_sites), -self.weight[useful]])
+        link = sparse.hstack([-cover, sparse.identity(m)]).tocsr()          # y_i - sum x_j <= 0
+        budget = sparse.hstack([sparse.csr_matrix(min_cost), sparse.csr_matrix((1, m))]).tocsr()
+        a_ub = sparse.vstack([link, budget]).tocsr()
+        b_ub = np.concatenate([np.zeros(m), [self.inputs.budget]])
+        result = linprog(c, A_ub=a_ub, b_ub=b_ub, bounds=(0, 1), method='highs',
+                         options={'time_limit': time_limit})
+        if result.status == 0:
+            return float(-result.fun)
+
+        value = self.cover_t @ self.weight
+        order = np.argsort(-value / min_cost)
+        spent = np.cumsum(min_cost[order])
+        full = spent <= self.inputs.budget
+        bound = value[order][full].sum()
+        if not full.all():
+            k = int(np.argmin(full))
+            remaining = self.inputs.budget - (spent[k - 1] if k else 0.0)
+            bound += value[order][k] * remaining / min_cost[order][k]
+        return float(min(bound, self.weight.sum()))
+
+
+def greedy(problem, selected=()):
+    """Add the site with the best covered-demand gain per Lakh until the budget runs out.
+
+    Starts from the sites in ``selected``, if any. Gains are kept up to date
+    incrementally: when a site opens, only the sites sharing newly covered
+    demand points lose gain.
+    """
+    selected = list(selected)
+    is_open = np.zeros(problem.n_sites, dtype=bool)
+    is_open[selected] = True
+    uncovered = (problem.weight > 0) & (problem.cover[:, is_open].sum(axis=1).A1 == 0)
+    gain = problem.cover_t @ (problem.weight * uncovered)
+    spent = plan_cost(problem, selected)[2] if selected else 0.0
+    while True:
+        cost = problem.cost_for(gain)
+        ratio = np.where(~is_open & (gain > 0) & (spent + cost <= problem.inputs.budget), gain / cost, -np.inf)
+        j = int(np.argmax(ratio))
+        if not np.isfinite(ratio[j]):
+            break
+        selected.append(j)
+        is_open[j] = True
+        spent += cost[j]
+        newly = problem.cover_t.indices[problem.cover_t.indptr[j]:problem.cover_t.indptr[j + 1]]
+        newly = newly[uncovered[newly]]
+        uncovered[newly] = False
+        gain -= problem.cover[newly].T @ problem.weight[newly]
+        np.maximum(gain, 0.0, out=gain)
+    return selected
+
+
+def plan_cost(problem, selected):
+    covered, served = problem.evaluate(selected)
+    return covered, served, problem.cost_for(served, np.asarray(selected, dtype=np.int64)).sum()
+
+
+def local_search(problem, selected, max_passes=3):
+    """Swap an open site for a closed one while that covers more demand within budget"""
+    selected = list(selected)
+    best, _, _ = plan_cost(problem, selected)
+    for _ in range(max_passes):
+        improved = False
+        for position in range(len(selected)):
+            without = selected[:position] + selected[position + 1:]
+            covered_without, _ = problem.evaluate(without)
+            # Demand left uncovered once this site closes, and what each closed site would pick up
+            counts = problem.cover[:, without] @ np.ones(len(without)) if without else np.zeros(problem.cover.shape[0])
+            gain = problem.cover_t @ (problem.weight * (counts == 0))
+            gain[selected] = -np.inf
+            for k in np.argsort(gain)[::-1][:5]:
+                if covered_without + gain[k] <= best + 1e-9:
+                    break
+                candidate = without + [int(k)]
+                covered, _, cost = plan_cost(problem, candidate)
+                if cost <= problem.inputs.budget and covered > best + 1e-9:
+                    selected, best, improved = candidate, covered, True
+                    break
+        if not improved:
+            break
+    return selected
+
+
+def repair(problem, selected):
+    """Drop the least cost-effective sites until the sized plan fits the budget.
+
+    Reassigning demand to the nearest open site can shift a few chargers
+    between sites after greedy priced them, so check the final plan.
+    """
+    selected = list(selected)
+    while selected:
+        _, served, cost = plan_cost(problem, selected)
+        if cost <= problem.inputs.budget + 1e-9:
+            break
+        site_cost = problem.cost_for(served, np.asarray(selected, dtype=np.int64))
+        selected.pop(int(np.argmin(served / site_cost)))
+    return selected
+
+
+def solve_milp(problem, time_limit=30.0):
+    """Exact budgeted max-coverage with every site priced at its maximum charger count.
+
+    Pricing at the maximum keeps the sized plan within budget, so the MILP
+    answer is exact for that (conservative) cost model. Sized at the
+    chargers they need, its sites usually leave budget over; ``solve``
+    spends that with ``greedy`` and then runs the same improvement steps.
+    """
+    useful = problem.weight > 0
+    cover = problem.cover[useful]
+    m, n = cover.shape
+    max_cost = problem.fixed_cost + problem.charger_cost * problem.max_chargers
+    c = np.concatenate([np.zeros(n), -problem.weight[useful]])
+    constraints = [
+        LinearConstraint(sparse.hstack([-cover, sparse.identity(m)]).tocsr(), -np.inf, 0),
+        LinearConstraint(sparse.hstack([sparse.csr_matrix(max_cost), sparse.csr_matrix((1, m))]).tocsr(), 0, problem.inputs.budget),
+    ]
+    integrality = np.concatenate([np.ones(n), np.zeros(m)])
+    result = milp(c, constraints=constraints, integrality=integrality, bounds=Bounds(0, 1),
+                  options={'time_limit': time_limit})
+    if result.x is None:
+        return [], result.message
+    return [int(j) for j in np.nonzero(result.x[:n] > 0.5)[0]], '' if result.status == 0 else result.message
+
+
+def solve(candidates, demand_lat, demand_lon, demand_weight, inputs=None, method='greedy', covered_already=None):
+    """Choose sites and charger counts; ``method`` is 'greedy' or 'milp'"""
+    inputs = inputs or PlanInputs()
+    start = time.perf_counter()
+    problem = SiteProblem(candidates, demand_lat, demand_lon, demand_weight, inputs, covered_already)
+    note = ''
+    selected = []
+    if method == 'milp':
+        selected, note = solve_milp(problem)
+    selected = repair(problem, local_search(problem, greedy(problem, selected)))
+    selected = np.asarray(selected, dtype=np.int64)
+    covered, served = problem.evaluate(selected)
+    chargers = problem.chargers_for(served, selected)
+    cost = problem.cost_for(served, selected)
+    solve_seconds = time.perf_counter() - start
+    return Plan(selected=selected, chargers=chargers.astype(int), cost=cost, served=served, covered=covered,
+                total_demand=float(problem.weight.sum()), upper_bound=problem.upper_bound(),
+                method=method, solve_seconds=solve_seconds, note=note)
+
+
+def plan_table(candidates, plan):
+    """Selected sites with planned vs quoted chargers and investment"""
+    chosen = candidates.iloc[plan.selected]
+    return pd.DataFrame({
+        'Location Name': chosen['Location Name'].values,
+        'Priority': chosen['Priority'].values,
+        'Daily EV Demand': plan.served.round(1),
+        'Planned Chargers': plan.chargers,
+        'Recommended Chargers': chosen['Recommended Chargers'].values,
+        'Planned Investment (Lakhs)': plan.cost.round(1),
+        'Quoted Investment (Lakhs)': chosen['Investment (Lakhs)'].values,
+    }).sort_values('Daily EV Demand', ascending=False, ignore_index=True)
@@ -0,0 +1,101 @@
+"""Process pools that are safe to start from inside the Streamlit server.
+
+The server is multi-threaded, so forking it can copy a lock some other thread
+holds and deadlock the child. Workers here come from a ``forkserver`` (or
+``spawn`` where that is unavailable): a clean single-threaded process that
+preloads the simulation modules and forks the workers.
+
+Fresh workers re-import the parent's ``__main__`` by path. Under Streamlit
+that is a stand-in module whose ``__file__`` is the app script, so a worker
+would run the whole dashboard. Worker processes are therefore launched with
+a blank ``__main__`` in place. Worker functions must live in importable
+modules (``sweep``, ``queueing``), never in the app script or a page.
+
+``shared_pool`` keeps one pool per worker count for the life of the process,
+so repeated simulations do not pay for starting workers each time. The pools
+are shut down at exit, before multiprocessing joins the process's children.
+"""
+import multiprocessing as mp
+import os
+import sys
+import threading
+import types
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import util
+
+# Imported once by the fork server, so each worker starts with them loaded
+PRELOAD = ['numpy', 'pandas', 'sweep', 'queueing']
+
+_MAIN_LOCK = threading.Lock()
+_BLANK_MAIN = types.ModuleType('__main__')
+_POOLS = {}
+_POOLS_LOCK = threading.Lock()
+
+
+def _start_without_main(process, start):
+    # Only the launch reads __main__; put back the module the script runner
+    # installed unless another rerun has installed its own meanwhile
+    with _MAIN_LOCK:
+        main = sys.modules['__main__']
+        sys.modules['__main__'] = _BLANK_MAIN
+        try:
+            start(process)
+        finally:
+            if sys.modules['__main__'] is _BLANK_MAIN:
+                sys.modules['__main__'] = main
+
+
+if 'forkserver' in mp.get_all_start_methods():
+    class _Process(mp.context.ForkServerProcess):
+        def start(self):
+            _start_without_main(self, mp.context.ForkServerProcess.start)
+
+    class _Context(mp.context.ForkServerContext):
+        Process = _Process
+else:
+    class _Process(mp.context.SpawnProcess):
+        def start(self):
+            _start_without_main(self, mp.context.SpawnProcess.start)
+
+    class _Context(mp.context.SpawnContext):
+        Process = _Process
+
+_CONTEXT = _Context()
+
+
+def context():
+    """Multiprocessing context for ``ProcessPoolExecutor(mp_context=...)``"""
+    if _CONTEXT._name == 'forkserver':
+        _CONTEXT.set_forkserver_preload(PRELOAD)
+    return _CONTEXT
+
+
+def shared_pool(workers=None):
+    """The process-wide pool with ``workers`` processes (all cores by default), started on first use"""
+    workers = workers or os.cpu_count()
+    with _POOLS_LOCK:
+        if not _POOLS:
+            # In a multiprocessing worker (e.g. benchmark.py app) exit joins every child process, which would
+            # wait forever on idle pool workers. Run first, while the pools' queues (priority 10) are still open.
+            util.Finalize(None, shutdown_pools, exitpriority=100)
+        if workers not in _POOLS:
+            _POOLS[workers] = ProcessPoolExecutor(workers, mp_context=context())
+        return _POOLS[workers]
+
+
+def discard_pool(pool):
+    """Forget a broken shared pool so the next ``shared_pool`` call starts a new one"""
+    with _POOLS_LOCK:
+        for workers, shared in list(_POOLS.items()):
+            if shared is pool:
+                del _POOLS[workers]
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def shutdown_pools():
+    """Stop every shared pool and its workers"""
+    with _POOLS_LOCK:
+        shared = list(_POOLS.values())
+        _POOLS.clear()
+    for pool in shared:
+        pool.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,200 @@
+"""Discrete-event queueing simulation for charger sizing and wait times.
+
+Each site is a FIFO queue in front of ``c`` identical chargers. EV arrivals
+are Poisson with a time-of-day profile, scaled from the site's estimated
+daily traffic. A session lasts its energy need divided by the lower of
+vehicle and charger power, plus a plug-in overhead. The charger state is a
+heap of ``c`` free-at times; every arrival takes the charger that frees up
+first, so each event costs one heap replace.
+
+A year of arrivals is split into independent replications. Sites x
+replications run on a process pool, and the spread across replications gives
+the confidence interval on the mean wait. Sizing searches for the smallest
+charger count whose wait quantile meets the SLA. The search runs on a
+shorter horizon and reuses the same arrivals for every candidate count, so
+the wait is monotone in the count.
+"""
+import heapq
+import time
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+import pools
+
+# Share of a day's arrivals in each hour, peaking at the commutes
+HOURLY_PROFILE = np.array([0.4, 0.3, 0.2, 0.2, 0.3, 0.6, 1.2, 2.0, 2.4, 2.0, 1.6, 1.5,
+                           1.6, 1.5, 1.4, 1.5, 1.8, 2.3, 2.6, 2.4, 1.9, 1.4, 0.9, 0.6])
+HOURLY_PROFILE = HOURLY_PROFILE / HOURLY_PROFILE.sum()
+VEHICLE_KW = np.array([30.0, 50.0, 60.0, 100.0, 150.0])
+VEHICLE_SHARE = np.array([0.25, 0.35, 0.2, 0.15, 0.05])
+# Wait-time histogram edges in minutes; the first bin is "no wait"
+WAIT_BINS = np.array([0, 1e-9, 1, 2, 5, 10, 15, 20, 30, 45, 60, 90, 120, np.inf])
+WAIT_LABELS = ['0', '<1', '1-2', '2-5', '5-10', '10-15', '15-20', '20-30', '30-45', '45-60', '60-90', '90-120', '120+']
+
+
+@dataclass(frozen=True)
+class QueueInputs:
+    ev_share: float = 0.02          # share of daily traffic that stops to charge, as in planning.PlanInputs
+    energy_kwh: float = 25.0        # mean energy per session
+    charger_kw: float = 60.0
+    overhead_min: float = 5.0       # plug-in, payment and leaving the bay
+    sla_wait_min: float = 10.0
+    sla_quantile: float = 0.9
+    days: int = 365                 # total simulated days, split across replications
+    replications: int = 4
+    sizing_days: int = 28
+    seed: int = 0
+
+
+@dataclass
+class QueueReport:
+    daily_sessions: np.ndarray
+    chargers: np.ndarray        # simulated charger count per site
+    mean_wait: np.ndarray       # minutes, mean over replications
+    mean_wait_ci: np.ndarray    # 95% half-width across replications
+    p50_wait: np.ndarray
+    p90_wait: np.ndarray
+    p99_wait: np.ndarray
+    utilization: np.ndarray
+    histogram: np.ndarray       # sessions per WAIT_BINS bin, per site
+    sla_chargers: np.ndarray    # smallest count meeting the SLA
+    arrivals: int
+    seconds: float
+
+
+def arrival_times(rng, daily_rate, days):
+    """Sorted arrival minutes over ``days`` days"""
+    counts = rng.poisson(daily_rate * HOURLY_PROFILE, (days, 24)).ravel()
+    starts = np.repeat(np.arange(days * 24) * 60.0, counts)
+    return np.sort(starts + rng.random(len(starts)) * 60.0)
+
+
+def service_minutes(rng, n, inputs, charger_kw):
+    """Minutes each of ``n`` sessions occupies a charger"""
+    energy = rng.gamma(4.0, inputs.energy_kwh / 4.0, n)
+    power = np.minimum(rng.choice(VEHICLE_KW, n, p=VEHICLE_SHARE), charger_kw)
+    return energy / power * 60.0 + inputs.overhead_min
+
+
+def fifo_waits(arrivals, service, chargers):
+    """Wait in minutes of each arrival at a FIFO queue with ``chargers`` servers"""
+    free_at = [0.0] * chargers
+    waits = [0.0] * len(arrivals)
+    replace = heapq.heapreplace
+    for i, (arrival, duration) in enumerate(zip(arrivals.tolist(), service.tolist())):
+        first_free = free_at[0]
+        if first_free > arrival:
+            waits[i] = first_free - arrival
+            replace(free_at, first_free + duration)
+        else:
+            replace(free_at, arrival + duration)
+    return np.asarray(waits)
+
+
+def size_chargers(arrivals, service, inputs, start=1):
+    """Smallest charger count whose wait quantile is within the SLA, on one fixed arrival stream"""
+    horizon = arrivals[-1] if len(arrivals) else 1.0
+    low = max(1, start, int(np.ceil(service.sum() / horizon)))
+
+    def meets(c):
+        return np.quantile(fifo_waits(arrivals, service, c), inputs.sla_quantile) <= inputs.sla_wait_min
+
+    high = low
+    while not meets(high):
+        low, high = high + 1, high * 2
+    while low < high:
+        mid = (low + high) // 2
+        if meets(mid):
+            high = mid
+        else:
+            low = mid + 1
+    return high
+
+
+def _run_sites(sites, replication, inputs):
+    """Stats for ``(site index, daily rate, charger kW, chargers)`` rows in one replication"""
+    days = max(1, inputs.days // inputs.replications)
+    out = []
+    for site, daily_rate, charger_kw, chargers in sites:
+        rng = np.random.default_rng([inputs.seed, site, replication])
+        arrivals = arrival_times(rng, daily_rate, days)
+        service = service_minutes(rng, len(arrivals), inputs, charger_kw)
+        waits = fifo_waits(arrivals, service, chargers)
+        sla = 0
+        if replication == 0 and len(arrivals):
+            # A stream of its own, past the replication streams
+            sizing = np.random.default_rng([inputs.seed, site, inputs.replications])
+            sizing_arrivals = arrival_times(sizing, daily_rate, inputs.sizing_days)
+            sla = size_chargers(sizing_arrivals, service_minutes(sizing, len(sizing_arrivals), inputs, charger_kw),
+                                inputs)
+        quantiles = np.quantile(waits, [0.5, 0.9, 0.99]) if len(waits) else np.zeros(3)
+        out.append((site, len(arrivals), waits.mean() if len(waits) else 0.0, quantiles,
+                    service.sum() / (chargers * days * 1440), np.histogram(waits, WAIT_BINS)[0], sla))
+    return replication, out
+
+
+def simulate_sites(daily_sessions, chargers, charger_kw=None, inputs=None, workers=None, sites_per_task=16):
+    """Simulate every site at its given charger count and size it against the SLA"""
+    inputs = inputs or QueueInputs()
+    daily_sessions = np.asarray(daily_sessions, dtype=float)
+    chargers = np.maximum(np.asarray(chargers, dtype=int), 1)
+    n = len(daily_sessions)
+    charger_kw = np.broadcast_to(inputs.charger_kw if charger_kw is None else charger_kw, n)
+    rows = [(i, float(daily_sessions[i]), float(charger_kw[i]), int(chargers[i])) for i in range(n)]
+    tasks = [(rows[s:s + sites_per_task], r, inputs)
+             for r in range(inputs.replications) for s in range(0, n, sites_per_task)]
+
+    reps = inputs.replications
+    mean = np.zeros((reps, n))
+    quantiles = np.zeros((reps, n, 3))
+    utilization = np.zeros((reps, n))
+    histogram = np.zeros((n, len(WAIT_BINS) - 1), dtype=np.int64)
+    sla = np.zeros(n, dtype=int)
+    arrivals = 0
+    start = time.perf_counter()
+    # One long-lived pool per worker count, shared with later calls (see pools.py)
+    pool = pools.shared_pool(workers)
+    try:
+        for replication, results in pool.map(_run_sites, *zip(*tasks)):
+            for site, count, wait, q, util, hist, sized in results:
+                arrivals += count
+                mean[replication, site] = wait
+                quantiles[replication, site] = q
+                utilization[replication, site] = util
+                histogram[site] += hist
+                if replication == 0:
+                    sla[site] = sized
+    except BrokenProcessPool:
+        pools.discard_pool(pool)
+        raise
+    ci = 1.96 * mean.std(axis=0, ddof=1) / np.sqrt(reps) if reps > 1 else np.zeros(n)
+    q = quantiles.mean(axis=0)
+    return QueueReport(daily_sessions=daily_sessions, chargers=chargers, mean_wait=mean.mean(axis=0),
+                       mean_wait_ci=ci, p50_wait=q[:, 0], p90_wait=q[:, 1], p99_wait=q[:, 2],
+                       utilization=utilization.mean(axis=0), histogram=histogram, sla_chargers=sla,
+                       arrivals=arrivals, seconds=time.perf_counter() - start)
+
+
+def simulate_locations(locations, inputs=None, **kwargs):
+    """``simulate_sites`` for proposed sites at their recommended charger counts"""
+    inputs = inputs or QueueInputs()
+    daily = locations['Estimated Daily Traffic'].to_numpy(dtype=float) * inputs.ev_share
+    return simulate_sites(daily, locations['Recommended Chargers'].to_numpy(), inputs=inputs, **kwargs)
+
+
+def queue_table(locations, report):
+    """Per-site wait times at the recommended charger count next to the SLA-sized count"""
+    return pd.DataFrame({
+        'Location Name': locations['Location Name'].values,
+        'Daily Sessions': report.daily_sessions.round(0).astype(int),
+        'Recommended Chargers': report.chargers,
+        'SLA Chargers': report.sla_chargers,
+        'Avg Wait (min)': report.mean_wait.round(1),
+        '± 95% (min)': report.mean_wait_ci.round(1),
+        'P90 Wait (min)': report.p90_wait.round(1),
+        'P99 Wait (min)': report.p99_wait.round(1),
+        'Utilization (%)': (report.utilization * 100).round(1),
+    })
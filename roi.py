@@ -0,0 +1,185 @@
+"""Monte Carlo payback simulation for proposed sites.
+
+Monthly cash flow per site is simulated as one NumPy computation over a
+``sites x scenarios x months`` block. Scenarios are processed in chunks that
+keep each block under ``block_bytes`` and run on a thread pool (NumPy
+releases the GIL). Chunk ``i`` always uses the random stream seeded by
+``(seed, i)``, so results do not depend on the number of threads.
+
+Energy blocks depend only on the demand inputs, so they are kept in an
+LRU cache; changing the tariff, electricity price or opex reuses them and
+only redoes the cash-flow arithmetic.
+"""
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+
+import numpy as np
+
+HOURS_PER_MONTH = 730
+PRIORITY_UTILIZATION = {'Very High': 0.30, 'High': 0.24, 'Medium': 0.18}
+
+
+@dataclass(frozen=True)
+class DemandInputs:
+    """Inputs that shape the energy delivered (and therefore the cached blocks)"""
+    scenarios: int = 10_000
+    months: int = 120
+    charger_kw: float = 30.0           # average delivered power while in use
+    utilization_scale: float = 1.0
+    utilization_spread: float = 0.25   # lognormal sigma of the steady-state level
+    ramp_months: float = 9.0           # mean months to reach steady state
+    monthly_noise: float = 0.15
+    seed: int = 0
+
+
+@dataclass(frozen=True)
+class TariffInputs:
+    """Inputs applied on top of the energy blocks"""
+    tariff: float = 20.0               # ₹/kWh charged to drivers
+    tariff_spread: float = 0.10        # lognormal sigma of the realised tariff
+    electricity_cost: float = 8.0      # ₹/kWh paid to the utility
+    opex_per_charger: float = 15000.0  # ₹ per charger per month
+
+
+def _hash(*parts):
+    digest = hashlib.sha1()
+    for part in parts:
+        digest.update(repr(part).encode())
+        digest.update(b'|')
+    return digest.hexdigest()
+
+
+def site_arrays(locations):
+    """Capex (₹), charger count and base utilization per site"""
+    capex = locations['Investment (Lakhs)'].to_numpy(dtype=np.float64) * 1e5
+    chargers = locations['Recommended Chargers'].to_numpy(dtype=np.float32)
+    traffic = locations['Estimated Daily Traffic'].to_numpy(dtype=np.float64)
+    base = locations['Priority'].map(PRIORITY_UTILIZATION).fillna(0.2).to_numpy(dtype=np.float64)
+    base = base * (traffic / np.median(traffic)) ** 0.3
+    return capex, chargers, base.astype(np.float32)
+
+
+class BlockCache:
+    """LRU of NumPy arrays bounded by total bytes"""
+
+    def __init__(self, max_bytes=512 * 2**20):
+        self.max_bytes = max_bytes
+        self._items = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            value = self._items.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        size = sum(v.nbytes for v in value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._items:
+                return
+            self._items[key] = value
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, old = self._items.popitem(last=False)
+                self._bytes -= sum(v.nbytes for v in old)
+
+
+BLOCKS = BlockCache()
+
+
+def energy_block(base, chargers, demand, chunk, start, stop):
+    """kWh per ``(site, scenario, month)`` for scenarios ``start:stop``, plus tariff shocks.
+
+    Each scenario draws a steady-state utilization level and a linear ramp
+    length per site, and one city-wide demand factor per month shared by all
+    sites.
+    """
+    rng = np.random.default_rng([demand.seed, chunk])
+    n_sites, n = len(base), stop - start
+    months = np.arange(1, demand.months + 1, dtype=np.float32)
+    full_kwh = chargers * np.float32(demand.charger_kw * HOURS_PER_MONTH)
+    level = (base[:, None] * demand.utilization_scale
+             * np.exp(rng.normal(0, demand.utilization_spread, (n_sites, n)))).astype(np.float32)
+    inv_ramp = (1 / np.maximum(rng.gamma(4.0, demand.ramp_months / 4.0, (n_sites, n)), 0.5)).astype(np.float32)
+    market = 1 + np.float32(demand.monthly_noise) * (2 * rng.random((n, demand.months), dtype=np.float32) - 1)
+
+    energy = months * inv_ramp[..., None]
+    np.minimum(energy, 1, out=energy)
+    energy *= (level * full_kwh[:, None])[..., None]
+    energy *= market
+    np.minimum(energy, (0.95 * full_kwh)[:, None, None], out=energy)
+    tariff_shock = rng.normal(0, 1, n).astype(np.float32)
+    return energy, tariff_shock
+
+
+def payback_block(energy, tariff_shock, capex, chargers, tariff):
+    """First month whose cumulative cash covers capex; ``months + 1`` if never"""
+    price = tariff.tariff * np.exp(tariff.tariff_spread * tariff_shock)
+    margin = (price - tariff.electricity_cost).astype(np.float32)
+    cash = energy * margin[:, None]
+    cash -= (chargers * np.float32(tariff.opex_per_charger))[:, None, None]
+    np.cumsum(cash, axis=2, out=cash)
+    paid = cash >= capex.astype(np.float32)[:, None, None]
+    first = paid.argmax(axis=2)
+    ever = np.take_along_axis(paid, first[..., None], axis=2)[..., 0]
+    return np.where(ever, first + 1, energy.shape[2] + 1).astype(np.int16)
+
+
+def simulate_payback(locations, demand=None, tariff=None, block_bytes=64 * 2**20, workers=None, cache=BLOCKS):
+    """Payback month per ``(site, scenario)`` as an int16 array"""
+    demand = demand or DemandInputs()
+    tariff = tariff or TariffInputs()
+    capex, chargers, base = site_arrays(locations)
+    n_sites = len(base)
+    per_scenario = n_sites * demand.months * 9  # float32 energy and cash blocks + bool mask
+    chunk_size = max(1, min(demand.scenarios, block_bytes // per_scenario))
+    chunks = [(i, s, min(s + chunk_size, demand.scenarios))
+              for i, s in enumerate(range(0, demand.scenarios, chunk_size))]
+    inputs_key = _hash(asdict(demand), base.tobytes(), chargers.tobytes(), chunk_size)
+    out = np.empty((n_sites, demand.scenarios), dtype=np.int16)
+
+    def run(chunk):
+        i, start, stop = chunk
+        key = (inputs_key, i)
+        block = cache.get(key) if cache is not None else None
+        if block is None:
+            block = energy_block(base, chargers, demand, i, start, stop)
+            if cache is not None:
+                cache.put(key, block)
+        out[:, start:stop] = payback_block(*block, capex, chargers, tariff)
+
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        list(pool.map(run, chunks))
+    return out
+
+
+def payback_percentiles(payback, q=(10, 50, 90)):
+    """Percentiles of payback month per site; ``months + 1`` (past the horizon) means no payback"""
+    return np.percentile(payback, q, axis=1).T
+
+
+def payback_summary(locations, demand=None, tariff=None, **kwargs):
+    """Per-site P10/P50/P90 payback months and the share of scenarios that pay back"""
+    demand = demand or DemandInputs()
+    payback = simulate_payback(locations, demand, tariff, **kwargs)
+    p = payback_percentiles(payback)
+    summary = locations[['Location Name', 'Priority', 'Investment (Lakhs)', 'Expected ROI (months)']].copy()
+    summary['P10 Payback (months)'] = p[:, 0]
+    summary['P50 Payback (months)'] = p[:, 1]
+    summary['P90 Payback (months)'] = p[:, 2]
+    summary['Pays Back (%)'] = ((payback <= demand.months).mean(axis=1) * 100).round(1)
+    return summary.reset_index(drop=True)
@@ -0,0 +1,272 @@
+"""Active charging sessions kept across ticks, with paging and per-tick row diffs.
+
+``SessionStore`` holds one row per active session in column arrays ordered
+by an increasing session key. Each tick it advances charging, ends and starts
+sessions so every station's count matches its ``In Use``, and re-splits
+station power (``allocation.water_fill``). It then stamps the tick's version
+on every row whose displayed values changed. The tick is published as an
+immutable ``SessionTable``, which is what snapshots carry. Sessions that end
+are kept as history rows until ``drain_completed`` hands them to the archive.
+
+``SessionTable`` is indexed by station (one stable sort, built lazily) and by
+Vehicle ID. Filtering, sorting and paging work on row indices. Display
+strings (Vehicle ID, Start Time, Duration) are only formatted for the rows
+of the requested page. ``diff`` returns the rows upserted and the keys
+removed since an earlier table.
+"""
+import threading
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from allocation import PRIORITY_WEIGHT, acceptance, session_weight, water_fill
+from history import SESSION_COLUMNS as HISTORY_COLUMNS
+from roi import TariffInputs
+
+COLUMNS = ['Vehicle ID', 'Station', 'Start Time', 'Duration', 'Charged (kWh)', 'Status', 'Progress',
+           'Priority', 'Vehicle Max (kW)', 'Setpoint (kW)']
+PRIORITIES = np.array(list(PRIORITY_WEIGHT))
+VEHICLE_KW = np.array([30, 50, 60, 100, 150])
+# Values compared tick to tick to decide whether a row changed for the browser;
+# 'minutes' is the elapsed time shown as Duration
+_DISPLAYED = ('charged', 'progress', 'setpoint', 'minutes')
+# Sort keys per displayed column; every active session is Charging, so Status keeps arrival order
+_SORT = {'Vehicle ID': 'key', 'Station': 'station', 'Start Time': 'start', 'Duration': 'start',
+         'Charged (kWh)': 'charged', 'Status': 'key', 'Progress': 'progress', 'Priority': 'priority',
+         'Vehicle Max (kW)': 'max_kw', 'Setpoint (kW)': 'setpoint'}
+
+
+def _vehicle_ids(key):
+    """Stable plate-like IDs derived from session keys"""
+    return [f'KA{k % 97 + 1:02d}EV{1000 + k * 7919 % 9000}' for k in key.tolist()]
+
+
+class SessionTable:
+    """Immutable view of the active sessions at one tick"""
+
+    def __init__(self, version, now, locations, columns, updated):
+        self.version = version
+        self.now = now
+        self.locations = locations
+        self.columns = columns
+        self.updated = updated
+        self._lock = threading.Lock()
+        self._station_index = None
+        self._vehicle_index = None
+
+    def __len__(self):
+        return len(self.columns['key'])
+
+    def _stations(self):
+        with self._lock:
+            if self._station_index is None:
+                order = np.argsort(self.columns['station'], kind='stable')
+                counts = np.bincount(self.columns['station'], minlength=len(self.locations))
+                self._station_index = (order, np.r_[0, np.cumsum(counts)])
+            return self._station_index
+
+    def rows_for_station(self, location):
+        """Row indices of one station's sessions, in key order"""
+        order, bounds = self._stations()
+        codes = np.flatnonzero(self.locations == location)
+        if not len(codes):
+            return order[:0]
+        return order[bounds[codes[0]]:bounds[codes[0] + 1]]
+
+    def find(self, vehicle_id):
+        """Row index of a Vehicle ID, or None"""
+        with self._lock:
+            if self._vehicle_index is None:
+                self._vehicle_index = {v: i for i, v in enumerate(_vehicle_ids(self.columns['key']))}
+        return self._vehicle_index.get(vehicle_id)
+
+    def query(self, station=None, sort='Start Time', ascending=True):
+        """Row indices matching ``station`` (a Location), sorted by a display column; ValueError for any other column"""
+        if sort not in _SORT:
+            raise ValueError(f"unknown sort column {sort!r}")
+        rows = np.arange(len(self)) if station is None else self.rows_for_station(station)
+        values = self.columns[_SORT[sort]][rows]
+        order = np.argsort(values, kind='stable')
+        return rows[order if ascending else order[::-1]]
+
+    def frame(self, rows=None):
+        """Display DataFrame for ``rows`` (all when None)"""
+        c = self.columns
+        rows = np.arange(len(self)) if rows is None else np.asarray(rows, dtype=np.intp)
+        start = c['start'][rows]
+        minutes = ((np.datetime64(self.now, 's') - start) // np.timedelta64(1, 'm')).astype(int)
+        return pd.DataFrame({
+            'Vehicle ID': _vehicle_ids(c['key'][rows]),
+            'Station': self.locations[c['station'][rows]],
+            'Start Time': pd.DatetimeIndex(start).strftime('%H:%M'),
+            'Duration': [f"{m} min" for m in minutes.tolist()],
+            'Charged (kWh)': c['charged'][rows].round().astype(int),
+            'Status': 'Charging',
+            'Progress': c['progress'][rows].astype(int),
+            'Priority': PRIORITIES[c['priority'][rows]],
+            'Vehicle Max (kW)': c['max_kw'][rows],
+            'Setpoint (kW)': c['setpoint'][rows],
+        }, columns=COLUMNS)
+
+    def page(self, rows, page=0, size=50):
+        """One page of ``rows`` as a display DataFrame"""
+        return self.frame(rows[page * size:(page + 1) * size])
+
+    def diff(self, previous):
+        """``(upserted rows frame, removed Vehicle IDs)`` since ``previous`` (an older table, or None for all)"""
+        if previous is None:
+            return self.frame(), []
+        changed = np.flatnonzero(self.updated > previous.version)
+        old = previous.columns['key']
+        removed = old[~np.isin(old, self.columns['key'], assume_unique=True)]
+        return self.frame(changed), _vehicle_ids(removed)
+
+    def station_load(self):
+        """Allocated kW per station, aligned with ``locations``"""
+        return np.bincount(self.columns['station'], self.columns['setpoint'], len(self.locations))
+
+
+class SessionStore:
+    """Mutable session state advanced once per tick by the snapshot producer"""
+
+    def __init__(self, locations, seed=None, station_ids=None, tariff=TariffInputs.tariff, first_key=0):
+        self.locations = np.asarray(locations, dtype=object)
+        # Station IDs for the history rows of completed sessions; the Locations when not given
+        self.station_ids = self.locations if station_ids is None else np.asarray(station_ids, dtype=object)
+        self.tariff = tariff
+        self._rng = np.random.default_rng(seed)
+        # Session keys continue after the archived ones (HistoryStore.next_session_id)
+        self._next_key = first_key
+        self.version = 0
+        self.columns = {
+            'key': np.zeros(0, dtype=np.int64),
+            'station': np.zeros(0, dtype=np.intp),
+            'start': np.zeros(0, dtype='datetime64[s]'),
+            'battery_kwh': np.zeros(0),
+            'charged': np.zeros(0),
+            'progress': np.zeros(0),
+            'priority': np.zeros(0, dtype=np.int8),
+            'max_kw': np.zeros(0, dtype=np.int64),
+            'setpoint': np.zeros(0),
+        }
+        self.updated = np.zeros(0, dtype=np.int64)
+        self._last = None
+        self._now = None
+        self._completed = []
+        # kWh of every session ended so far, archived or not
+        self.ended_energy = 0.0
+
+    @property
+    def last(self):
+        """The ``SessionTable`` returned by the latest ``step``, or None before the first"""
+        return self._last
+
+    def _keep(self, mask, now):
+        """Keep the rows in ``mask``; the others end now and are recorded for the history"""
+        c = self.columns
+        ended = ~mask
+        if ended.any():
+            self.ended_energy += float(c['charged'][ended].sum())
+            start = c['start'][ended]
+            self._completed.append(pd.DataFrame({
+                'session_id': c['key'][ended],
+                'station_id': self.station_ids[c['station'][ended]],
+                'start': start,
+                'duration_min': ((np.datetime64(now, 's') - start) / np.timedelta64(1, 'm')).astype(np.float32),
+                'energy_kwh': c['charged'][ended].astype(np.float32),
+                'revenue': (c['charged'][ended] * self.tariff).astype(np.float32),
+            }))
+        self.columns = {name: values[mask] for name, values in c.items()}
+        self.updated = self.updated[mask]
+
+    def drain_completed(self):
+        """Sessions ended since the last call, as history rows (``HISTORY_COLUMNS``)"""
+        completed, self._completed = self._completed, []
+        if not completed:
+            return pd.DataFrame(columns=HISTORY_COLUMNS)
+        return pd.concat(completed, ignore_index=True)
+
+    def _start(self, now, station):
+        rng, n = self._rng, len(station)
+        key = np.arange(self._next_key, self._next_key + n)
+        self._next_key += n
+        battery = rng.uniform(40, 80, n)
+        progress = rng.uniform(5, 60, n)
+        new = {
+            'key': key,
+            'station': station,
+            'start': np.datetime64(now, 's') - rng.integers(0, 5 * 60, n).astype('timedelta64[s]'),
+            'battery_kwh': battery,
+            'charged': np.zeros(n),
+            'progress': progress,
+            'priority': rng.choice(len(PRIORITIES), n, p=[0.7, 0.2, 0.1]).astype(np.int8),
+            'max_kw': rng.choice(VEHICLE_KW, n),
+            'setpoint': np.zeros(n),
+        }
+        self.columns = {name: np.concatenate([values, new[name]]) for name, values in self.columns.items()}
+        self.updated = np.concatenate([self.updated, np.full(n, self.version)])
+
+    def step(self, now, in_use, power_kw, dt=1.0):
+        """Advance one tick: charge, end and start sessions to match ``in_use`` per station, re-split power"""
+        self.version += 1
+        c = self.columns
+        # What the browser was shown last tick (as of last tick's time), per session key
+        shown_key = c['key'].copy()
+        shown = {name: self._displayed(name, self._now or now) for name in _DISPLAYED}
+        # Charge at last tick's setpoints; finished vehicles leave
+        energy = c['setpoint'] * dt / 3600
+        c['charged'] += energy
+        c['progress'] = np.minimum(c['progress'] + energy / c['battery_kwh'] * 100, 100)
+        self._keep(c['progress'] < 100, now)
+
+        # Reconcile each station's count with the telemetry, ending the fullest vehicles first
+        in_use = np.asarray(in_use, dtype=np.int64)
+        c = self.columns
+        counts = np.bincount(c['station'], minlength=len(self.locations))
+        excess = np.maximum(counts - in_use, 0)
+        if excess.any():
+            order = np.lexsort((-c['progress'], c['station']))
+            rank = np.arange(len(order)) - np.r_[0, np.cumsum(counts)][c['station'][order]]
+            keep = np.ones(len(order), dtype=bool)
+            keep[order[rank < excess[c['station'][order]]]] = False
+            self._keep(keep, now)
+        missing = np.maximum(in_use - counts, 0)
+        if missing.any():
+            self._start(now, np.repeat(np.arange(len(self.locations)), missing))
+
+        c = self.columns
+        demand = acceptance(c['max_kw'], c['progress'])
+        weight = session_weight(np.asarray(list(PRIORITY_WEIGHT.values()))[c['priority']], c['progress'])
+        setpoint = water_fill(c['station'], np.asarray(power_kw, dtype=float), demand, weight)
+        # Rounded down so the displayed setpoints never add up past the cap
+        c['setpoint'] = np.floor(setpoint * 10 + 1e-9) / 10
+        # Keys only grow, so kept rows keep their order; sessions started this tick are already marked
+        at = np.searchsorted(shown_key, c['key'])
+        kept = at < len(shown_key)
+        changed = np.zeros(kept.sum(), dtype=bool)
+        for name in _DISPLAYED:
+            changed |= self._displayed(name, now)[kept] != shown[name][at[kept]]
+        self.updated[np.flatnonzero(kept)[changed]] = self.version
+        self._now = now
+
+        snapshot_columns = {name: values.copy() for name, values in c.items()}
+        self._last = SessionTable(self.version, now, self.locations, snapshot_columns, self.updated.copy())
+        return self._last
+
+    def _displayed(self, name, now):
+        if name == 'minutes':
+            return (np.datetime64(now, 's') - self.columns['start']) // np.timedelta64(1, 'm')
+        values = self.columns[name]
+        if name == 'charged':
+            return values.round().astype(int)
+        return values if name == 'setpoint' else values.astype(int)
+
+    @classmethod
+    def synthetic(cls, sessions, stations=None, seed=0):
+        """Store with ``sessions`` active sessions spread over ``stations`` synthetic stations, for benchmarks"""
+        stations = stations or max(1, sessions // 8)
+        store = cls([f"Station {i + 1}" for i in range(stations)], seed)
+        in_use = np.bincount(store._rng.integers(0, stations, sessions), minlength=stations)
+        store.step(datetime.now(), in_use, np.full(stations, 150.0))
+        return store, in_use
@@ -0,0 +1,142 @@
+"""Per-station live state in one structured array, with change tracking and a heatmap grid.
+
+``StationStore`` keeps each station's counts, load, temperature and
+utilization in a row of a NumPy structured array (``STATE_DTYPE``, 24 bytes
+per station). Each tick it folds in new readings and computes utilization
+for the whole fleet at once. It stamps the tick's version on every station
+whose displayed values changed, and publishes an immutable ``StationTable``.
+
+``StationGrid`` is a session's view of the fleet as a heatmap, one cell per
+station. On every tick it rewrites only the cells of stations changed since
+the grid last saw the table.
+"""
+import numpy as np
+import pandas as pd
+
+STATE_DTYPE = np.dtype([
+    ('chargers', np.uint16),
+    ('power_kw', np.uint16),
+    ('available', np.uint16),
+    ('in_use', np.uint16),
+    ('load_kw', np.float32),
+    ('temperature', np.float32),
+    ('utilization', np.float32),
+    ('updated', np.uint32),
+])
+COLUMNS = ['Station ID', 'Location', 'Status', 'Chargers', 'Available', 'In Use',
+           'Power (kW)', 'Utilization', 'Current Load (kW)', 'Temperature (°C)']
+# Heatmap metrics: label -> (cell column, colour scale, colour range)
+GRID_METRICS = {
+    'Utilization (%)': (0, 'RdYlGn_r', (0, 100)),
+    'Load (% of power)': (1, 'Blues', (0, 100)),
+    'Temperature (°C)': (2, 'YlOrRd', (25, 50)),
+}
+# Cell columns: utilization, load %, temperature, in use, available, chargers, load kW
+_CELL_FIELDS = 7
+
+
+class StationTable:
+    """Immutable view of every station's state at one tick"""
+
+    def __init__(self, version, ids, locations, status, state):
+        self.version = version
+        self.ids = ids
+        self.locations = locations
+        self.status = status
+        self.state = state
+
+    def __len__(self):
+        return len(self.state)
+
+    @property
+    def updated(self):
+        return self.state['updated']
+
+    def changed_since(self, version):
+        """Indices of stations whose displayed state changed after ``version``"""
+        return np.flatnonzero(self.state['updated'] > version)
+
+    def cells(self, rows=None):
+        """Heatmap cell values for ``rows`` (all when None), see ``_CELL_FIELDS``"""
+        s = self.state if rows is None else self.state[rows]
+        load_share = s['load_kw'] / np.maximum(s['power_kw'], 1) * 100
+        return np.column_stack([s['utilization'], load_share, s['temperature'], s['in_use'], s['available'],
+                                s['chargers'], s['load_kw']])
+
+    def frame(self):
+        """The station status DataFrame the rest of the app reads"""
+        s = self.state
+        return pd.DataFrame({
+            'Station ID': self.ids,
+            'Location': self.locations,
+            'Status': self.status,
+            'Chargers': s['chargers'].astype(np.int64),
+            'Available': s['available'].astype(np.int64),
+            'In Use': s['in_use'].astype(np.int64),
+            'Power (kW)': s['power_kw'].astype(np.int64),
+            'Utilization': s['utilization'].astype(float).round(1),
+            'Current Load (kW)': s['load_kw'].astype(np.int64),
+            'Temperature (°C)': s['temperature'].astype(np.int64),
+        }, columns=COLUMNS)
+
+
+class StationStore:
+    """Mutable fleet state advanced once per tick by the snapshot producer"""
+
+    def __init__(self, stations):
+        self.ids = stations['Station ID'].to_numpy(dtype=object)
+        self.locations = stations['Location'].to_numpy(dtype=object)
+        self.status = stations['Status'].to_numpy(dtype=object)
+        self.version = 0
+        self.state = np.zeros(len(stations), dtype=STATE_DTYPE)
+        self.state['chargers'] = stations['Chargers'].to_numpy()
+        self.state['power_kw'] = stations['Power (kW)'].to_numpy()
+
+    def step(self, available, in_use, load_kw, temperature):
+        """Fold in one tick of readings (aligned with the station list) and publish a ``StationTable``"""
+        self.version += 1
+        s = self.state
+        new = np.zeros(len(s), dtype=STATE_DTYPE)
+        new['chargers'], new['power_kw'] = s['chargers'], s['power_kw']
+        # Missing readings (NaN from an absent charge point) count as zero
+        new['available'] = np.nan_to_num(np.asarray(available, dtype=float))
+        new['in_use'] = np.nan_to_num(np.asarray(in_use, dtype=float))
+        new['load_kw'] = np.round(np.nan_to_num(np.asarray(load_kw, dtype=float)))
+        new['temperature'] = np.round(np.nan_to_num(np.asarray(temperature, dtype=float)))
+        new['utilization'] = np.round(new['in_use'] / np.maximum(new['chargers'], 1) * 100, 1)
+        changed = ((new['available'] != s['available']) | (new['in_use'] != s['in_use'])
+                   | (new['load_kw'] != s['load_kw']) | (new['temperature'] != s['temperature']))
+        new['updated'] = np.where(changed | (self.version == 1), self.version, s['updated'])
+        self.state = new
+        return StationTable(self.version, self.ids, self.locations, self.status, new.copy())
+
+
+class StationGrid:
+    """A session's heatmap cells, patched with the stations that changed since the last table it saw"""
+
+    def __init__(self, table, width=None):
+        n = len(table)
+        # About twice as wide as tall, to suit the page
+        self.width = width or max(1, int(np.ceil(np.sqrt(2 * n))))
+        self.height = -(-n // self.width)
+        self.size = n
+        self.version = 0
+        self.cells = np.full((self.height * self.width, _CELL_FIELDS), np.nan)
+        labels = np.full(self.height * self.width, '', dtype=object)
+        labels[:n] = table.ids
+        self.labels = labels.reshape(self.height, self.width)
+
+    def update(self, table):
+        """Rewrite the cells of stations changed since the last update; returns how many changed"""
+        # A restarted store counts versions from 1 again; repaint everything
+        rows = table.changed_since(self.version if table.version >= self.version else 0)
+        if len(rows):
+            self.cells[rows] = table.cells(rows)
+        self.version = table.version
+        return len(rows)
+
+    def matrix(self, metric):
+        """``(z, customdata)`` grids for one ``GRID_METRICS`` metric"""
+        column = GRID_METRICS[metric][0]
+        cells = self.cells.reshape(self.height, self.width, _CELL_FIELDS)
+        return cells[:, :, column], cells
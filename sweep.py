@@ -0,0 +1,262 @@
+"""Sensitivity sweeps of site payback over a grid of capex/tariff/cost/demand inputs.
+
+A sweep is the cartesian product of a few parameter axes, evaluated for
+every site with the expected (noise-free) version of the roi.py cash-flow
+model. The grid is cut into chunks that run on a process pool. Site arrays are
+copied into shared memory once and each worker maps them, so tasks carry only
+a chunk range. Every finished chunk is written to the checkpoint directory;
+a cancelled or interrupted sweep skips those chunks when it is started again.
+Each grid and site set gets its own directory. When a run finishes or is
+cancelled, all but the ``keep`` most recently written directories are removed.
+"""
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import asdict, dataclass
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+import pools
+from roi import HOURS_PER_MONTH, DemandInputs, TariffInputs, site_arrays
+
+AXES = ['capex_scale', 'tariff', 'electricity_cost', 'utilization_scale']
+AXIS_LABELS = {
+    'capex_scale': 'Capex Scale',
+    'tariff': 'Tariff (₹/kWh)',
+    'electricity_cost': 'Electricity Cost (₹/kWh)',
+    'utilization_scale': 'Utilization Scale',
+}
+
+
+@dataclass(frozen=True)
+class SweepGrid:
+    """Values swept on each axis; the sweep covers every combination"""
+    capex_scale: tuple = (0.8, 1.0, 1.2)
+    tariff: tuple = (16.0, 20.0, 24.0)
+    electricity_cost: tuple = (6.0, 8.0, 10.0)
+    utilization_scale: tuple = (0.75, 1.0, 1.25)
+
+    @classmethod
+    def linear(cls, steps, capex_scale=(0.6, 1.4), tariff=(12.0, 30.0), electricity_cost=(4.0, 14.0),
+               utilization_scale=(0.5, 1.5)):
+        """``steps`` evenly spaced values between each axis' bounds"""
+        def axis(bounds):
+            return tuple(np.round(np.linspace(*bounds, steps), 4).tolist())
+        return cls(axis(capex_scale), axis(tariff), axis(electricity_cost), axis(utilization_scale))
+
+    @property
+    def shape(self):
+        return tuple(len(getattr(self, name)) for name in AXES)
+
+    def __len__(self):
+        return int(np.prod(self.shape))
+
+    def combos(self, start, stop):
+        """Axis values of combinations ``start:stop`` in C order, one array per axis"""
+        idx = np.unravel_index(np.arange(start, stop), self.shape)
+        return [np.asarray(getattr(self, name))[i] for name, i in zip(AXES, idx)]
+
+
+def payback_months(capex, chargers, cum_energy, capex_scale, margin, opex_per_charger):
+    """First month whose cumulative cash covers capex, per ``(combination, site)``; ``months + 1`` if never.
+
+    ``cum_energy`` is the cumulative kWh per ``(combination, site, month)``.
+    Cash is linear in energy, so cumulative cash is ``margin * cum_energy - opex * month``.
+    """
+    months = cum_energy.shape[2]
+    opex = np.arange(1, months + 1, dtype=np.float32) * (chargers * np.float32(opex_per_charger))[:, None]
+    cash = cum_energy * margin.astype(np.float32)[:, None, None]
+    cash -= opex
+    paid = cash >= (capex_scale.astype(np.float32)[:, None] * capex.astype(np.float32))[..., None]
+    first = paid.argmax(axis=2)
+    ever = np.take_along_axis(paid, first[..., None], axis=2)[..., 0]
+    return np.where(ever, first + 1, months + 1).astype(np.int16)
+
+
+def cumulative_energy(base, chargers, utilization_scale, demand):
+    """Expected cumulative kWh per ``(site, month)`` with a linear ramp to steady state"""
+    months = np.arange(1, demand.months + 1, dtype=np.float32)
+    full_kwh = chargers * np.float32(demand.charger_kw * HOURS_PER_MONTH)
+    ramp = np.minimum(months / np.float32(demand.ramp_months), 1)
+    energy = np.minimum(ramp * (base * np.float32(utilization_scale))[:, None], 0.95) * full_kwh[:, None]
+    return np.cumsum(energy, axis=1)
+
+
+# Worker state: the shared site arrays and the inputs common to every chunk
+_worker = {}
+
+
+def _init_worker(shm_name, n_sites, grid, demand, opex_per_charger):
+    shm = shared_memory.SharedMemory(name=shm_name)
+    sites = np.ndarray((3, n_sites), dtype=np.float64, buffer=shm.buf)
+    _worker.update(shm=shm, capex=sites[0], chargers=sites[1].astype(np.float32), base=sites[2].astype(np.float32),
+                   grid=grid, demand=demand, opex_per_charger=opex_per_charger, energy={})
+
+
+def _run_chunk(chunk, start, stop):
+    w = _worker
+    capex_scale, tariff, electricity_cost, utilization_scale = w['grid'].combos(start, stop)
+    energy = w['energy']
+    for u in np.unique(utilization_scale):
+        if u not in energy:
+            energy[u] = cumulative_energy(w['base'], w['chargers'], u, w['demand'])
+    cum_energy = np.stack([energy[u] for u in utilization_scale])
+    payback = payback_months(w['capex'], w['chargers'], cum_energy, capex_scale, tariff - electricity_cost,
+                             w['opex_per_charger'])
+    return chunk, payback
+
+
+def _save_atomic(path, array):
+    tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(tmp, 'wb') as f:
+        np.save(f, array)
+    os.replace(tmp, path)
+
+
+def prune_checkpoints(checkpoint_dir, keep, current=None):
+    """Remove sweep directories under ``checkpoint_dir`` except ``current`` and the ``keep`` most recently written"""
+    try:
+        entries = [e for e in os.scandir(checkpoint_dir) if e.is_dir() and e.path != current]
+    except FileNotFoundError:
+        return
+    entries.sort(key=lambda e: e.stat().st_mtime, reverse=True)
+    for entry in entries[keep:]:
+        shutil.rmtree(entry.path, ignore_errors=True)
+
+
+class SweepRunner:
+    """Runs a sweep on a process pool in the background, checkpointing each chunk"""
+
+    def __init__(self, locations, grid, checkpoint_dir, demand=None, opex_per_charger=None, block_bytes=32 * 2**20,
+                 workers=None, keep=4):
+        self.locations = locations
+        self.grid = grid
+        self.demand = demand or DemandInputs()
+        self.opex_per_charger = TariffInputs().opex_per_charger if opex_per_charger is None else opex_per_charger
+        self.workers = workers or os.cpu_count()
+        self.capex, self.chargers, self.base = site_arrays(locations)
+        # Chunks sized so each task's float32 energy/cash blocks stay under block_bytes
+        chunk_size = max(1, block_bytes // (len(self.base) * self.demand.months * 9))
+        self.chunks = [(i, s, min(s + chunk_size, len(grid))) for i, s in enumerate(range(0, len(grid), chunk_size))]
+
+        key = hashlib.sha1(json.dumps([asdict(grid), asdict(self.demand), self.opex_per_charger, chunk_size]).encode())
+        for array in (self.capex, self.chargers, self.base):
+            key.update(array.tobytes())
+        self.checkpoint_dir = checkpoint_dir
+        self.path = os.path.join(checkpoint_dir, key.hexdigest()[:16])
+        # Other sweeps' directories kept for resuming, besides this one
+        self.keep = keep
+
+        self._results = {}
+        self._lock = threading.Lock()
+        self._cancel = threading.Event()
+        self._thread = None
+        self.error = None
+        self.elapsed = 0.0
+        for i, _, _ in self.chunks:
+            chunk_path = self._chunk_path(i)
+            if os.path.exists(chunk_path):
+                self._results[i] = np.load(chunk_path)
+
+    def _chunk_path(self, i):
+        return os.path.join(self.path, f"chunk-{i:05d}.npy")
+
+    @property
+    def progress(self):
+        """``(combinations done, combinations total)``"""
+        with self._lock:
+            done = sum(len(r) for r in self._results.values())
+        return done, len(self.grid)
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def done(self):
+        return len(self._results) == len(self.chunks)
+
+    def start(self):
+        if not self.running and not self.done:
+            self._cancel.clear()
+            self.error = None
+            self._thread = threading.Thread(target=self._run_safely, name='sweep', daemon=True)
+            self._thread.start()
+        return self
+
+    def cancel(self):
+        self._cancel.set()
+
+    def wait(self, timeout=None):
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return self
+
+    def _run_safely(self):
+        try:
+            self.run()
+        except Exception as exc:
+            self.error = exc
+
+    def run(self):
+        """Evaluate every chunk not already checkpointed; returns early when cancelled"""
+        pending = [c for c in self.chunks if c[0] not in self._results]
+        if not pending:
+            return
+        os.makedirs(self.path, exist_ok=True)
+        sites = np.stack([self.capex, self.chargers, self.base]).astype(np.float64)
+        shm = shared_memory.SharedMemory(create=True, size=sites.nbytes)
+        started = time.perf_counter()
+        try:
+            np.ndarray(sites.shape, dtype=sites.dtype, buffer=shm.buf)[:] = sites
+            # Never fork the threaded server; see pools.py
+            with ProcessPoolExecutor(self.workers, mp_context=pools.context(), initializer=_init_worker,
+                                     initargs=(shm.name, sites.shape[1], self.grid, self.demand,
+                                               self.opex_per_charger)) as pool:
+                queue, in_flight = iter(pending), set()
+                while True:
+                    # Keep a couple of chunks per worker queued so cancelling stops quickly
+                    while not self._cancel.is_set() and len(in_flight) < 2 * self.workers:
+                        chunk = next(queue, None)
+                        if chunk is None:
+                            break
+                        in_flight.add(pool.submit(_run_chunk, *chunk))
+                    if not in_flight:
+                        break
+                    finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        i, payback = future.result()
+                        _save_atomic(self._chunk_path(i), payback)
+                        with self._lock:
+                            self._results[i] = payback
+        finally:
+            self.elapsed += time.perf_counter() - started
+            shm.close()
+            shm.unlink()
+            prune_checkpoints(self.checkpoint_dir, self.keep, self.path)
+
+    def payback(self):
+        """Combination indices done so far and their payback months per site"""
+        with self._lock:
+            done = sorted(self._results)
+            if not done:
+                return np.empty(0, dtype=np.int64), np.empty((0, len(self.base)), dtype=np.int16)
+            index = np.concatenate([np.arange(*self.chunks[i][1:]) for i in done])
+            return index, np.concatenate([self._results[i] for i in done])
+
+    def results(self):
+        """One row per finished combination with its axis values and payback summary over sites"""
+        index, payback = self.payback()
+        values = np.unravel_index(index, self.grid.shape)
+        frame = pd.DataFrame({AXIS_LABELS[name]: np.asarray(getattr(self.grid, name))[i]
+                              for name, i in zip(AXES, values)})
+        frame['Median Payback (months)'] = np.median(payback, axis=1)
+        frame['Sites Paying Back'] = (payback <= self.demand.months).sum(axis=1)
+        return frame
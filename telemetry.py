@@ -0,0 +1,257 @@
+"""Shared real-time telemetry for the dashboard.
+
+One ``SnapshotStore`` per process owns a background producer thread that
+builds a new ``Snapshot`` once per tick. Streamlit sessions only read the
+latest snapshot, so the cost of a tick does not grow with the number of
+people watching the dashboard.
+"""
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from anomaly import AlertBook, Detector, WebhookSink
+from forecast import SLOT_SECONDS, Forecaster
+from history import HistoryStore, backfill
+from ingest import Aggregator, IngestService, Simulator, SimulatorSource, SocketSource
+from sessions import SessionStore, SessionTable
+from stations import StationStore, StationTable
+from timeseries import PowerHistory
+
+# Static description of the stations we operate
+STATIONS = pd.DataFrame({
+    'Station ID': ['BLR-001', 'BLR-002', 'BLR-003'],
+    'Location': ['Koramangala 5th Block', 'Whitefield', 'Electronic City'],
+    'Status': ['Active', 'Active', 'Active'],
+    'Chargers': [10, 15, 12],
+    'Power (kW)': [150, 200, 180],
+    'Latitude': [12.9345, 12.9698, 12.8452],
+    'Longitude': [77.6190, 77.7500, 77.6602],
+})
+
+
+def synthetic_stations(n, seed=0):
+    """``n`` made-up stations with the same columns, jittered around the real ones"""
+    rng = np.random.default_rng(seed)
+    rows = STATIONS.iloc[rng.integers(0, len(STATIONS), n)].reset_index(drop=True)
+    rows['Station ID'] = [f"BLR-{i + 1:05d}" for i in range(n)]
+    rows['Location'] = [f"Station {i + 1:05d}" for i in range(n)]
+    rows['Latitude'] = (rows['Latitude'] + rng.normal(0, 0.04, n)).round(5)
+    rows['Longitude'] = (rows['Longitude'] + rng.normal(0, 0.04, n)).round(5)
+    return rows
+
+
+# Scale testing (see ``benchmark.py app``): a synthetic fleet replaces ours for the whole process
+if os.environ.get('EV_STATIONS'):
+    STATIONS = synthetic_stations(int(os.environ['EV_STATIONS']))
+
+METRIC_KEYS = ['current_power', 'active_sessions', 'today_energy',
+               'today_revenue', 'queue_waiting', 'avg_wait_time']
+# No feed reports vehicles queueing, so these stay demo values; the UI labels them
+SIMULATED_METRICS = ('queue_waiting', 'avg_wait_time')
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    """Immutable view of the fleet at one tick. Treat the frames as read-only."""
+    version: int
+    created: datetime
+    stations: pd.DataFrame
+    daily: pd.DataFrame
+    metrics: dict
+    deltas: dict = field(default_factory=dict)
+    sessions: SessionTable = None
+    alerts: pd.DataFrame = None
+    # Array-backed station state with per-station change versions; ``stations`` is its frame
+    station_state: StationTable = None
+    # Why the telemetry feed stopped, when it has; stations then hold its last readings
+    feed_error: str = None
+
+
+def make_daily_history(rng, end, days=31):
+    """Daily energy, sessions and revenue for the last ``days`` days"""
+    return pd.DataFrame({
+        'Date': pd.date_range(end=end, periods=days, freq='D'),
+        'Energy (kWh)': rng.integers(800, 2500, days),
+        'Sessions': rng.integers(80, 200, days),
+        'Revenue (₹)': rng.integers(15000, 45000, days),
+        'Avg Duration (min)': rng.integers(35, 75, days),
+    })
+
+
+def make_station_status(rng):
+    """Current availability, load and temperature for every station"""
+    n = len(STATIONS)
+    stations = STATIONS.copy()
+    stations['Available'] = rng.integers(2, 8, n)
+    stations['In Use'] = stations['Chargers'] - stations['Available']
+    stations['Utilization'] = (stations['In Use'] / stations['Chargers'] * 100).round(1)
+    stations['Current Load (kW)'] = rng.integers(50, 150, n)
+    stations['Temperature (°C)'] = rng.integers(28, 45, n)
+    columns = ['Station ID', 'Location', 'Status', 'Chargers', 'Available', 'In Use',
+               'Power (kW)', 'Utilization', 'Current Load (kW)', 'Temperature (°C)']
+    return stations[columns]
+
+
+def station_records(records):
+    """Normalized ingest records aligned with ``STATIONS``; missing stations read as NaN"""
+    return STATIONS[['Station ID']].merge(records, on='Station ID', how='left')
+
+
+def make_metrics(rng):
+    """Demo headline metrics; ``SnapshotStore.tick`` replaces all but ``SIMULATED_METRICS``"""
+    return {
+        'current_power': int(rng.integers(250, 450)),
+        'active_sessions': int(rng.integers(8, 25)),
+        'today_energy': int(rng.integers(1200, 1800)),
+        'today_revenue': int(rng.integers(25000, 35000)),
+        'queue_waiting': int(rng.integers(0, 8)),
+        'avg_wait_time': int(rng.integers(5, 25)),
+    }
+
+
+class SnapshotStore:
+    """Process-wide holder of the latest ``Snapshot``, fed by one producer thread.
+
+    Every tick also appends station loads to ``history``, so run it at 1 Hz
+    for the live power chart.
+    """
+
+    def __init__(self, interval=1.0, seed=None, feed=None, archive=None, archive_every=60, alert_sinks=()):
+        self.interval = interval
+        # Optional object with a records() method, see ingest.IngestService
+        self.feed = feed
+        # Optional history.HistoryStore that the daily series is read from
+        self.archive = archive
+        self.archive_every = archive_every
+        self._rng = np.random.default_rng(seed)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._daily = self._load_daily(datetime.now())
+        # Mutable, shared 24h power history; the producer is its only writer
+        self.history = PowerHistory(STATIONS['Station ID'])
+        # Load/session forecasts, seeded from the hourly rollups and updated every tick
+        self.forecast = Forecaster(STATIONS['Station ID'], samples_per_slot=SLOT_SECONDS / interval)
+        if archive is not None:
+            today = datetime.now().date()
+            self.forecast.fit_hourly(archive.station_hourly(today - timedelta(days=27), today))
+        # Station state lives in one structured array; snapshots carry a copy and its frame
+        self.station_state = StationStore(STATIONS)
+        # Active sessions persist across ticks so clients can page them and fetch row diffs
+        self.sessions = SessionStore(STATIONS['Location'], seed, station_ids=STATIONS['Station ID'],
+                                     first_key=archive.next_session_id() if archive is not None else 0)
+        # Ended-session kWh already counted in the daily series (see today_totals)
+        self._archived_energy = 0.0
+        # Streaming temperature/load anomaly detection over every tick
+        self.detector = Detector(STATIONS['Station ID'], book=AlertBook(sinks=alert_sinks))
+        self._snapshot = None
+        self.tick()
+
+    def _load_daily(self, now, days=31):
+        if self.archive is None:
+            return make_daily_history(self._rng, now, days)
+        return self.archive.daily(now.date() - timedelta(days=days - 1), now.date())
+
+    def latest(self):
+        """Return the newest snapshot; never blocks on the producer"""
+        return self._snapshot
+
+    def tick(self, now=None):
+        """Build and publish the next snapshot"""
+        now = now or datetime.now()
+        with self._lock:
+            previous = self._snapshot
+            if previous and previous.version % self.archive_every == 0:
+                # Sessions that ended go to the archive in batches; the daily series is then re-read with them
+                completed = self.sessions.drain_completed()
+                if self.archive is not None:
+                    self.archive.append(completed)
+                    self._daily = self._load_daily(now)
+                    self._archived_energy = self.sessions.ended_energy
+            metrics = make_metrics(self._rng)
+            readings = station_records(self.feed.records()) if self.feed is not None else make_station_status(self._rng)
+            station_state = self.station_state.step(readings['Available'], readings['In Use'],
+                                                    readings['Current Load (kW)'], readings['Temperature (°C)'])
+            stations = station_state.frame()
+            if self.feed is not None:
+                metrics['current_power'] = int(stations['Current Load (kW)'].sum())
+                metrics['active_sessions'] = int(stations['In Use'].sum())
+            # Station power is re-split across the active sessions every tick
+            sessions = self.sessions.step(now, stations['In Use'], stations['Power (kW)'], self.interval)
+            metrics['today_energy'], metrics['today_revenue'] = self.today_totals(now, sessions)
+            self.history.append(now, stations['Current Load (kW)'].to_numpy())
+            self.forecast.observe(now, stations['Current Load (kW)'].to_numpy(), stations['In Use'].to_numpy())
+            self.detector.observe_stations(now, stations)
+            deltas = {key: metrics[key] - previous.metrics[key] for key in METRIC_KEYS} if previous else {}
+            snapshot = Snapshot(
+                version=previous.version + 1 if previous else 1,
+                created=now,
+                stations=stations,
+                daily=self._daily,
+                metrics=metrics,
+                deltas=deltas,
+                sessions=sessions,
+                alerts=self.detector.book.frame(),
+                station_state=station_state,
+                feed_error=repr(self.feed.error) if self.feed is not None and self.feed.error else None,
+            )
+            self._snapshot = snapshot
+        return snapshot
+
+    def today_totals(self, now, sessions):
+        """``(kWh, ₹)`` charged today: the archived daily row, sessions ended since, and active sessions so far"""
+        daily = self._daily
+        today = daily[pd.to_datetime(daily['Date']).dt.normalize() == pd.Timestamp(now.date())]
+        energy = (self.sessions.ended_energy - self._archived_energy) + float(sessions.columns['charged'].sum())
+        revenue = today['Revenue (₹)'].sum() + energy * self.sessions.tariff
+        return int(today['Energy (kWh)'].sum() + energy), int(revenue)
+
+    def start(self):
+        """Start the background producer if it is not already running"""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="snapshot-producer", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        if self.archive is not None:
+            with self._lock:
+                self.archive.append(self.sessions.drain_completed())
+
+    def _run(self):
+        next_tick = time.monotonic() + self.interval
+        while not self._stop.wait(max(0.0, next_tick - time.monotonic())):
+            self.tick()
+            next_tick += self.interval
+
+
+def open_store(url=None, history_dir=None, interval=1, webhook=None):
+    """Started ``SnapshotStore`` wired to live telemetry and the session history.
+
+    ``url`` (tcp://host:port) reads a live feed, e.g. ``python ingest.py simulate``;
+    otherwise an in-process simulator stands in for the charge points. Session
+    history lives in Parquet under ``history_dir``, seeded with a month of demo
+    data the first time. Alerts are POSTed to ``webhook`` when given, e.g. to
+    ``python anomaly.py sink``.
+    """
+    if url:
+        host, port = url.removeprefix('tcp://').rsplit(':', 1)
+        source = SocketSource(host, int(port))
+    else:
+        source = SimulatorSource(Simulator(STATIONS['Station ID'], STATIONS['Chargers'], STATIONS['Power (kW)']))
+    feed = IngestService(source, Aggregator(STATIONS['Station ID'], STATIONS['Chargers'])).start()
+    feed.ready.wait(timeout=2)
+    archive = HistoryStore(history_dir or os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'ev-history'))
+    if archive.is_empty():
+        backfill(archive, STATIONS['Station ID'])
+    sinks = [WebhookSink(webhook)] if webhook else []
+    return SnapshotStore(interval=interval, feed=feed, archive=archive, alert_sinks=sinks).start()
@@ -0,0 +1,5 @@
+"""The modules under test live at the repository root, next to ``ev ch3.py``."""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+from allocation import TAPER_FLOOR, TAPER_FROM, acceptance, water_fill
+
+
+def random_fleet(seed, n_stations=50, n_sessions=400):
+    rng = np.random.default_rng(seed)
+    station = rng.integers(0, n_stations, n_sessions)
+    cap = rng.uniform(50, 400, n_stations)
+    demand = acceptance(rng.choice([30, 50, 60, 100, 150], n_sessions), rng.uniform(0, 100, n_sessions))
+    weight = rng.uniform(0.5, 4.5, n_sessions)
+    return station, cap, demand, weight
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_setpoints_stay_between_zero_and_demand(seed):
+    station, cap, demand, weight = random_fleet(seed)
+    setpoint = water_fill(station, cap, demand, weight)
+    assert (setpoint >= 0).all()
+    assert (setpoint <= demand + 1e-9).all()
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_station_total_is_its_power_unless_demand_is_lower(seed):
+    station, cap, demand, weight = random_fleet(seed)
+    setpoint = water_fill(station, cap, demand, weight)
+    total = np.bincount(station, setpoint, len(cap))
+    wanted = np.bincount(station, demand, len(cap))
+    np.testing.assert_allclose(total, np.minimum(cap, wanted), rtol=1e-9, atol=1e-9)
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_unsaturated_sessions_share_one_level_per_station(seed):
+    station, cap, demand, weight = random_fleet(seed)
+    setpoint = water_fill(station, cap, demand, weight)
+    level = setpoint / weight
+    for s in np.unique(station):
+        mine = station == s
+        limited = mine & (setpoint < demand - 1e-9)
+        if limited.any():
+            np.testing.assert_allclose(level[limited], level[limited][0])
+            # Sessions served in full saturate at or below that level
+            assert (demand[mine & ~limited] / weight[mine & ~limited] <= level[limited][0] + 1e-9).all()
+
+
+def test_capped_session_and_split_by_weight():
+    setpoint = water_fill([0, 1, 1], [100.0, 50.0], [150.0, 40.0, 40.0], [1.0, 1.0, 3.0])
+    np.testing.assert_allclose(setpoint, [100.0, 12.5, 37.5])
+
+
+def test_no_sessions():
+    assert len(water_fill([], [100.0], [], [])) == 0
+
+
+def test_acceptance_tapers_to_the_floor():
+    max_kw = np.full(4, 100.0)
+    np.testing.assert_allclose(acceptance(max_kw, [0, TAPER_FROM, (TAPER_FROM + 100) / 2, 100]),
+                               [100, 100, 100 * (1 + TAPER_FLOOR) / 2, 100 * TAPER_FLOOR])
@@ -0,0 +1,41 @@
+import pytest
+
+from anomaly import Detector, fault_trace, replay, score_replay
+
+STATIONS = 200
+# Samples of the faulted metric (1 Hz per station) before the first alert
+MAX_DELAY = {'spike': 5, 'dropout': 5, 'overheat': 60}  # an overheat ramps 0.1 °C/s, so 60 s is +6 °C
+MAX_FALSE_ALERTS = 2
+
+
+@pytest.fixture(scope='module', params=[0, 1, 2])
+def replayed(request):
+    samples, truth = fault_trace(STATIONS, seconds=900, seed=request.param, faults=20)
+    detector = Detector([f"BLR-{i + 1:05d}" for i in range(STATIONS)])
+    replay(detector, samples)
+    return detector, truth
+
+
+def test_every_fault_is_caught_in_time(replayed):
+    detector, truth = replayed
+    alerts = detector.book.frame()
+    station = alerts['station'].map(detector._index).to_numpy()
+    for fault in truth.itertuples():
+        first_seen = alerts['first_seen'][(station == fault.station) & (alerts['metric'] == fault.metric).to_numpy()
+                                          & (alerts['first_seen'] >= fault.start).to_numpy()]
+        assert len(first_seen), f"{fault.kind} on station {fault.station} at {fault.start:.0f} s was missed"
+        assert first_seen.min() - fault.start <= MAX_DELAY[fault.kind], fault
+
+
+def test_false_alerts_stay_bounded(replayed):
+    detector, truth = replayed
+    result = score_replay(detector, truth)
+    assert result['caught'] == result['faults']
+    assert result['false_alerts'] <= MAX_FALSE_ALERTS
+
+
+def test_quiet_trace_raises_no_alerts():
+    samples, _ = fault_trace(STATIONS, seconds=600, seed=3, faults=0)
+    detector = Detector([f"BLR-{i + 1:05d}" for i in range(STATIONS)])
+    replay(detector, samples)
+    assert len(detector.book.frame()) == 0
@@ -0,0 +1,62 @@
+import pytest
+
+from locations import synthetic_locations
+from planning import MIN_CHARGERS, PlanInputs, SiteProblem, greedy, local_search, plan_cost, repair, solve
+
+CASES = [(60, 500.0, 3.0), (200, 1500.0, 3.0), (200, 4000.0, 5.0)]
+
+
+def problem_for(n, budget, radius_km, seed=0):
+    sites = synthetic_locations(n, seed)
+    inputs = PlanInputs(budget=budget, radius_km=radius_km)
+    return sites, SiteProblem(sites, sites['Latitude'], sites['Longitude'], sites['Estimated Daily Traffic'], inputs)
+
+
+@pytest.mark.parametrize('n, budget, radius_km', CASES)
+def test_greedy_plan_is_sized_within_budget(n, budget, radius_km):
+    _, problem = problem_for(n, budget, radius_km)
+    selected = repair(problem, local_search(problem, greedy(problem)))
+    assert len(set(selected)) == len(selected)
+    _, _, cost = plan_cost(problem, selected)
+    assert cost <= budget + 1e-6
+
+
+@pytest.mark.parametrize('n, budget, radius_km', CASES)
+def test_local_search_never_loses_coverage(n, budget, radius_km):
+    _, problem = problem_for(n, budget, radius_km)
+    start = greedy(problem)
+    before, _ = problem.evaluate(start)
+    after, _ = problem.evaluate(local_search(problem, start))
+    assert after >= before - 1e-9
+
+
+def test_repair_brings_an_over_budget_plan_within_budget():
+    _, problem = problem_for(200, 1000.0, 3.0)
+    everything = list(range(problem.n_sites))
+    assert plan_cost(problem, everything)[2] > 1000.0
+    selected = repair(problem, everything)
+    assert selected and plan_cost(problem, selected)[2] <= 1000.0 + 1e-6
+
+
+@pytest.mark.parametrize('n, budget, radius_km', CASES)
+def test_solved_plan_respects_budget_and_bound(n, budget, radius_km):
+    sites, problem = problem_for(n, budget, radius_km)
+    plan = solve(sites, sites['Latitude'], sites['Longitude'], sites['Estimated Daily Traffic'],
+                 PlanInputs(budget=budget, radius_km=radius_km))
+    assert plan.cost.sum() <= budget + 1e-6
+    # The LP bound really bounds the plan, so the reported gap is not clamped at 0
+    assert plan.covered <= plan.upper_bound * (1 + 1e-6)
+    assert 0 <= plan.gap < 1
+    assert 0 < plan.coverage <= 1
+    assert (plan.chargers >= MIN_CHARGERS).all()
+    assert (plan.chargers <= problem.max_chargers[plan.selected]).all()
+
+
+@pytest.mark.parametrize('n, budget, radius_km', CASES)
+def test_milp_plan_is_sized_and_at_least_as_good_as_greedy(n, budget, radius_km):
+    sites, _ = problem_for(n, budget, radius_km)
+    args = (sites, sites['Latitude'], sites['Longitude'], sites['Estimated Daily Traffic'],
+            PlanInputs(budget=budget, radius_km=radius_km))
+    greedy_plan, milp_plan = solve(*args, method='greedy'), solve(*args, method='milp')
+    assert milp_plan.cost.sum() <= budget + 1e-6
+    assert milp_plan.covered >= greedy_plan.covered - 1e-6
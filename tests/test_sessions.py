@@ -0,0 +1,78 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from sessions import COLUMNS, SessionStore
+
+STATIONS = 12
+POWER = np.full(STATIONS, 150.0)
+
+
+def run(store, ticks, seed, start=datetime(2026, 1, 1, 12)):
+    """Tables from ``ticks`` steps with station counts drifting at random"""
+    rng = np.random.default_rng(seed)
+    in_use = rng.integers(0, 8, STATIONS)
+    tables = []
+    for i in range(ticks):
+        in_use = np.clip(in_use + rng.integers(-1, 2, STATIONS), 0, 10)
+        tables.append(store.step(start + timedelta(seconds=30 * i), in_use, POWER, dt=30))
+    return tables
+
+
+def apply(frame, upserted, removed):
+    """What a client holding ``frame`` has after applying a diff"""
+    rows = frame.set_index('Vehicle ID')
+    rows = rows.drop(index=removed)
+    rows = pd.concat([rows.drop(index=upserted['Vehicle ID'], errors='ignore'), upserted.set_index('Vehicle ID')])
+    return rows.sort_index()
+
+
+@pytest.fixture
+def tables():
+    store = SessionStore([f"Station {i + 1}" for i in range(STATIONS)], seed=0)
+    return run(store, 40, seed=1)
+
+
+def test_diff_from_none_is_everything(tables):
+    upserted, removed = tables[0].diff(None)
+    pd.testing.assert_frame_equal(upserted, tables[0].frame())
+    assert removed == []
+
+
+@pytest.mark.parametrize('lag', [1, 3, 10])
+def test_diff_replays_to_the_current_table(tables, lag):
+    for old, new in zip(tables, tables[lag:]):
+        upserted, removed = new.diff(old)
+        pd.testing.assert_frame_equal(apply(old.frame(), upserted, removed), new.frame().set_index('Vehicle ID').sort_index())
+
+
+def test_diff_only_sends_changed_rows(tables):
+    upserted, _ = tables[-1].diff(tables[-2])
+    assert len(upserted) < len(tables[-1])
+
+
+def test_pages_cover_the_query_in_order(tables):
+    table = tables[-1]
+    rows = table.query(sort='Progress', ascending=False)
+    size = 7
+    pages = [table.page(rows, page, size) for page in range(-(-len(rows) // size))]
+    assert all(len(p) == size for p in pages[:-1]) and 0 < len(pages[-1]) <= size
+    pd.testing.assert_frame_equal(pd.concat(pages, ignore_index=True), table.frame(rows))
+    progress = pd.concat(pages)['Progress'].to_numpy()
+    assert (np.diff(progress) <= 0).all()
+
+
+def test_page_past_the_end_is_empty(tables):
+    table = tables[-1]
+    page = table.page(table.query(), page=len(table), size=50)
+    assert page.empty and list(page.columns) == COLUMNS
+
+
+def test_station_query_pages_only_that_station(tables):
+    table = tables[-1]
+    station = table.locations[table.columns['station'][0]]
+    page = table.page(table.query(station), 0, 1000)
+    assert len(page) == (table.locations[table.columns['station']] == station).sum()
+    assert (page['Station'] == station).all()
@@ -0,0 +1,133 @@
+"""Fixed-memory power history for the live charts.
+
+``RingBuffer`` keeps every column twice (at ``i`` and ``i + capacity``), so
+the newest ``n`` samples are always one contiguous slice and windows are
+returned as NumPy views without copying. ``PowerHistory`` stacks two of them:
+1 Hz samples for the last hour and per-minute min/max for the last day, which
+is all a chart of the day can show anyway.
+"""
+import numpy as np
+
+WINDOWS = {'60s': 60, '15m': 15 * 60, '1h': 60 * 60, '24h': 24 * 60 * 60}
+
+
+class RingBuffer:
+    """Preallocated ``rows x capacity`` float32 samples with one shared time column"""
+
+    def __init__(self, rows, capacity):
+        self.capacity = capacity
+        self._times = np.zeros(2 * capacity, dtype='datetime64[s]')
+        self._values = np.zeros((rows, 2 * capacity), dtype=np.float32)
+        self._head = 0
+        self.count = 0
+
+    @property
+    def nbytes(self):
+        return self._times.nbytes + self._values.nbytes
+
+    def append(self, timestamp, values):
+        """Store one sample per row in O(1)"""
+        i = self._head
+        self._times[i] = self._times[i + self.capacity] = timestamp
+        self._values[:, i] = self._values[:, i + self.capacity] = values
+        self._head = (i + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def last(self, n):
+        """Views of the newest ``n`` samples: ``(times, values[rows, n])``"""
+        n = min(n, self.count)
+        end = self._head + self.capacity
+        return self._times[end - n:end], self._values[:, end - n:end]
+
+
+class PowerHistory:
+    """Power per station (plus a fleet total row) at 1 Hz, kept for 24 hours.
+
+    Windows up to an hour come from the raw 1 Hz buffer; longer windows come
+    from per-minute min/max, so peaks survive at every zoom level. Buffers
+    carry ``slack`` spare samples so a returned view stays valid for that
+    many further appends.
+    """
+
+    def __init__(self, station_ids, raw_seconds=3600, minutes=24 * 60, slack=60):
+        self.station_ids = list(station_ids)
+        self.rows = {sid: i for i, sid in enumerate(self.station_ids)}
+        self.total_row = len(self.station_ids)
+        n = self.total_row + 1
+        self.raw = RingBuffer(n, raw_seconds + slack)
+        self.minute_min = RingBuffer(n, minutes + slack)
+        self.minute_max = RingBuffer(n, minutes + slack)
+        self._minute = None
+        self._min = np.full(n, np.inf, dtype=np.float32)
+        self._max = np.full(n, -np.inf, dtype=np.float32)
+
+    @property
+    def nbytes(self):
+        return self.raw.nbytes + self.minute_min.nbytes + self.minute_max.nbytes
+
+    def append(self, timestamp, loads):
+        """Record one sample of per-station load in kW"""
+        timestamp = np.datetime64(timestamp, 's')
+        values = np.empty(self.total_row + 1, dtype=np.float32)
+        values[:-1] = loads
+        values[-1] = values[:-1].sum()
+        self.raw.append(timestamp, values)
+
+        minute = timestamp.astype('datetime64[m]')
+        if self._minute is not None and minute != self._minute:
+            self._flush_minute()
+        self._minute = minute
+        np.minimum(self._min, values, out=self._min)
+        np.maximum(self._max, values, out=self._max)
+
+    def _flush_minute(self):
+        self.minute_min.append(self._minute, self._min)
+        self.minute_max.append(self._minute, self._max)
+        self._min.fill(np.inf)
+        self._max.fill(-np.inf)
+
+    def window(self, seconds, station=None):
+        """``(times, low, high)`` views for the last ``seconds`` of one row.
+
+        ``station`` is a Station ID, or None for the fleet total. ``low`` and
+        ``high`` are the same array for raw samples.
+        """
+        row = self.total_row if station is None else self.rows[station]
+        if seconds <= self.raw.capacity:
+            times, values = self.raw.last(seconds)
+            series = values[row]
+            return times, series, series
+        times, low = self.minute_min.last(seconds // 60)
+        _, high = self.minute_max.last(seconds // 60)
+        return times, low[row], high[row]
+
+
+def minmax_downsample(times, low, high, buckets=600):
+    """Reduce a series to at most ``2 * buckets`` points, keeping each bucket's extremes.
+
+    The oldest samples that do not fill a whole bucket are dropped. Returns
+    new arrays ``(times, values)`` with min and max of every bucket in time
+    order.
+    """
+    n = len(times)
+    if n <= 2 * buckets:
+        if low is high:
+            return times, low
+        # Min/max tiers: draw both edges of every minute
+        return np.repeat(times, 2), np.column_stack([low, high]).ravel()
+    size = n // buckets
+    start = n - size * buckets
+    t = times[start:].reshape(buckets, size)
+    lo = low[start:].reshape(buckets, size)
+    hi = high[start:].reshape(buckets, size)
+    i_lo = lo.argmin(axis=1)
+    i_hi = hi.argmax(axis=1)
+    first = np.minimum(i_lo, i_hi)
+    second = np.maximum(i_lo, i_hi)
+    rows = np.arange(buckets)
+    lo_first = i_lo <= i_hi
+    v_first = np.where(lo_first, lo[rows, i_lo], hi[rows, i_hi])
+    v_second = np.where(lo_first, hi[rows, i_hi], lo[rows, i_lo])
+    out_t = np.column_stack([t[rows, first], t[rows, second]]).ravel()
+    out_v = np.column_stack([v_first, v_second]).ravel()
+    return out_t, out_v
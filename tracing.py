@@ -0,0 +1,192 @@
+"""Named spans, latency histograms and allocation sampling for dashboard reruns.
+
+``Tracer.span(name)`` times a section of the script into a fixed-bucket
+histogram. While tracing is off it hands back one shared no-op context
+manager, so an instrumented section costs an attribute check and a call.
+
+``begin_rerun`` and ``end_rerun`` bracket a whole script run. With
+tracemalloc sampling on, every ``sample_every``-th rerun records the bytes
+each span allocated and, at the end, the source lines that allocated the
+most blocks. Reruns of different sessions share one process, so these
+figures are approximate when several sessions run at once. The sample
+belongs to the tracer, not to the rerun that started it: the next
+``end_rerun`` on any thread stops tracemalloc, so a rerun that never
+reaches its own ``end_rerun`` cannot leave it running.
+
+``prometheus()`` renders everything in the Prometheus text format.
+``write_prometheus`` saves it atomically for a textfile collector.
+"""
+import bisect
+import contextlib
+import functools
+import os
+import threading
+import time
+import tracemalloc
+import uuid
+from itertools import accumulate
+
+import pandas as pd
+
+# Histogram bucket upper bounds in seconds, Prometheus style
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, float('inf'))
+_NOOP = contextlib.nullcontext()
+
+
+class Histogram:
+    """Counts per latency bucket plus sum and count"""
+
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS)
+        self.sum = 0.0
+        self.count = 0
+        self.alloc_bytes = 0
+        self.alloc_samples = 0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.sum += seconds
+        self.count += 1
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the ``q`` quantile"""
+        if not self.count:
+            return float('nan')
+        return BUCKETS[bisect.bisect_left(list(accumulate(self.counts)), q * self.count)]
+
+
+class _Span:
+    __slots__ = ('tracer', 'name', 'start', 'memory')
+
+    def __init__(self, tracer, name):
+        self.tracer = tracer
+        self.name = name
+
+    def __enter__(self):
+        self.memory = tracemalloc.get_traced_memory()[0] if self.tracer._sampling else None
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        # The sample may have been stopped by another session's rerun while this span ran
+        sampled = self.memory is not None and tracemalloc.is_tracing()
+        allocated = tracemalloc.get_traced_memory()[0] - self.memory if sampled else None
+        self.tracer._record(self.name, elapsed, allocated)
+        return False
+
+
+class Tracer:
+    """Process-wide span recorder shared by every session"""
+
+    def __init__(self, enabled=False, sample_every=0, top_lines=10):
+        self.enabled = enabled
+        # tracemalloc on every n-th rerun; 0 turns allocation sampling off
+        self.sample_every = sample_every
+        self.top_lines = top_lines
+        self.histograms = {}
+        self.reruns = 0
+        self.top_allocations = []
+        self._lock = threading.Lock()
+        self._sampling = False
+        # tracemalloc snapshot taken when the current sample started
+        self._baseline = None
+        self._run = threading.local()
+
+    def span(self, name):
+        """Context manager timing ``name``; a shared no-op while tracing is off"""
+        if not self.enabled:
+            return _NOOP
+        return _Span(self, name)
+
+    def traced(self, name):
+        """Decorator running the function inside ``span(name)``, checked per call"""
+        def decorate(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.span(name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorate
+
+    def _record(self, name, seconds, allocated):
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram()
+            histogram.observe(seconds)
+            if allocated is not None:
+                histogram.alloc_bytes += allocated
+                histogram.alloc_samples += 1
+
+    def begin_rerun(self):
+        if not self.enabled:
+            return
+        with self._lock:
+            self.reruns += 1
+            if self.sample_every and self.reruns % self.sample_every == 0 and not self._sampling:
+                self._sampling = True
+                tracemalloc.start()
+                self._baseline = tracemalloc.take_snapshot()
+        self._run.start = time.perf_counter()
+
+    def end_rerun(self):
+        # Not gated on ``enabled``: a sample that started while tracing was on still stops
+        start = getattr(self._run, 'start', None)
+        if start is not None:
+            self._run.start = None
+            self._record('rerun', time.perf_counter() - start, None)
+        with self._lock:
+            if not self._sampling:
+                return
+            stats = tracemalloc.take_snapshot().compare_to(self._baseline, 'lineno')
+            tracemalloc.stop()
+            self._sampling, self._baseline = False, None
+            top = sorted(stats, key=lambda s: -s.count_diff)[:self.top_lines]
+            self.top_allocations = [(str(s.traceback[0]), s.count_diff, s.size_diff) for s in top]
+
+    def reset(self):
+        with self._lock:
+            self.histograms = {}
+            self.reruns = 0
+            self.top_allocations = []
+
+    def summary(self):
+        """One row per span: count, p50/p95 bucket bounds, mean and sampled allocation"""
+        with self._lock:
+            items = sorted(self.histograms.items())
+            rows = [(name, h.count, h.quantile(0.5) * 1000, h.quantile(0.95) * 1000, h.sum / h.count * 1000,
+                     h.alloc_bytes / h.alloc_samples / 1024 if h.alloc_samples else float('nan'))
+                    for name, h in items]
+        return pd.DataFrame(rows, columns=['Span', 'Count', 'p50 ≤ (ms)', 'p95 ≤ (ms)', 'Mean (ms)',
+                                           'Allocated (KB/run)'])
+
+    def prometheus(self, prefix='ev_dashboard'):
+        """All spans in the Prometheus text exposition format"""
+        lines = [f'# HELP {prefix}_span_seconds Time spent in each instrumented dashboard section.',
+                 f'# TYPE {prefix}_span_seconds histogram']
+        with self._lock:
+            items = sorted(self.histograms.items())
+            reruns = self.reruns
+            for name, h in items:
+                for le, count in zip(BUCKETS, accumulate(h.counts)):
+                    bound = '+Inf' if le == float('inf') else repr(le)
+                    lines.append(f'{prefix}_span_seconds_bucket{{span="{name}",le="{bound}"}} {count}')
+                lines.append(f'{prefix}_span_seconds_sum{{span="{name}"}} {h.sum:.6f}')
+                lines.append(f'{prefix}_span_seconds_count{{span="{name}"}} {h.count}')
+            lines += [f'# HELP {prefix}_span_alloc_bytes Net bytes allocated in each section on sampled reruns.',
+                      f'# TYPE {prefix}_span_alloc_bytes summary']
+            for name, h in items:
+                if h.alloc_samples:
+                    lines.append(f'{prefix}_span_alloc_bytes_sum{{span="{name}"}} {h.alloc_bytes}')
+                    lines.append(f'{prefix}_span_alloc_bytes_count{{span="{name}"}} {h.alloc_samples}')
+        lines += [f'# HELP {prefix}_reruns_total Script reruns traced.', f'# TYPE {prefix}_reruns_total counter',
+                  f'{prefix}_reruns_total {reruns}']
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, path):
+        """Write ``prometheus()`` to ``path`` atomically"""
+        tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp, 'w') as f:
+            f.write(self.prometheus())
+        os.replace(tmp, path)
@@ -0,0 +1,73 @@
+"""Historical Data page: current stations and daily energy, revenue and session trends."""
+import plotly.express as px
+import plotly.graph_objects as go
+import streamlit as st
+
+from dashboard import get_snapshot_store, get_tracer, load_daily_history
+
+tracer = get_tracer()
+snapshot = get_snapshot_store().latest()
+existing_stations_df, daily_df = snapshot.stations, snapshot.daily
+
+st.header("📈 Historical Performance Data")
+
+col1, col2, col3, col4 = st.columns(4)
+with col1:
+    st.metric("Active Stations", len(existing_stations_df))
+with col2:
+    st.metric("Total Chargers", existing_stations_df['Chargers'].sum())
+with col3:
+    st.metric("Available Now", existing_stations_df['Available'].sum())
+with col4:
+    st.metric("Avg Utilization", f"{existing_stations_df['Utilization'].mean():.1f}%")
+
+st.divider()
+
+st.subheader("Current Stations")
+st.dataframe(existing_stations_df[['Station ID', 'Location', 'Status', 'Chargers', 'Available', 'In Use', 'Utilization']], width='stretch', hide_index=True)
+
+history_periods = {'30 Days': 31, '90 Days': 90, '1 Year': 365}
+history_period = st.radio("Period", list(history_periods), horizontal=True)
+if history_period != '30 Days':
+    daily_df = load_daily_history(history_periods[history_period])
+
+col1, col2 = st.columns(2)
+
+with col1:
+    st.subheader(f"Daily Energy Consumption ({history_period})")
+    fig_energy = go.Figure()
+    fig_energy.add_trace(go.Scatter(
+        x=daily_df['Date'],
+        y=daily_df['Energy (kWh)'],
+        mode='lines+markers',
+        line=dict(color='#667eea', width=3),
+        fill='tozeroy'
+    ))
+    fig_energy.update_layout(height=350)
+    with tracer.span('chart.energy'):
+        st.plotly_chart(fig_energy, width='stretch')
+
+with col2:
+    st.subheader("Daily Revenue (₹)")
+    fig_revenue = go.Figure(data=[go.Bar(
+        x=daily_df['Date'],
+        y=daily_df['Revenue (₹)'],
+        marker=dict(
+            color=daily_df['Revenue (₹)'],
+            colorscale='Greens'
+        )
+    )])
+    fig_revenue.update_layout(height=350, showlegend=False)
+    with tracer.span('chart.revenue'):
+        st.plotly_chart(fig_revenue, width='stretch')
+
+st.subheader("Charging Sessions Trend")
+fig_sessions = px.line(
+    daily_df,
+    x='Date',
+    y='Sessions',
+    markers=True
+)
+fig_sessions.update_layout(height=300)
+with tracer.span('chart.sessions'):
+    st.plotly_chart(fig_sessions, width='stretch')
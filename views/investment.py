@@ -0,0 +1,148 @@
+"""Investment Analysis page: investment mix, Monte Carlo payback and the sensitivity sweep."""
+import os
+
+import plotly.express as px
+import streamlit as st
+
+from dashboard import CACHE_DIR, get_bangalore_locations, get_figure_cache, get_tracer, session_figure_stats
+from figures import investment_bar, payback_range, roi_scatter
+from locations import data_version
+from roi import DemandInputs, TariffInputs, payback_summary
+from sweep import SweepGrid, SweepRunner
+
+
+@st.cache_data(max_entries=32)
+def roi_distribution(version, scenarios, utilization_scale, tariff, electricity_cost, opex_per_charger, _locations):
+    """Monte Carlo payback percentiles per site, keyed by the scenario inputs and data version"""
+    demand = DemandInputs(scenarios=scenarios, utilization_scale=utilization_scale)
+    return payback_summary(_locations, demand, TariffInputs(tariff=tariff, electricity_cost=electricity_cost,
+                                                           opex_per_charger=opex_per_charger))
+
+
+@st.cache_resource(max_entries=8)
+def get_sweep(version, steps, _locations):
+    """Sensitivity sweep shared across sessions; finished chunks are checkpointed under EV_SWEEP_DIR"""
+    root = os.environ.get('EV_SWEEP_DIR', os.path.join(CACHE_DIR, 'ev-sweeps'))
+    return SweepRunner(_locations, SweepGrid.linear(steps), root)
+
+
+@st.cache_data(max_entries=8)
+def priority_breakdown(version, _locations):
+    """Investment, chargers and site count per priority"""
+    priority_investment = _locations.groupby('Priority').agg({
+        'Investment (Lakhs)': 'sum',
+        'Recommended Chargers': 'sum',
+        'Location Name': 'count'
+    }).round(2)
+    priority_investment.columns = ['Total Investment (Lakhs)', 'Total Chargers', 'Number of Locations']
+    return priority_investment
+
+
+tracer = get_tracer()
+locations_df = get_bangalore_locations()
+locations_version = data_version(locations_df)
+figure_cache = get_figure_cache()
+figure_stats = session_figure_stats()
+
+st.header("💰 Investment & ROI Analysis")
+
+col1, col2, col3, col4 = st.columns(4)
+with col1:
+    st.metric("Total Investment Required", f"₹{locations_df['Investment (Lakhs)'].sum():.0f} L")
+with col2:
+    st.metric("Avg Investment per Location", f"₹{locations_df['Investment (Lakhs)'].mean():.0f} L")
+with col3:
+    st.metric("Avg ROI Period", f"{locations_df['Expected ROI (months)'].mean():.0f} months")
+with col4:
+    st.metric("Best ROI Location", locations_df.loc[locations_df['Expected ROI (months)'].idxmin(), 'Location Name'].split('(')[0])
+
+st.divider()
+
+col1, col2 = st.columns(2)
+
+with col1:
+    st.subheader("Investment vs Expected ROI")
+    fig_roi = figure_cache.figure(('roi', locations_version), lambda: roi_scatter(locations_df), figure_stats)
+    with tracer.span('chart.roi'):
+        st.plotly_chart(fig_roi, width='stretch')
+
+with col2:
+    st.subheader("Investment Distribution")
+    fig_invest = figure_cache.figure(('invest', locations_version), lambda: investment_bar(locations_df), figure_stats)
+    with tracer.span('chart.invest'):
+        st.plotly_chart(fig_invest, width='stretch')
+
+st.subheader("Investment Breakdown by Priority")
+priority_investment = priority_breakdown(locations_version, locations_df)
+st.dataframe(priority_investment, width='stretch')
+
+st.subheader("🎯 Top 5 Locations by ROI")
+best_roi = locations_df.nsmallest(5, 'Expected ROI (months)')[['Location Name', 'Priority', 'Investment (Lakhs)', 'Expected ROI (months)', 'Estimated Daily Traffic']]
+st.dataframe(best_roi, width='stretch', hide_index=True)
+
+st.divider()
+st.subheader("🎲 Payback Scenarios")
+col1, col2, col3, col4, col5 = st.columns(5)
+with col1:
+    roi_tariff = st.slider("Tariff (₹/kWh)", 12.0, 30.0, 20.0, 0.5)
+with col2:
+    roi_electricity = st.slider("Electricity Cost (₹/kWh)", 4.0, 14.0, 8.0, 0.5)
+with col3:
+    roi_opex = st.slider("Opex per Charger (₹/month)", 5000, 30000, 15000, 1000)
+with col4:
+    roi_utilization = st.slider("Utilization Scale", 0.5, 1.5, 1.0, 0.05)
+with col5:
+    roi_scenarios = st.select_slider("Scenarios", [1000, 2000, 5000, 10000], value=10000)
+
+payback = roi_distribution(locations_version, roi_scenarios, roi_utilization, roi_tariff,
+                           roi_electricity, roi_opex, locations_df)
+payback = payback.sort_values('P50 Payback (months)')
+horizon = DemandInputs().months
+fig_payback = figure_cache.figure(
+    ('payback', locations_version, roi_scenarios, roi_utilization, roi_tariff, roi_electricity, roi_opex),
+    lambda: payback_range(payback), figure_stats)
+with tracer.span('chart.payback'):
+    st.plotly_chart(fig_payback, width='stretch')
+st.dataframe(payback, width='stretch', hide_index=True)
+st.caption(f"{roi_scenarios:,} scenarios over {horizon} months; a payback above {horizon} months means the site does not pay back within the horizon.")
+
+st.divider()
+st.subheader("🧮 Sensitivity Sweep")
+col1, col2, col3 = st.columns([2, 1, 1])
+with col1:
+    sweep_steps = st.select_slider("Steps per axis", [6, 8, 10, 12, 16], value=10,
+                                   help="Capex scale, tariff, electricity cost and utilization are each swept over this many values")
+sweep = get_sweep(locations_version, sweep_steps, locations_df)
+with col2:
+    if st.button("▶️ Run sweep", disabled=sweep.running or sweep.done, width='stretch'):
+        sweep.start()
+with col3:
+    if st.button("⏹️ Cancel", disabled=not sweep.running, width='stretch'):
+        # The run stops after its in-flight chunks; the progress fragment notices and reruns the page
+        sweep.cancel()
+
+
+@st.fragment(run_every=1 if sweep.running else None)
+def sweep_progress():
+    done, total = sweep.progress
+    st.progress(done / total, text=f"{done:,} / {total:,} combinations ({sweep.elapsed:.1f} s)")
+    if sweep.error is not None:
+        st.error(f"Sweep failed: {sweep.error}")
+    results = sweep.results()
+    if not results.empty:
+        heat = results.pivot_table(index='Capex Scale', columns='Tariff (₹/kWh)',
+                                   values='Median Payback (months)', aggfunc='mean')
+        fig_sweep = px.imshow(heat, color_continuous_scale='RdYlGn_r', aspect='auto', origin='lower',
+                              labels=dict(color='Median Payback (months)'))
+        fig_sweep.update_layout(height=400)
+        with tracer.span('chart.sweep'):
+            st.plotly_chart(fig_sweep, width='stretch')
+        st.caption("Median payback across sites, averaged over the electricity cost and utilization values done so far.")
+    # Leave polling mode once the sweep has stopped
+    if not sweep.running and st.session_state.get('sweep_polling'):
+        st.session_state.sweep_polling = False
+        st.rerun()
+    st.session_state.sweep_polling = sweep.running
+
+
+sweep_progress()
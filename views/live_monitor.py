@@ -0,0 +1,254 @@
+"""Live Monitor page: metrics, alerts, station status, power chart and active sessions."""
+from datetime import datetime
+
+import numpy as np
+import plotly.graph_objects as go
+import streamlit as st
+
+from allocation import station_totals
+from dashboard import get_snapshot_store, get_tracer
+from forecast import HORIZONS
+from sessions import COLUMNS as SESSION_COLUMNS
+from stations import GRID_METRICS, StationGrid
+from timeseries import WINDOWS, minmax_downsample
+
+tracer = get_tracer()
+
+
+# Up to this many stations get a card each; larger fleets get the heatmap
+CARD_LIMIT = 12
+SIMULATED_HELP = "Demo value: the telemetry feed does not report vehicles queueing (see telemetry.SIMULATED_METRICS)"
+
+
+def station_cards(stations, alerting):
+    """One row of metrics per station"""
+    for idx, station in stations.iterrows():
+        with st.container():
+            col1, col2, col3, col4, col5, col6 = st.columns([2, 1, 1, 1, 1, 1])
+
+            with col1:
+                status_color = "#10b981" if station['Status'] == 'Active' else "#ef4444"
+                st.markdown(f"### <span style='color: {status_color};'>●</span> {station['Location']}", unsafe_allow_html=True)
+                st.caption(f"Station ID: {station['Station ID']}")
+
+            with col2:
+                st.metric("Available", station['Available'], delta=f"of {station['Chargers']}")
+
+            with col3:
+                util_color = "#10b981" if station['Utilization'] < 70 else "#f97316"
+                st.markdown(f"**Utilization**<br><span style='font-size: 24px; color: {util_color};'>{station['Utilization']}%</span>", unsafe_allow_html=True)
+
+            with col4:
+                st.metric("In Use", station['In Use'])
+
+            with col5:
+                st.metric("Load", f"{station['Current Load (kW)']} kW",
+                          delta="anomaly" if (station['Station ID'], 'load') in alerting else None, delta_color="inverse")
+
+            with col6:
+                overheating = (station['Station ID'], 'temperature') in alerting or station['Temperature (°C)'] >= 40
+                temp_color = "#ef4444" if overheating else "#10b981"
+                st.markdown(f"**Temp**<br><span style='font-size: 24px; color: {temp_color};'>{station['Temperature (°C)']}°C</span>", unsafe_allow_html=True)
+
+            # Progress bar for utilization
+            st.progress(station['Utilization'] / 100)
+
+        st.divider()
+
+
+def station_heatmap(table, stations, alerting):
+    """One heatmap cell per station; the session's grid only re-reads stations changed since its last tick"""
+    grid = st.session_state.get('station_grid')
+    if grid is None or grid.size != len(table):
+        grid = st.session_state.station_grid = StationGrid(table)
+    changed = grid.update(table)
+
+    metric = st.radio("Colour by", list(GRID_METRICS), horizontal=True, key='station_metric')
+    z, cells = grid.matrix(metric)
+    _, scale, (low, high) = GRID_METRICS[metric]
+    fig_stations = go.Figure(go.Heatmap(
+        z=z, customdata=cells, text=grid.labels, zmin=low, zmax=high, colorscale=scale, xgap=1, ygap=1,
+        hovertemplate="<b>%{text}</b><br>Utilization %{customdata[0]:.0f}%<br>"
+                      "In use %{customdata[3]:.0f} of %{customdata[5]:.0f}<br>"
+                      "Load %{customdata[6]:.0f} kW<br>Temp %{customdata[2]:.0f}°C<extra></extra>"
+    ))
+    fig_stations.update_layout(height=min(600, max(200, grid.height * 16)), margin=dict(l=0, r=0, t=10, b=0))
+    fig_stations.update_xaxes(visible=False)
+    fig_stations.update_yaxes(visible=False, autorange='reversed')
+    with tracer.span('chart.stations'):
+        st.plotly_chart(fig_stations, width='stretch')
+
+    # Single cells are hard to spot at fleet scale, so list the stations that need attention
+    alerting_ids = [station_id for station_id, _ in alerting]
+    attention = ((stations['Temperature (°C)'] >= 40) | (stations['Utilization'] >= 90)
+                 | stations['Station ID'].isin(alerting_ids))
+    st.caption(f"{len(table):,} stations · {changed:,} changed since this view last updated · "
+               f"{int(attention.sum()):,} need attention (open alert, ≥ 40°C or ≥ 90% utilization)")
+    if attention.any():
+        st.dataframe(stations[attention], width='stretch', hide_index=True, height=240)
+
+
+# Runs as a fragment so each refresh tick re-renders only the live panels
+@st.fragment(run_every=st.session_state.refresh_interval if st.session_state.auto_refresh else None)
+@tracer.traced('live.fragment')
+def live_monitor():
+    """Render live metrics, station status, power chart and active sessions"""
+    snapshot = get_snapshot_store().latest()
+    existing_stations_df, realtime_metrics, deltas = snapshot.stations, snapshot.metrics, snapshot.deltas
+    if snapshot.feed_error:
+        st.error(f"Telemetry feed stopped ({snapshot.feed_error}). Station data below is its last reading, not live.")
+    
+    # Real-time Key Metrics
+    col1, col2, col3, col4, col5, col6 = st.columns(6)
+    
+    forecast = get_snapshot_store().forecast
+    _, power_next, power_low, power_high = forecast.predict('load', HORIZONS['1 hour'])
+    _, sessions_next, sessions_low, sessions_high = forecast.predict('sessions', HORIZONS['1 hour'])
+    with col1:
+        st.metric("⚡ Current Power", f"{realtime_metrics['current_power']} kW", 
+                 delta=f"{deltas.get('current_power', 0)} kW",
+                 help=f"Next hour: {power_next[-1]:.0f} kW ({power_low[-1]:.0f}-{power_high[-1]:.0f})")
+    with col2:
+        st.metric("🔌 Active Sessions", realtime_metrics['active_sessions'],
+                 delta=f"{deltas.get('active_sessions', 0)}",
+                 help=f"Next hour: {sessions_next[-1]:.0f} ({sessions_low[-1]:.0f}-{sessions_high[-1]:.0f})")
+    with col3:
+        st.metric("📊 Today's Energy", f"{realtime_metrics['today_energy']:,} kWh",
+                 delta=f"{deltas.get('today_energy', 0)} kWh",
+                 help="Sessions archived today plus the energy delivered so far by active sessions")
+    with col4:
+        st.metric("💰 Today's Revenue", f"₹{realtime_metrics['today_revenue']:,}",
+                 delta=f"{deltas.get('today_revenue', 0):,} ₹")
+    with col5:
+        st.metric("⏳ Queue Waiting (simulated)", realtime_metrics['queue_waiting'],
+                 delta=f"{deltas.get('queue_waiting', 0)}", help=SIMULATED_HELP)
+    with col6:
+        st.metric("⏱️ Avg Wait Time (simulated)", f"{realtime_metrics['avg_wait_time']} min",
+                 delta=f"{deltas.get('avg_wait_time', 0)} min", help=SIMULATED_HELP)
+    
+    st.divider()
+    
+    # Alerts from the streaming temperature/load detector
+    alerts = snapshot.alerts
+    open_alerts = alerts[alerts['resolved'].isna()]
+    st.subheader(f"🚨 Alerts ({len(open_alerts)} open)")
+    if len(alerts):
+        alert_view = alerts.assign(
+            **{'First Seen': alerts['first_seen'].map(lambda t: datetime.fromtimestamp(t).strftime('%H:%M:%S')),
+               'State': np.where(alerts['resolved'].isna(), 'Open', 'Resolved')})
+        st.dataframe(alert_view[['State', 'station', 'metric', 'kind', 'value', 'score', 'count', 'First Seen']]
+                     .rename(columns=str.title).round({'Value': 1, 'Score': 1}), width='stretch', hide_index=True)
+    else:
+        st.caption("No anomalies detected since the dashboard started.")
+    alerting = set(zip(open_alerts['station'], open_alerts['metric']))
+    
+    st.divider()
+    
+    # Live station status
+    st.subheader("🏢 Live Station Status")
+    
+    with tracer.span('live.stations'):
+        if len(existing_stations_df) <= CARD_LIMIT:
+            station_cards(existing_stations_df, alerting)
+        else:
+            station_heatmap(snapshot.station_state, existing_stations_df, alerting)
+    
+    # Real-time power consumption chart
+    st.subheader("⚡ Real-Time Power Consumption")
+    
+    col1, col2, col3 = st.columns([1, 2, 1])
+    with col1:
+        window = st.radio("Window", list(WINDOWS), horizontal=True, key='power_window')
+    with col2:
+        station_options = ['All stations'] + list(existing_stations_df['Station ID'])
+        power_station = st.selectbox("Station", station_options, key='power_station')
+    with col3:
+        horizon = st.selectbox("Forecast", ['Off'] + list(HORIZONS), index=2, key='power_forecast')
+    
+    with tracer.span('live.power_chart'):
+        # Views straight out of the shared ring buffer, reduced to per-bucket min/max
+        station_id = None if power_station == 'All stations' else power_station
+        times, low, high = get_snapshot_store().history.window(WINDOWS[window], station_id)
+        power_times, power_values = minmax_downsample(times, low, high)
+    
+        fig_realtime = go.Figure()
+        fig_realtime.add_trace(go.Scatter(
+            x=power_times,
+            y=power_values,
+            mode='lines',
+            line=dict(color='#667eea', width=2),
+            fill='tozeroy',
+            fillcolor='rgba(102, 126, 234, 0.3)',
+            name='Actual'
+        ))
+        if horizon != 'Off':
+            f_times, f_mean, f_low, f_high = get_snapshot_store().forecast.predict('load', HORIZONS[horizon], station_id)
+            fig_realtime.add_trace(go.Scatter(
+                x=f_times + f_times[::-1],
+                y=np.concatenate([f_high, f_low[::-1]]),
+                fill='toself',
+                fillcolor='rgba(249, 115, 22, 0.2)',
+                line=dict(width=0),
+                hoverinfo='skip',
+                name='80% band'
+            ))
+            fig_realtime.add_trace(go.Scatter(
+                x=f_times,
+                y=f_mean,
+                mode='lines',
+                line=dict(color='#f97316', width=2, dash='dash'),
+                name='Forecast'
+            ))
+        fig_realtime.update_layout(
+            height=300,
+            xaxis_title="Time",
+            yaxis_title="Power (kW)",
+            hovermode='x unified'
+        )
+        with tracer.span('chart.realtime'):
+            st.plotly_chart(fig_realtime, width='stretch')
+    
+    # Active charging sessions
+    st.subheader("🔌 Active Charging Sessions")
+    
+    active_sessions = snapshot.sessions
+    
+    # Filtered, sorted and paged on the server; only the visible page goes to the browser
+    col1, col2, col3, col4, col5 = st.columns([2, 2, 1, 1, 1])
+    with col1:
+        session_station = st.selectbox("Station", ['All stations'] + list(active_sessions.locations), key='session_station')
+    with col2:
+        session_sort = st.selectbox("Sort by", SESSION_COLUMNS, index=SESSION_COLUMNS.index('Start Time'), key='session_sort')
+    with col3:
+        session_desc = st.toggle("Descending", key='session_desc')
+    with tracer.span('live.sessions_query'):
+        rows = active_sessions.query(None if session_station == 'All stations' else session_station, session_sort,
+                                     not session_desc)
+    with col4:
+        session_size = st.selectbox("Rows", [25, 50, 100], index=1, key='session_size')
+    pages = max(1, -(-len(rows) // session_size))
+    if st.session_state.get('session_page', 1) > pages:
+        st.session_state.session_page = pages
+    with col5:
+        session_page = st.number_input("Page", 1, pages, key='session_page')
+    
+    with tracer.span('live.sessions_page'):
+        st.dataframe(active_sessions.page(rows, session_page - 1, session_size), width='stretch', hide_index=True, column_config={
+            'Progress': st.column_config.ProgressColumn("Progress", format="%d%%", min_value=0, max_value=100),
+            'Setpoint (kW)': st.column_config.NumberColumn("Setpoint (kW)", format="%.1f kW",
+                                                           help="Power allocated by the load manager this tick"),
+        })
+    totals = station_totals(active_sessions, existing_stations_df)
+    if len(totals) <= CARD_LIMIT:
+        st.caption(" · ".join(f"{row['Location']}: {row['Allocated (kW)']:.0f} of {row['Power (kW)']} kW allocated"
+                              for _, row in totals.iterrows()))
+    else:
+        st.caption(f"{totals['Allocated (kW)'].sum():,.0f} of {totals['Power (kW)'].sum():,} kW allocated across "
+                   f"{len(totals):,} stations · {int((totals['Headroom (kW)'] < 1).sum()):,} at their cap")
+    st.caption(f"Rows {(session_page - 1) * session_size + 1 if len(rows) else 0}-"
+               f"{min(session_page * session_size, len(rows))} of {len(rows):,} · "
+               f"Live data as of {snapshot.created.strftime('%H:%M:%S')} (snapshot #{snapshot.version})")
+
+
+st.header("🔴 Live Station Monitoring")
+live_monitor()
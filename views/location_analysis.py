@@ -0,0 +1,48 @@
+"""Location Analysis page: site counts, priority and area mix, traffic."""
+import streamlit as st
+
+from dashboard import get_bangalore_locations, get_figure_cache, get_tracer, session_figure_stats
+from figures import area_type_bar, priority_pie, traffic_bar
+from locations import data_version
+
+tracer = get_tracer()
+locations_df = get_bangalore_locations()
+locations_version = data_version(locations_df)
+figure_cache = get_figure_cache()
+figure_stats = session_figure_stats()
+
+st.header("📊 Detailed Location Analysis")
+
+col1, col2, col3, col4 = st.columns(4)
+with col1:
+    st.metric("Proposed Locations", len(locations_df))
+with col2:
+    st.metric("Total Chargers Planned", locations_df['Recommended Chargers'].sum())
+with col3:
+    st.metric("Avg Daily Traffic", f"{locations_df['Estimated Daily Traffic'].mean():,.0f}")
+with col4:
+    st.metric("Total Investment", f"₹{locations_df['Investment (Lakhs)'].sum():.0f} L")
+
+st.divider()
+
+col1, col2 = st.columns(2)
+
+with col1:
+    st.subheader("Locations by Priority")
+    fig_priority = figure_cache.figure(('priority', locations_version), lambda: priority_pie(locations_df), figure_stats)
+    with tracer.span('chart.priority'):
+        st.plotly_chart(fig_priority, width='stretch')
+
+with col2:
+    st.subheader("Area Type Distribution")
+    fig_area = figure_cache.figure(('area', locations_version), lambda: area_type_bar(locations_df), figure_stats)
+    with tracer.span('chart.area'):
+        st.plotly_chart(fig_area, width='stretch')
+
+st.subheader("Daily Traffic Analysis by Location")
+fig_traffic = figure_cache.figure(('traffic', locations_version), lambda: traffic_bar(locations_df), figure_stats)
+with tracer.span('chart.traffic'):
+    st.plotly_chart(fig_traffic, width='stretch')
+
+st.subheader("Complete Location Details")
+st.dataframe(locations_df, width='stretch', height=400)
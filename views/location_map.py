@@ -0,0 +1,83 @@
+"""Location Map page: proposed sites on a Folium map, with optional charger coverage."""
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from dashboard import get_bangalore_locations, get_tracer
+from geo import GeoIndex, coverage_gaps
+from locations import data_version
+from maps import add_coverage_layer, build_location_map, render_html
+from telemetry import STATIONS
+
+
+@st.cache_resource
+def get_station_index():
+    """Spatial index over the existing stations only: proposed sites are not coverage until built"""
+    return GeoIndex(STATIONS['Latitude'], STATIONS['Longitude'])
+
+
+@st.cache_data(max_entries=32)
+def location_map_html(priorities, version, coverage, _locations, _all_locations):
+    """Rendered Location Map HTML, keyed by the priority selection, coverage settings and data version"""
+    m = build_location_map(_locations)
+    if coverage is not None:
+        station_km, gap_km = coverage
+        # Gaps are measured from existing stations, over the extent of stations and proposed sites
+        gaps = coverage_gaps(get_station_index(), pd.concat([STATIONS['Latitude'], _all_locations['Latitude']]),
+                             pd.concat([STATIONS['Longitude'], _all_locations['Longitude']]),
+                             cell_km=1.0, radius_km=gap_km)
+        add_coverage_layer(m, STATIONS, station_km, gaps)
+    return render_html(m)
+
+
+tracer = get_tracer()
+locations_df = get_bangalore_locations()
+locations_version = data_version(locations_df)
+
+st.header("Proposed EV Charging Station Locations in Bangalore")
+
+priority_filter = st.multiselect(
+    "Filter by Priority",
+    options=['Very High', 'High', 'Medium'],
+    default=['Very High', 'High', 'Medium']
+)
+
+filtered_locations = locations_df[locations_df['Priority'].isin(priority_filter)]
+
+col1, col2, col3 = st.columns([1, 1, 1])
+with col1:
+    show_coverage = st.checkbox("Show charger coverage", value=False)
+with col2:
+    station_km = st.slider("Existing station radius (km)", 1.0, 10.0, 3.0, 0.5, disabled=not show_coverage)
+with col3:
+    gap_km = st.slider("Coverage gap distance (km)", 1.0, 15.0, 5.0, 0.5, disabled=not show_coverage)
+
+# Map HTML is cached per filter selection and data version, so other reruns reuse it
+with tracer.span('map.html'):
+    map_html = location_map_html(tuple(sorted(priority_filter)), locations_version, (station_km, gap_km) if show_coverage else None,
+                                 filtered_locations, locations_df)
+with tracer.span('map.render'):
+    st.iframe(map_html, height=800)
+
+if show_coverage:
+    st.caption(f"Red cells are more than {gap_km:g} km from every existing station; proposed sites do not count as coverage.")
+    # Proposed sites that overlap an existing station's catchment
+    distance, nearest = get_station_index().nearest(filtered_locations['Latitude'], filtered_locations['Longitude'], max_km=station_km)
+    near = np.isfinite(distance)
+    if near.any():
+        st.markdown(f"**Proposed sites within {station_km:g} km of an existing station**")
+        st.dataframe(pd.DataFrame({
+            'Location Name': filtered_locations['Location Name'].values[near],
+            'Nearest Station': STATIONS['Station ID'].values[nearest[near]],
+            'Distance (km)': distance[near].round(2),
+        }), width='stretch', hide_index=True)
+    else:
+        st.caption(f"No proposed site is within {station_km:g} km of an existing station.")
+
+col1, col2, col3 = st.columns(3)
+with col1:
+    st.markdown("🔴 **Very High Priority** - High traffic IT hubs, Metro stations")
+with col2:
+    st.markdown("🟠 **High Priority** - Major commercial + residential areas")
+with col3:
+    st.markdown("🔵 **Medium Priority** - Residential areas with moderate traffic")
@@ -0,0 +1,92 @@
+"""Site Planner page: budgeted site selection and queue-simulated charger sizing of the chosen sites."""
+import streamlit as st
+
+from dashboard import get_bangalore_locations, get_tracer
+from figures import wait_distribution
+from geo import GeoIndex
+from locations import data_version
+from planning import PlanInputs, plan_table, solve
+from queueing import QueueInputs, queue_table, simulate_locations
+from telemetry import STATIONS
+
+
+@st.cache_data(max_entries=32)
+def plan_sites(version, budget, radius_km, ev_share, sessions_per_charger, method, _locations):
+    """Optimised site plan; demand already within reach of an existing station is left out"""
+    covered = GeoIndex(STATIONS['Latitude'], STATIONS['Longitude']).covered(
+        _locations['Latitude'], _locations['Longitude'], radius_km)
+    inputs = PlanInputs(budget=budget, radius_km=radius_km, ev_share=ev_share, sessions_per_charger=sessions_per_charger)
+    return solve(_locations, _locations['Latitude'], _locations['Longitude'], _locations['Estimated Daily Traffic'],
+                 inputs, method, covered)
+
+
+@st.cache_data(max_entries=16)
+def queue_sizing(version, selected, ev_share, charger_kw, sla_wait_min, sla_quantile, _locations):
+    """Simulated year of arrivals per selected site, with the charger count each needs to meet the wait SLA"""
+    inputs = QueueInputs(ev_share=ev_share, charger_kw=charger_kw, sla_wait_min=sla_wait_min, sla_quantile=sla_quantile)
+    return simulate_locations(_locations.iloc[list(selected)], inputs)
+
+
+tracer = get_tracer()
+locations_df = get_bangalore_locations()
+locations_version = data_version(locations_df)
+
+st.header("🧭 Optimised Site Selection")
+st.markdown("Choose sites and charger counts that cover the most daily EV demand within a budget.")
+
+col1, col2, col3, col4, col5 = st.columns(5)
+with col1:
+    plan_budget = st.number_input("Budget (Lakhs)", min_value=100, max_value=10000, value=1500, step=100)
+with col2:
+    plan_radius = st.slider("Service radius (km)", 1.0, 10.0, 3.0, 0.5)
+with col3:
+    plan_ev_share = st.slider("EV share of traffic (%)", 0.5, 10.0, 2.0, 0.5) / 100
+with col4:
+    plan_sessions = st.slider("Sessions per charger / day", 4, 30, 12)
+with col5:
+    plan_method = st.selectbox("Solver", ['greedy', 'milp'],
+                               format_func={'greedy': 'Greedy + local search', 'milp': 'MILP (HiGHS)'}.get)
+
+plan = plan_sites(locations_version, float(plan_budget), plan_radius, plan_ev_share,
+                  float(plan_sessions), plan_method, locations_df)
+
+col1, col2, col3, col4, col5 = st.columns(5)
+with col1:
+    st.metric("Sites Selected", len(plan.selected))
+with col2:
+    st.metric("Demand Covered", f"{plan.coverage * 100:.1f}%")
+with col3:
+    st.metric("Planned Investment", f"₹{plan.cost.sum():,.0f}L")
+with col4:
+    st.metric("Solve Time", f"{plan.solve_seconds * 1000:.0f} ms")
+with col5:
+    st.metric("Optimality Gap", f"≤ {plan.gap * 100:.1f}%")
+if plan.note:
+    st.warning(f"Solver: {plan.note}")
+
+st.dataframe(plan_table(locations_df, plan), width='stretch', hide_index=True)
+st.caption("Demand within the service radius of an existing BLR station is treated as already covered. "
+           "The gap is measured against the LP relaxation of the plan at minimum charger cost.")
+
+st.subheader("🚦 Charger Sizing & Wait Times")
+col1, col2, col3 = st.columns(3)
+with col1:
+    queue_kw = st.select_slider("Charger power (kW)", [30, 60, 120, 180], value=60)
+with col2:
+    queue_sla = st.slider("Max wait (min)", 1, 30, 10)
+with col3:
+    queue_quantile = st.select_slider("for % of drivers", [50, 80, 90, 95, 99], value=90) / 100
+
+# Only the plan's sites are simulated: a year per site is seconds of CPU each at thousands of candidates
+if len(plan.selected):
+    sites = locations_df.iloc[plan.selected]
+    queue = queue_sizing(locations_version, tuple(plan.selected.tolist()), plan_ev_share, float(queue_kw),
+                         float(queue_sla), queue_quantile, locations_df)
+    st.dataframe(queue_table(sites, queue), width='stretch', hide_index=True)
+    with tracer.span('chart.wait_distribution'):
+        st.plotly_chart(wait_distribution(sites['Location Name'], queue.histogram), width='stretch')
+    st.caption(f"{queue.arrivals:,} simulated arrivals (one year per selected site, EV share from the planner) in "
+               f"{queue.seconds:.1f} s. Waits are at the recommended charger count; SLA Chargers is the fewest "
+               f"that keep {queue_quantile * 100:.0f}% of waits under {queue_sla} min.")
+else:
+    st.info("No sites fit the budget, so there is nothing to size.")